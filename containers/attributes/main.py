@@ -252,6 +252,17 @@ table_attribute = sqlalchemy.Table(
         "group_by_attr", sqlalchemy.Integer, sqlalchemy.ForeignKey("attribute.id")
     ),
     sqlalchemy.Column("group_by_attrval", sqlalchemy.TEXT),
+    # Set by the database on every change, from tdf_attribute.catalog_version
+    sqlalchemy.Column("version", sqlalchemy.BigInteger),
+)
+
+# Attribute definitions deleted, by the catalog version of the deletion
+table_attribute_tombstone = sqlalchemy.Table(
+    "attribute_tombstone",
+    metadata,
+    sqlalchemy.Column("version", sqlalchemy.BigInteger, primary_key=True),
+    sqlalchemy.Column("authority", sqlalchemy.VARCHAR),
+    sqlalchemy.Column("name", sqlalchemy.VARCHAR),
 )
 
 engine = sqlalchemy.create_engine(DATABASE_URL, pool_pre_ping=True)
@@ -381,6 +392,33 @@ class AuthorityDefinition(BaseModel):
     authority: AuthorityUrl
 
 
+class AttributeName(BaseModel):
+    authority: AuthorityUrl
+    name: Annotated[str, Field(max_length=2000)]
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "authority": "https://opentdf.io",
+                "name": "IntellectualProperty",
+            }
+        }
+
+
+class CatalogDefinition(AttributeDefinition):
+    version: int
+
+
+class CatalogDeletion(AttributeName):
+    version: int
+
+
+class CatalogDelta(BaseModel):
+    version: int
+    definitions: List[CatalogDefinition] = []
+    deleted: List[CatalogDeletion] = []
+
+
 @app.on_event("startup")
 async def startup():
     await database.connect()
@@ -668,6 +706,171 @@ async def read_attributes_definitions(
         return pager.paginate(attributes)
 
 
+# Largest number of attribute names in one batch lookup
+ATTRIBUTE_BATCH_MAX_SIZE = int(os.getenv("ATTRIBUTE_BATCH_MAX_SIZE", "1000"))
+
+
+# KAS looks up the definitions named by a policy here, in one round trip,
+# instead of downloading every definition under each authority.
+@app.post(
+    "/v1/attrName/batch",
+    response_model=List[AttributeDefinition],
+    include_in_schema=False,
+)
+async def read_attributes_definitions_batch(
+    request: List[AttributeName] = Body(
+        ...,
+        example=[{"authority": "https://opentdf.io", "name": "IntellectualProperty"}],
+    ),
+    search_filter=Depends(add_filter_by_access_control),
+):
+    if len(request) > ATTRIBUTE_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=BAD_REQUEST,
+            detail=f"Too many attribute names [{len(request)} > {ATTRIBUTE_BATCH_MAX_SIZE}]",
+        )
+    return await read_attributes_definitions_batch_crud(request, search_filter)
+
+
+def _definitions_query(*columns):
+    """Select definitions with their authorities and group-by attributes."""
+    group_attr = table_attribute.alias("group_attr")
+    group_authority = table_authority.alias("group_authority")
+    return sqlalchemy.select(
+        *columns,
+        table_authority.c.name.label("authority"),
+        table_attribute.c.name,
+        table_attribute.c.values_array,
+        table_attribute.c.rule,
+        table_attribute.c.state,
+        table_attribute.c.group_by_attr,
+        table_attribute.c.group_by_attrval,
+        group_attr.c.name.label("group_by_name"),
+        group_authority.c.name.label("group_by_authority"),
+    ).select_from(
+        table_attribute.join(
+            table_authority, table_attribute.c.namespace_id == table_authority.c.id
+        )
+        .outerjoin(group_attr, table_attribute.c.group_by_attr == group_attr.c.id)
+        .outerjoin(group_authority, group_attr.c.namespace_id == group_authority.c.id)
+    )
+
+
+def _definition_from_row(row, model=AttributeDefinition, **fields):
+    """Build a definition from a row of _definitions_query."""
+    attr_def = model(
+        authority=row.authority,
+        name=row.name,
+        order=row.values_array,
+        rule=row.rule,
+        state=row.state,
+        **fields,
+    )
+    if row.group_by_attr:
+        if not row.group_by_name or not row.group_by_authority:
+            raise HTTPException(
+                status_code=INTERNAL_SERVER_ERROR,
+                detail=f"Groupby attribute {row.group_by_attr} not found",
+            )
+        attr_def.group_by = AttributeInstance(
+            authority=row.group_by_authority,
+            name=row.group_by_name,
+            value=row.group_by_attrval,
+        )
+    return attr_def
+
+
+async def read_attributes_definitions_batch_crud(request, search_filter=None):
+    """Return the definitions of the named attributes that exist.
+
+    Definitions, their authorities and their group-by attributes are read
+    with one query.
+    """
+    pairs = sorted({(str(attr.authority), attr.name) for attr in request})
+    if not pairs:
+        return []
+    query = (
+        _definitions_query()
+        .where(
+            sqlalchemy.tuple_(table_authority.c.name, table_attribute.c.name).in_(pairs)
+        )
+        .order_by(table_attribute.c.id)
+    )
+    if search_filter is not None:
+        query = query.where(table_authority.c.name == search_filter)
+
+    attributes: List[AttributeDefinition] = []
+    for row in await database.fetch_all(query):
+        try:
+            attributes.append(_definition_from_row(row))
+        except ValidationError as e:
+            logger.error(e)
+    logger.debug("attribute definitions %s", attributes)
+    return attributes
+
+
+# KAS keeps a replica of the attribute catalog, and brings it up to date with
+# the changes made since the last catalog version it has seen.
+@app.get("/v1/catalog", response_model=CatalogDelta, include_in_schema=False)
+async def read_catalog(
+    since: int = Query(0, ge=0, description="Last catalog version seen"),
+    search_filter=Depends(add_filter_by_access_control),
+):
+    return await read_catalog_crud(since, search_filter)
+
+
+async def read_catalog_crud(since, search_filter=None):
+    """Return the definitions changed and deleted after catalog version since.
+
+    Both are read with one query, so from one snapshot. The version returned
+    is the latest one read, or since if nothing has changed.
+    """
+    changed = _definitions_query(
+        table_attribute.c.version, sqlalchemy.false().label("deleted")
+    ).where(table_attribute.c.version > since)
+    # Tombstones have no definition; fill its columns with typed nulls
+    deleted = sqlalchemy.select(
+        table_attribute_tombstone.c.version,
+        sqlalchemy.true().label("deleted"),
+        table_attribute_tombstone.c.authority,
+        table_attribute_tombstone.c.name,
+        *(
+            sqlalchemy.cast(sqlalchemy.null(), column.type)
+            for column in list(changed.selected_columns)[4:]
+        ),
+    ).where(table_attribute_tombstone.c.version > since)
+    if search_filter is not None:
+        changed = changed.where(table_authority.c.name == search_filter)
+        deleted = deleted.where(table_attribute_tombstone.c.authority == search_filter)
+    query = sqlalchemy.union_all(changed, deleted).order_by("version")
+
+    delta = CatalogDelta(version=since)
+    for row in await database.fetch_all(query):
+        delta.version = max(delta.version, row.version)
+        try:
+            if row.deleted:
+                delta.deleted.append(
+                    CatalogDeletion(
+                        authority=row.authority, name=row.name, version=row.version
+                    )
+                )
+            else:
+                delta.definitions.append(
+                    _definition_from_row(
+                        row, model=CatalogDefinition, version=row.version
+                    )
+                )
+        except ValidationError as e:
+            logger.error(e)
+    logger.debug(
+        "catalog version %s: %d changed, %d deleted",
+        delta.version,
+        len(delta.definitions),
+        len(delta.deleted),
+    )
+    return delta
+
+
 @app.post(
     "/definitions/attributes",
     tags=["Attributes Definitions"],
@@ -218,3 +218,84 @@ def test_delete_attributes_definitions(test_app, monkeypatch):
     response = test_app.request("DELETE", "/definitions/attributes", data=json.dumps(test_payload))
     assert response.status_code == 202
     assert response.json() == {}
+
+
+def test_read_attributes_definitions_batch(test_app, monkeypatch):
+    test_payload = [
+        {"authority": "https://opentdf.io", "name": "IntellectualProperty"},
+        {"authority": "https://opentdf.io", "name": "Missing"},
+    ]
+
+    test_response = [
+        {
+            "authority": "https://opentdf.io",
+            "name": "IntellectualProperty",
+            "rule": "hierarchy",
+            "state": "published",
+            "order": ["TradeSecret", "Proprietary", "BusinessSensitive", "Open"],
+            "group_by": None,
+        }
+    ]
+
+    async def mock_read_attributes_definitions_batch_crud(request, search_filter=None):
+        assert [(str(attr.authority), attr.name) for attr in request] == [
+            ("https://opentdf.io", "IntellectualProperty"),
+            ("https://opentdf.io", "Missing"),
+        ]
+        return test_response
+
+    monkeypatch.setattr(
+        main,
+        "read_attributes_definitions_batch_crud",
+        mock_read_attributes_definitions_batch_crud,
+    )
+
+    response = test_app.post("/v1/attrName/batch", data=json.dumps(test_payload))
+    assert response.status_code == 200
+    assert response.json() == test_response
+
+
+def test_read_attributes_definitions_batch_too_large(test_app, monkeypatch):
+    monkeypatch.setattr(main, "ATTRIBUTE_BATCH_MAX_SIZE", 1)
+    test_payload = [
+        {"authority": "https://opentdf.io", "name": "A"},
+        {"authority": "https://opentdf.io", "name": "B"},
+    ]
+
+    response = test_app.post("/v1/attrName/batch", data=json.dumps(test_payload))
+    assert response.status_code == 400
+
+
+def test_read_catalog(test_app, monkeypatch):
+    test_response = {
+        "version": 12,
+        "definitions": [
+            {
+                "authority": "https://opentdf.io",
+                "name": "IntellectualProperty",
+                "rule": "hierarchy",
+                "state": "published",
+                "order": ["TradeSecret", "Proprietary", "BusinessSensitive", "Open"],
+                "group_by": None,
+                "version": 11,
+            }
+        ],
+        "deleted": [
+            {"authority": "https://opentdf.io", "name": "Retired", "version": 12}
+        ],
+    }
+
+    async def mock_read_catalog_crud(since, search_filter=None):
+        assert since == 7
+        return test_response
+
+    monkeypatch.setattr(main, "read_catalog_crud", mock_read_catalog_crud)
+
+    response = test_app.get("/v1/catalog", params={"since": 7})
+    assert response.status_code == 200
+    assert response.json() == test_response
+
+
+def test_read_catalog_negative_version(test_app):
+    response = test_app.get("/v1/catalog", params={"since": -1})
+    assert response.status_code == 422
@@ -10,6 +10,7 @@ from tdf3_kas_core import Kas
 from tdf3_kas_core import validate_dpop
 
 from .plugins import (
+    attribute_catalog,
     opentdf_attr_authority_plugin,
     revocation_plugin,
     access_pdp_healthz_plugin,
@@ -26,6 +27,34 @@ OIDC_ISSUER_URL = os.environ.get("OIDC_ISSUER_URL") is not None
 AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "false").lower() in ("yes", "true", "t", "1")
 TRUSTED_ENTITLERS = os.environ.get("TRUSTED_ENTITLERS", "").split()
 
+# Attribute definition cache, in seconds and entries; a TTL of 0 disables it
+ATTR_AUTHORITY_CACHE_TTL = int(os.environ.get("ATTR_AUTHORITY_CACHE_TTL", "300"))
+ATTR_AUTHORITY_CACHE_NEGATIVE_TTL = int(
+    os.environ.get("ATTR_AUTHORITY_CACHE_NEGATIVE_TTL", "30")
+)
+ATTR_AUTHORITY_CACHE_STALE_TTL = int(
+    os.environ.get("ATTR_AUTHORITY_CACHE_STALE_TTL", "60")
+)
+ATTR_AUTHORITY_CACHE_SIZE = int(os.environ.get("ATTR_AUTHORITY_CACHE_SIZE", "1024"))
+# Authorities fetched at once, within one deadline in seconds
+ATTR_AUTHORITY_FETCH_CONCURRENCY = int(
+    os.environ.get("ATTR_AUTHORITY_FETCH_CONCURRENCY", "8")
+)
+ATTR_AUTHORITY_FETCH_DEADLINE = float(
+    os.environ.get("ATTR_AUTHORITY_FETCH_DEADLINE", "10")
+)
+# fail, or cache to use the last definitions of an unreachable authority
+ATTR_AUTHORITY_PARTIAL_FAILURE = os.environ.get(
+    "ATTR_AUTHORITY_PARTIAL_FAILURE", "fail"
+)
+# Look up the definitions a policy names with one batch request
+ATTR_AUTHORITY_BATCH_LOOKUP = os.environ.get("ATTR_AUTHORITY_BATCH_LOOKUP", "1") == "1"
+# Keep a replica of the attribute catalog, synced every poll interval, and
+# look definitions up in it while it is no more than max staleness old
+ATTR_CATALOG_SYNC = os.environ.get("ATTR_CATALOG_SYNC", "0") == "1"
+ATTR_CATALOG_POLL_INTERVAL = float(os.environ.get("ATTR_CATALOG_POLL_INTERVAL", "10"))
+ATTR_CATALOG_MAX_STALENESS = float(os.environ.get("ATTR_CATALOG_MAX_STALENESS", "300"))
+
 
 def configure_filters(kas):
     def str_to_list(varname):
@@ -99,8 +128,25 @@ def app(name):
         logger.error("OTDF attribute host is not configured correctly.")
 
     logger.info("ATTR_AUTHORITY_HOST = [%s]", attr_host)
+    catalog = None
+    if ATTR_CATALOG_SYNC:
+        catalog = attribute_catalog.AttributeCatalog(
+            attr_host,
+            poll_interval=ATTR_CATALOG_POLL_INTERVAL,
+            max_staleness=ATTR_CATALOG_MAX_STALENESS,
+        )
+        catalog.start()
     otdf_attr_backend = opentdf_attr_authority_plugin.OpenTDFAttrAuthorityPlugin(
-        attr_host
+        attr_host,
+        cache_ttl=ATTR_AUTHORITY_CACHE_TTL,
+        cache_max_size=ATTR_AUTHORITY_CACHE_SIZE,
+        cache_negative_ttl=ATTR_AUTHORITY_CACHE_NEGATIVE_TTL,
+        cache_stale_ttl=ATTR_AUTHORITY_CACHE_STALE_TTL,
+        fetch_concurrency=ATTR_AUTHORITY_FETCH_CONCURRENCY,
+        fetch_deadline=ATTR_AUTHORITY_FETCH_DEADLINE,
+        partial_failure=ATTR_AUTHORITY_PARTIAL_FAILURE,
+        batch_lookup=ATTR_AUTHORITY_BATCH_LOOKUP,
+        catalog=catalog,
     )
     kas.use_healthz_plugin(otdf_attr_backend)
     kas.use_rewrap_plugin_v2(otdf_attr_backend)
@@ -14,6 +14,7 @@ import grpc
 from accesspdp.v1 import accesspdp_pb2_grpc, accesspdp_pb2
 
 from tdf3_kas_core.abstractions import AbstractHealthzPlugin
+from tdf3_kas_core.models.access_pdp import channel
 
 from tdf3_kas_core.errors import (
     Error,
@@ -21,17 +22,17 @@ from tdf3_kas_core.errors import (
 
 logger = logging.getLogger(__name__)
 
-uri = "localhost:50052"
-
 
 class AccessPDPHealthzPlugin(AbstractHealthzPlugin):
     def healthz(self, *, probe):
 
         logger.debug("Access PDP gRPC health check")
-        channel = grpc.insecure_channel(uri)
-        stub = accesspdp_pb2_grpc.HealthStub(channel)
+        stub = channel.pdp_stub(accesspdp_pb2_grpc.HealthStub)
         req = accesspdp_pb2.HealthCheckRequest()
-        response = stub.Check(req)
+        try:
+            response = stub.Check(req, timeout=channel.deadline)
+        except grpc.RpcError as e:
+            raise Error("Unable to be ping Access PDP gRPC service") from e
 
         if response.status == 1:
             logger.debug("--- Ping Access PDP gRPC service successful --- ")
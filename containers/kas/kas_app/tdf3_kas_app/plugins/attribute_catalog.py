@@ -0,0 +1,223 @@
+"""Replica of the attribute catalog of an OpenTDF attribute service.
+
+KAS holds every attribute definition in memory and polls the attribute
+service for the changes made since the catalog version it last saw, so a
+rewrap finds its definitions without a request. Each sync publishes a new
+index as a whole; readers never see a delta half applied.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from tdf3_kas_core.models import definition_index
+from tdf3_kas_core.models.access_pdp import invalidate_decisions
+from tdf3_kas_core.util import TTLCache
+from tdf3_kas_core.util import http_get
+from tdf3_kas_core.util import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogUnavailable(Exception):
+    """The catalog cannot be synced, or the replica is too stale to use."""
+
+
+class AttributeCatalog(object):
+    """Keep attribute definitions up to date by polling for deltas.
+
+    Every `poll_interval` seconds the changes since the last version seen
+    are fetched and applied in version order. Lookups fail with
+    CatalogUnavailable before the first sync and once the last good sync
+    is more than `max_staleness` seconds old.
+    """
+
+    def __init__(
+        self,
+        attribute_host,
+        *,
+        poll_interval=10,
+        max_staleness=300,
+        timeout=10,
+        index_cache_size=1024,
+    ):
+        """Construct an empty replica; start() syncs it."""
+        self.__host = attribute_host
+        self.__poll_interval = poll_interval
+        self.__max_staleness = max_staleness
+        self.__timeout = timeout
+        # Catalog version and definitions, by lowercase authority then name
+        self.__state = (0, {})
+        self.__synced_at = None
+        self.__sync_lock = threading.Lock()
+        self.__start_lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__pid = None
+        # Definition indexes, by catalog version and the names looked up
+        self.__indexes = TTLCache(maxsize=index_cache_size, ttl=None)
+
+    @property
+    def version(self):
+        """Return the catalog version last applied."""
+        return self.__state[0]
+
+    @version.setter
+    def version(self, value):
+        """Do not allow the version to be set."""
+        pass
+
+    @property
+    def staleness(self):
+        """Return seconds since the last good sync, or None if never synced."""
+        if self.__synced_at is None:
+            return None
+        return time.monotonic() - self.__synced_at
+
+    @staleness.setter
+    def staleness(self, value):
+        """Do not allow the staleness to be set."""
+        pass
+
+    def start(self):
+        """Sync once, then keep syncing on a background thread."""
+        self.sync()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.__reset_after_fork)
+        self.__start_polling()
+
+    def stop(self):
+        """Stop polling."""
+        self.__stop.set()
+
+    def sync(self):
+        """Apply the changes since the last version; return True if any.
+
+        Errors are logged and counted, and leave the replica as it was.
+        """
+        with self.__sync_lock:
+            version, by_authority = self.__state
+            try:
+                delta = self.__fetch(version)
+                changes = sorted(
+                    [(d["version"], False, d) for d in delta["definitions"]]
+                    + [(d["version"], True, d) for d in delta["deleted"]],
+                    key=lambda change: change[0],
+                )
+                latest = delta["version"]
+            except Exception as err:
+                logger.warning(
+                    "attr catalog: sync failed [%s]", self.__host, exc_info=err
+                )
+                metrics.incr("attr_catalog.sync_failed")
+                return False
+
+            if changes:
+                by_authority = self.__apply(by_authority, changes)
+                logger.info(
+                    "attr catalog: %d changes, version %s -> %s",
+                    len(changes),
+                    version,
+                    latest,
+                )
+            self.__state = (max(version, latest), by_authority)
+            self.__synced_at = time.monotonic()
+            metrics.gauge("attr_catalog.version", self.__state[0])
+            metrics.gauge(
+                "attr_catalog.definitions",
+                sum(len(names) for names in by_authority.values()),
+            )
+        if changes:
+            invalidate_decisions()
+        return bool(changes)
+
+    def lookup(self, namespaces):
+        """Return an AttributeDefinitionIndex of the definitions of namespaces.
+
+        `<authority>/attr/<name>` gives that definition, if it exists, and a
+        bare authority every definition under it, ordered by authority then
+        name. The index is shared by lookups of the same names until the
+        catalog changes.
+        """
+        if self.__pid is not None and self.__pid != os.getpid():
+            self.__start_polling()
+        staleness = self.staleness
+        if staleness is None:
+            raise CatalogUnavailable("Attribute catalog has not synced")
+        if staleness > self.__max_staleness:
+            raise CatalogUnavailable(f"Attribute catalog is {staleness:.0f}s stale")
+        version, by_authority = self.__state
+        wanted = set()
+        for ns in namespaces:
+            authority, _, name = ns.partition("/attr/")
+            wanted.add((authority.lower(), name))
+        key = (version, tuple(sorted(wanted)))
+        index = self.__indexes.get(key)
+        if index is None:
+            found = {}
+            for authority, name in wanted:
+                names = by_authority.get(authority, {})
+                if not name:
+                    found.update(((authority, n), d) for (n, d) in names.items())
+                elif name in names:
+                    found[(authority, name)] = names[name]
+            index = definition_index([found[k] for k in sorted(found)])
+            self.__indexes.set(key, index)
+        return index
+
+    def __fetch(self, version):
+        uri = "{0}/v1/catalog".format(self.__host)
+        resp = http_get(
+            uri,
+            params={"since": version},
+            headers={"Content-Type": "application/json"},
+            timeout=self.__timeout,
+            mtls=True,
+        )
+        if resp.status_code != 200:
+            raise CatalogUnavailable(
+                f"status {resp.status_code}; reason [{resp.reason}]"
+            )
+        return resp.json()
+
+    @staticmethod
+    def __apply(by_authority, changes):
+        """Return a copy of by_authority with changes applied in order."""
+        by_authority = dict(by_authority)
+        copied = set()
+        for _, deleted, change in changes:
+            authority = change["authority"].lower()
+            if authority not in copied:
+                by_authority[authority] = dict(by_authority.get(authority, {}))
+                copied.add(authority)
+            if deleted:
+                by_authority[authority].pop(change["name"], None)
+            else:
+                definition = {k: v for (k, v) in change.items() if k != "version"}
+                by_authority[authority][change["name"]] = definition
+        for authority in copied:
+            if not by_authority[authority]:
+                del by_authority[authority]
+        return by_authority
+
+    def __start_polling(self):
+        with self.__start_lock:
+            if self.__pid == os.getpid():
+                return
+            self.__pid = os.getpid()
+            threading.Thread(
+                target=self.__poll, name="attr-catalog", daemon=True
+            ).start()
+
+    def __poll(self):
+        while not self.__stop.wait(self.__poll_interval):
+            self.sync()
+            staleness = self.staleness
+            if staleness is not None:
+                metrics.gauge("attr_catalog.staleness", staleness)
+
+    def __reset_after_fork(self):
+        """Forget locks held by threads of the parent process."""
+        self.__sync_lock = threading.Lock()
+        self.__start_lock = threading.Lock()
+        self.__stop = threading.Event()
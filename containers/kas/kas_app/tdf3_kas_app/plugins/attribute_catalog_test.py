@@ -0,0 +1,192 @@
+"""Test the attribute catalog replica."""
+
+import time
+
+from types import SimpleNamespace
+
+import pytest
+
+from unittest.mock import Mock
+
+from . import attribute_catalog
+from .attribute_catalog import AttributeCatalog, CatalogUnavailable
+
+HOST = "http://localhost:4010"
+
+
+def definition(authority, name, version, rule="allOf"):
+    return {
+        "authority": authority,
+        "name": name,
+        "rule": rule,
+        "state": "published",
+        "order": ["A", "B"],
+        "group_by": None,
+        "version": version,
+    }
+
+
+def delta(version, definitions=(), deleted=()):
+    return Mock(
+        status_code=200,
+        json=Mock(
+            return_value={
+                "version": version,
+                "definitions": list(definitions),
+                "deleted": list(deleted),
+            }
+        ),
+    )
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Answer catalog requests in turn, repeating the last answer."""
+    service = SimpleNamespace(responses=[], seen=[])
+
+    def http_get(uri, params=None, **kwargs):
+        assert uri == f"{HOST}/v1/catalog"
+        assert kwargs["mtls"] is True
+        service.seen.append(params["since"])
+        if len(service.responses) > 1:
+            return service.responses.pop(0)
+        return service.responses[0]
+
+    monkeypatch.setattr(attribute_catalog, "http_get", http_get)
+    return service
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        attribute_catalog, "invalidate_decisions", lambda: calls.append(True)
+    )
+    return calls
+
+
+def strip(definitions):
+    return [{k: v for (k, v) in d.items() if k != "version"} for d in definitions]
+
+
+def test_lookup_before_sync():
+    catalog = AttributeCatalog(HOST)
+    with pytest.raises(CatalogUnavailable):
+        catalog.lookup(["https://a.org/attr/X"])
+
+
+def test_sync_and_lookup(service, invalidated):
+    x = definition("https://a.org", "X", 1)
+    y = definition("https://a.org", "Y", 2)
+    z = definition("https://b.org", "Z", 3)
+    service.responses.append(delta(3, [x, y, z]))
+    catalog = AttributeCatalog(HOST)
+
+    assert catalog.sync() is True
+    assert catalog.version == 3
+    assert service.seen == [0]
+    assert catalog.lookup(["https://A.org/attr/Y", "https://b.org/attr/Z"]) == strip(
+        [y, z]
+    )
+    assert catalog.lookup(["https://a.org"]) == strip([x, y])
+    assert catalog.lookup(["https://a.org/attr/Missing", "https://c.org"]) == []
+    assert invalidated == [True]
+
+
+def test_delta_applied_in_version_order(service, invalidated):
+    service.responses.append(
+        delta(
+            2,
+            [definition("https://a.org", "X", 1), definition("https://a.org", "Y", 2)],
+        )
+    )
+    replaced = definition("https://a.org", "X", 5, rule="anyOf")
+    service.responses.append(
+        delta(
+            6,
+            [replaced],
+            [
+                {"authority": "https://a.org", "name": "X", "version": 4},
+                {"authority": "https://A.ORG", "name": "Y", "version": 6},
+            ],
+        )
+    )
+    catalog = AttributeCatalog(HOST)
+    catalog.sync()
+    snapshot = catalog.lookup(["https://a.org"])
+
+    assert catalog.sync() is True
+    assert service.seen == [0, 2]
+    assert catalog.version == 6
+    assert catalog.lookup(["https://a.org"]) == strip([replaced])
+    # Earlier results are left as they were
+    assert [d["name"] for d in snapshot] == ["X", "Y"]
+    assert len(invalidated) == 2
+
+
+def test_sync_without_changes(service, invalidated):
+    service.responses.append(delta(7, [definition("https://a.org", "X", 7)]))
+    service.responses.append(delta(7))
+    catalog = AttributeCatalog(HOST)
+    catalog.sync()
+
+    assert catalog.sync() is False
+    assert catalog.version == 7
+    assert invalidated == [True]
+
+
+def test_failed_sync_keeps_replica(service, monkeypatch):
+    counts = []
+    monkeypatch.setattr(
+        attribute_catalog.metrics, "incr", lambda name, count=1: counts.append(name)
+    )
+    x = definition("https://a.org", "X", 1)
+    service.responses.append(delta(1, [x]))
+    service.responses.append(Mock(status_code=503, reason="Service Unavailable"))
+    catalog = AttributeCatalog(HOST)
+    catalog.sync()
+
+    assert catalog.sync() is False
+    assert catalog.version == 1
+    assert catalog.lookup(["https://a.org/attr/X"]) == strip([x])
+    assert counts == ["attr_catalog.sync_failed"]
+
+
+def test_stale_replica(service):
+    service.responses.append(delta(1, [definition("https://a.org", "X", 1)]))
+    catalog = AttributeCatalog(HOST, max_staleness=0.05)
+    catalog.sync()
+    time.sleep(0.1)
+
+    with pytest.raises(CatalogUnavailable, match="stale"):
+        catalog.lookup(["https://a.org/attr/X"])
+
+
+def test_start_polls(service):
+    service.responses.append(delta(1, [definition("https://a.org", "X", 1)]))
+    service.responses.append(delta(2, [definition("https://a.org", "Y", 2)]))
+    catalog = AttributeCatalog(HOST, poll_interval=0.01)
+    catalog.start()
+    try:
+        deadline = time.monotonic() + 5
+        while catalog.version < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        catalog.stop()
+
+    assert catalog.version == 2
+    assert [d["name"] for d in catalog.lookup(["https://a.org"])] == ["X", "Y"]
+
+
+def test_lookup_index_is_shared(service):
+    service.responses.append(delta(1, [definition("https://a.org", "X", 1)]))
+    service.responses.append(delta(2, [definition("https://a.org", "X", 2, "anyOf")]))
+    catalog = AttributeCatalog(HOST)
+    catalog.sync()
+
+    index = catalog.lookup(["https://a.org/attr/X"])
+    assert catalog.lookup(["https://A.org/attr/X"]) is index
+    catalog.sync()
+    changed = catalog.lookup(["https://a.org/attr/X"])
+    assert changed is not index
+    assert changed[0]["rule"] == "anyOf"
@@ -7,7 +7,6 @@ import jwt
 import os
 import socket
 
-from cryptography.hazmat.primitives import serialization
 from pkg_resources import packaging
 
 from tdf3_kas_core.models import Policy
@@ -132,20 +131,28 @@ def err_audit_hook(
         audit_log = extract_info_from_auth_token(audit_log, context)
 
         # wrap in try except -- should not fail since succeeded before
-        if "signedRequestToken" not in data:
+        if function_name == "rewrap_v2_batch":
+            # the whole batch was rejected before its key access objects
+            # were read; there is no single object to record
+            pass
+        elif "signedRequestToken" not in data and "keyAccess" not in data:
             logger.error(
                 "Rewrap success without signedRequestToken - should never get here"
             )
         else:
-            decoded_request = jwt.decode(
-                data["signedRequestToken"],
-                options={"verify_signature": False},
-                algorithms=["RS256", "ES256", "ES384", "ES512"],
-                leeway=30,
-            )
-            requestBody = decoded_request["requestBody"]
-            json_string = requestBody.replace("'", '"')
-            dataJson = json.loads(json_string)
+            if "signedRequestToken" in data:
+                decoded_request = jwt.decode(
+                    data["signedRequestToken"],
+                    options={"verify_signature": False},
+                    algorithms=["RS256", "ES256", "ES384", "ES512"],
+                    leeway=30,
+                )
+                requestBody = decoded_request["requestBody"]
+                json_string = requestBody.replace("'", '"')
+                dataJson = json.loads(json_string)
+            else:
+                # an item of a batch rewrap, already decoded by the service
+                dataJson = data
             if dataJson.get("algorithm", "rsa:2048") == "ec:secp256r1":
                 # nano
                 audit_log = extract_policy_data_from_nano(
@@ -189,15 +196,9 @@ def extract_policy_data_from_nano(audit_log, dataJson, context, key_master):
     # extract policy from header.
     (policy_info, header) = PolicyInfo.parse(ecc_mode, payload_config, header)
 
-    private_key_bytes = key_master.private_key(
-        "KAS-EC-SECP256R1-PRIVATE"
-    ).private_bytes(
-        serialization.Encoding.DER,
-        serialization.PrivateFormat.PKCS8,
-        serialization.NoEncryption(),
-    )
     decryptor = ecc_mode.curve.create_decryptor(
-        header[0 : ecc_mode.curve.public_key_byte_length], private_key_bytes
+        header[0 : ecc_mode.curve.public_key_byte_length],
+        key_master.ec_private_key("secp256r1"),
     )
 
     symmetric_cipher = payload_config.symmetric_cipher(
@@ -1,8 +1,10 @@
 import pytest
 import json
 
+from tdf3_kas_core.errors import BadRequestError
 from tdf3_kas_core.models import Context
 
+from . import audit_hooks
 from .audit_hooks import (
     extract_policy_data_from_tdf3,
     extract_policy_data_from_nano,
@@ -77,3 +79,28 @@ def test_extract_info_from_auth_token():
             "https://example.com/attr/Classification/value/S",
         ]
     )
+
+
+def test_err_audit_hook_batch(monkeypatch):
+    logs = []
+    monkeypatch.setattr(
+        audit_hooks.logger,
+        "audit",
+        lambda msg: logs.append(json.loads(msg)),
+        raising=False,
+    )
+    context = Context()
+    context.add("Authorization", f"Bearer {KEYCLOAK_TOKEN}")
+    audit_hooks.err_audit_hook(
+        "rewrap_v2_batch",
+        BadRequestError("Too many key access objects"),
+        {"signedRequestToken": "not-a-token"},
+        context,
+        None,
+        None,
+    )
+
+    assert len(logs) == 1
+    assert logs[0]["action"] == {"type": "read", "result": "failure"}
+    assert logs[0]["owner"]["id"] == "3cba8d86-1654-419f-8e68-1788e7d69fa3"
+    assert logs[0]["object"]["id"] == ""
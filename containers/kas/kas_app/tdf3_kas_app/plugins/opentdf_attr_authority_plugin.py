@@ -1,21 +1,50 @@
 """OpenTDF rewrap plugin."""
 
+import concurrent.futures
+import hashlib
 import logging
 import requests
 import json
-import os
+import threading
 
 from tdf3_kas_core.abstractions import AbstractHealthzPlugin, AbstractRewrapPlugin
+from tdf3_kas_core.models import combined_index
+from tdf3_kas_core.models.access_pdp import invalidate_decisions
+from tdf3_kas_core.util import TTLCache
+from tdf3_kas_core.util import http_get
+from tdf3_kas_core.util import http_post
+from tdf3_kas_core.util import metrics
 
 from tdf3_kas_core.errors import (
     Error,
     InvalidAttributeError,
     RequestTimeoutError,
     BadRequestError,
+    ServerStartupError,
 )
 
+from .attribute_catalog import CatalogUnavailable
+
 logger = logging.getLogger(__name__)
 
+# What to do when an authority cannot be reached: fail the request, or use
+# the definitions it last returned
+FAIL = "fail"
+CACHE = "cache"
+PARTIAL_FAILURE_POLICIES = (FAIL, CACHE)
+
+
+class _AuthorityUnavailable(Exception):
+    """The authority answered with an error that should not be cached."""
+
+
+class _BatchUnsupported(Exception):
+    """The attribute service has no batch lookup."""
+
+
+# Largest number of attribute names sent in one batch lookup
+BATCH_MAX_SIZE = 1000
+
 
 class OpenTDFAttrAuthorityPlugin(AbstractHealthzPlugin, AbstractRewrapPlugin):
     """Fetch attributes from OpenTDF Attribute authority instance.
@@ -34,41 +63,90 @@ class OpenTDFAttrAuthorityPlugin(AbstractHealthzPlugin, AbstractRewrapPlugin):
     Somehow this abstraction was missed, and in a statically-type language would be necessarily made
     explicit by the plugin interface itself so it wouldn't need specifying, but this is Python
     and DIY typing.
+
+    Definitions are cached per authority namespace for `cache_ttl` seconds.
+    Authorities that answer 404 are remembered for `cache_negative_ttl`
+    seconds. For `cache_stale_ttl` seconds after expiry the old definitions
+    are served while they are refreshed in the background. A `cache_ttl`
+    of 0 turns the cache off. When a fetch returns definitions that differ
+    from the last ones seen for that authority, cached PDP decisions are
+    dropped.
+
+    Several authorities are fetched at once, on a pool of
+    `fetch_concurrency` threads, and all of them within `fetch_deadline`
+    seconds. With a `partial_failure` of "cache", an authority that times
+    out or fails is answered with the definitions it last returned, if
+    any; with "fail" (the default) the fetch fails.
+
+    With `batch_lookup`, definitions named in full, as
+    `<authority>/attr/<name>`, are looked up together with one
+    `POST /v1/attrName/batch` and cached by name, instead of downloading
+    every definition under their authorities. Attribute services without
+    the batch lookup are fetched by authority.
+
+    Definitions are returned as an AttributeDefinitionIndex, shared by the
+    requests that are answered from the same cached definitions, so they
+    are indexed once rather than on every request.
+
+    Given a `catalog`, an AttributeCatalog replica, definitions are looked
+    up in it, and fetched from the authority only while it is unavailable.
     """
 
-    def __init__(self, attribute_host):
+    def __init__(
+        self,
+        attribute_host,
+        *,
+        cache_ttl=300,
+        cache_max_size=1024,
+        cache_negative_ttl=30,
+        cache_stale_ttl=60,
+        fetch_concurrency=8,
+        fetch_deadline=10,
+        partial_failure=FAIL,
+        batch_lookup=True,
+        catalog=None,
+    ):
         """Initialize the plugin."""
+        if partial_failure not in PARTIAL_FAILURE_POLICIES:
+            raise ServerStartupError(
+                f"Unknown partial failure policy [{partial_failure}];"
+                f" use one of {list(PARTIAL_FAILURE_POLICIES)}"
+            )
         self._host = attribute_host
         self._headers = {"Content-Type": "application/json"}
         self._timeout = 10  # in seconds
+        self._fetch_concurrency = fetch_concurrency
+        self._fetch_deadline = fetch_deadline
+        self._partial_failure = partial_failure
+        self._batch_lookup = batch_lookup
+        self._catalog = catalog
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._cache = None
+        if cache_ttl > 0:
+            self._cache = TTLCache(
+                maxsize=cache_max_size,
+                ttl=cache_ttl,
+                negative_ttl=cache_negative_ttl,
+                stale_ttl=cache_stale_ttl,
+                is_negative=lambda definitions: not definitions,
+            )
+        # Digests of the last definitions fetched, by namespace
+        self._digests = TTLCache(maxsize=cache_max_size, ttl=None)
+        # The last definitions fetched, by namespace, to fall back on
+        self._last_known = None
+        if partial_failure == CACHE:
+            self._last_known = TTLCache(maxsize=cache_max_size, ttl=None)
 
-    def _fetch_definition_from_authority_by_ns(self, namespace):
-        ca_cert_path = os.environ.get("CA_CERT_PATH")
-        client_cert_path = os.environ.get("CLIENT_CERT_PATH")
-        client_key_path = os.environ.get("CLIENT_KEY_PATH")
-
-        uri = "{0}/v1/attrName".format(self._host)
-        params = {"authority": namespace}
-
+    def _send(self, send, uri, **kwargs):
         try:
-            if client_cert_path and client_key_path:
-                logger.debug("Using cert auth for url:%s", uri)
-                resp = requests.get(
-                    uri,
-                    headers=self._headers,
-                    params=params,
-                    timeout=self._timeout,
-                    cert=(client_cert_path, client_key_path),
-                    verify=ca_cert_path,
-                )
-            else:
-                resp = requests.get(
-                    uri,
-                    headers=self._headers,
-                    params=params,
-                    timeout=self._timeout,
-                    verify=ca_cert_path,
-                )
+            return send(
+                uri,
+                headers=self._headers,
+                timeout=self._timeout,
+                mtls=True,
+                **kwargs,
+            )
         except (
             requests.exceptions.ConnectTimeout,
             requests.exceptions.ReadTimeout,
@@ -81,6 +159,10 @@ class OpenTDFAttrAuthorityPlugin(AbstractHealthzPlugin, AbstractRewrapPlugin):
             logger.warning("attr auth: request exception [%s]", uri, exc_info=err)
             raise InvalidAttributeError("Unable to be fetch attributes") from err
 
+    def _fetch_definition_from_authority_by_ns(self, namespace):
+        uri = "{0}/v1/attrName".format(self._host)
+        resp = self._send(http_get, uri, params={"authority": namespace})
+
         if resp.status_code != 200:
             logger.debug(
                 "--- Fetch attribute %s failed with status %s; reason [%s] ---",
@@ -88,12 +170,87 @@ class OpenTDFAttrAuthorityPlugin(AbstractHealthzPlugin, AbstractRewrapPlugin):
                 resp.status_code,
                 resp.reason,
             )
+            if resp.status_code != 404:
+                raise _AuthorityUnavailable(resp.status_code)
             return []
         logger.debug("--- Fetch attributes successful --- ")
         res = resp.json()
         logger.debug("Fetch attribute %s => %s", uri, res)
         return res
 
+    def _fetch_definitions_by_name(self, names):
+        """Return the definitions of attribute namespaces, by namespace."""
+        uri = "{0}/v1/attrName/batch".format(self._host)
+        found = {}
+        for start in range(0, len(names), BATCH_MAX_SIZE):
+            body = []
+            for ns in names[start : start + BATCH_MAX_SIZE]:
+                authority, _, name = ns.partition("/attr/")
+                body.append({"authority": authority, "name": name})
+            resp = self._send(http_post, uri, json=body)
+            if resp.status_code in (404, 405):
+                raise _BatchUnsupported(resp.status_code)
+            if resp.status_code != 200:
+                logger.debug(
+                    "--- Fetch attribute %s failed with status %s; reason [%s] ---",
+                    uri,
+                    resp.status_code,
+                    resp.reason,
+                )
+                raise _AuthorityUnavailable(resp.status_code)
+            for definition in resp.json():
+                key = (definition["authority"].lower(), definition["name"])
+                found.setdefault(key, []).append(definition)
+        logger.debug("Fetch attribute %s => %s", uri, found)
+        # Authorities are matched without regard to case, as the service does
+        result = {}
+        for ns in names:
+            (authority, _, name) = ns.partition("/attr/")
+            result[ns] = found.get((authority.lower(), name), [])
+        return result
+
+    def _definitions_by_name(self, names):
+        """Yield the definitions of each attribute namespace, in order."""
+        cached = {}
+        if self._cache is not None:
+            cached = {ns: self._cache.get(ns) for ns in names}
+        missing = [ns for ns in names if cached.get(ns) is None]
+        fetched = {}
+        if missing:
+            try:
+                fetched = self._fetch_definitions_by_name(missing)
+            except _AuthorityUnavailable:
+                fetched = {ns: self._last_known_definitions(ns) or [] for ns in missing}
+            except (RequestTimeoutError, InvalidAttributeError):
+                for ns in missing:
+                    fetched[ns] = self._last_known_definitions(ns)
+                    if fetched[ns] is None:
+                        raise
+            else:
+                for ns, definitions in fetched.items():
+                    self._remember_definitions(ns, definitions)
+                    if self._cache is not None:
+                        self._cache.set(ns, definitions)
+        for ns in names:
+            yield fetched[ns] if ns in fetched else cached[ns]
+
+    def _load_definitions_by_ns(self, namespace):
+        definitions = self._fetch_definition_from_authority_by_ns(namespace)
+        self._remember_definitions(namespace, definitions)
+        return definitions
+
+    def _remember_definitions(self, namespace, definitions):
+        digest = hashlib.sha256(
+            json.dumps(definitions, sort_keys=True).encode()
+        ).hexdigest()
+        previous = self._digests.get(namespace)
+        if previous is not None and previous != digest:
+            logger.info("Attribute definitions for [%s] changed", namespace)
+            invalidate_decisions()
+        self._digests.set(namespace, digest)
+        if self._last_known is not None:
+            self._last_known.set(namespace, definitions)
+
     def fetch_attributes(self, namespaces):
         """Fetch attribute definitions from authority for KAS to make rewrap decision."""
         logger.debug(
@@ -101,19 +258,86 @@ class OpenTDFAttrAuthorityPlugin(AbstractHealthzPlugin, AbstractRewrapPlugin):
             namespaces,
         )
 
-        attrs = []
-        namespaces = set(
-            [x if "/attr/" not in x else x.split("/attr/")[0] for x in namespaces]
+        if self._catalog is not None:
+            try:
+                return self._catalog.lookup(namespaces) or None
+            except CatalogUnavailable as err:
+                logger.warning("attr auth: %s; fetching from [%s]", err, self._host)
+                metrics.incr("attr_catalog.fallback")
+
+        parts = []
+        namespaces = set(namespaces)
+        if self._batch_lookup:
+            names = sorted(ns for ns in namespaces if "/attr/" in ns)
+            try:
+                parts.extend(self._definitions_by_name(names))
+                namespaces.difference_update(names)
+            except _BatchUnsupported:
+                logger.info("attr auth: no batch lookup at [%s]", self._host)
+                self._batch_lookup = False
+                parts = []
+        namespaces = sorted(
+            set([x if "/attr/" not in x else x.split("/attr/")[0] for x in namespaces])
         )
-        for namespace in namespaces:
-            ns_attrdefs = self._fetch_definition_from_authority_by_ns(namespace)
-            attrs = attrs + ns_attrdefs
+        if len(namespaces) > 1 and self._fetch_concurrency > 1:
+            fetched = self._fetch_concurrently(namespaces)
+        else:
+            fetched = (self._cached_definitions_by_ns(ns) for ns in namespaces)
+        parts.extend(fetched)
 
-        if len(attrs) == 0:
+        if not any(parts):
             return None
 
-        print(attrs)
-        return attrs
+        return combined_index(parts)
+
+    def _fetch_concurrently(self, namespaces):
+        """Yield the definitions of each namespace, in order, fetched at once."""
+        pool = self._get_pool()
+        futures = [pool.submit(self._cached_definitions_by_ns, ns) for ns in namespaces]
+        _, late = concurrent.futures.wait(futures, timeout=self._fetch_deadline)
+        for future in late:
+            future.cancel()
+        for namespace, future in zip(namespaces, futures):
+            if future not in late:
+                yield future.result()
+                continue
+            logger.warning("attr auth: deadline passed fetching [%s]", namespace)
+            definitions = self._last_known_definitions(namespace)
+            if definitions is None:
+                raise RequestTimeoutError("Fetch attributes request timed out")
+            yield definitions
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._fetch_concurrency,
+                    thread_name_prefix="attr-authority",
+                )
+            return self._pool
+
+    def _cached_definitions_by_ns(self, namespace):
+        try:
+            if self._cache is None:
+                return self._load_definitions_by_ns(namespace)
+            return self._cache.get_or_load(namespace, self._load_definitions_by_ns)
+        except _AuthorityUnavailable:
+            return self._last_known_definitions(namespace) or []
+        except (RequestTimeoutError, InvalidAttributeError):
+            definitions = self._last_known_definitions(namespace)
+            if definitions is None:
+                raise
+            return definitions
+
+    def _last_known_definitions(self, namespace):
+        """Return the definitions last fetched for namespace, if allowed."""
+        if self._last_known is None:
+            return None
+        definitions = self._last_known.get(namespace)
+        if definitions is not None:
+            logger.warning("attr auth: using last known definitions [%s]", namespace)
+            metrics.incr("attr_authority.fallback")
+        return definitions
 
     def update(self, req, res):
         """We use the default rewrap behavior."""
@@ -125,26 +349,9 @@ class OpenTDFAttrAuthorityPlugin(AbstractHealthzPlugin, AbstractRewrapPlugin):
             logger.debug("--- Ping OpenTDF Attribute authority ---")
 
             uri = "{0}/healthz".format(self._host)
-            ca_cert_path = os.environ.get("CA_CERT_PATH")
-            client_cert_path = os.environ.get("CLIENT_CERT_PATH")
-            client_key_path = os.environ.get("CLIENT_KEY_PATH")
-
-            if client_cert_path and client_key_path:
-                logger.debug("Using cert auth for url:%s", uri)
-                resp = requests.get(
-                    uri,
-                    headers=self._headers,
-                    timeout=self._timeout,
-                    cert=(client_cert_path, client_key_path),
-                    verify=ca_cert_path,
-                )
-            else:
-                resp = requests.get(
-                    uri,
-                    headers=self._headers,
-                    timeout=self._timeout,
-                    verify=ca_cert_path,
-                )
+            resp = http_get(
+                uri, headers=self._headers, timeout=self._timeout, mtls=True
+            )
 
             if 200 <= resp.status_code < 300:
                 logger.debug("--- Ping OpenTDF Attribute authority successful --- ")
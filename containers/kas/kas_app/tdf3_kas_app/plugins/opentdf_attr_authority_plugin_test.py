@@ -1,6 +1,7 @@
 """Test the OpenTDF attribute authority plugin."""
 
 import pytest
+import time
 
 from unittest.mock import patch, Mock
 
@@ -8,6 +9,9 @@ import requests
 
 from tdf3_kas_core.errors import InvalidAttributeError
 from tdf3_kas_core.errors import RequestTimeoutError
+from tdf3_kas_core.errors import ServerStartupError
+from tdf3_kas_core.models import AttributeDefinitionIndex
+from .attribute_catalog import CatalogUnavailable
 from .opentdf_attr_authority_plugin import OpenTDFAttrAuthorityPlugin
 
 HOST = "http://localhost:4010"
@@ -37,6 +41,16 @@ ATTRIBUTES = [
     },
 ]
 
+
+@pytest.fixture(autouse=True)
+def no_batch_lookup():
+    """Answer batch lookups as an attribute service without them would."""
+    with patch.object(
+        requests.Session, "post", return_value=Mock(status_code=404)
+    ) as mock_post:
+        yield mock_post
+
+
 # ATTRIBUTES = {
 #     "https://acme.com/attr/IntellectualProperty": {
 #         "rule": "hierarchy",
@@ -54,7 +68,7 @@ def test_otdf_plugin_constructor():
     assert actual._host == HOST
 
 
-@patch.object(requests, "get", return_value=Mock(status_code=404))
+@patch.object(requests.Session, "get", return_value=Mock(status_code=404))
 def test_fetch_attributes_404(mock_request):
     actual = OpenTDFAttrAuthorityPlugin(HOST)
     result = actual.fetch_attributes([])
@@ -73,7 +87,7 @@ def mocked_requests_response(*args, **kwargs):
     return MockResponse(ATTRIBUTES, 200)
 
 
-@patch.object(requests, "get", side_effect=mocked_requests_response)
+@patch.object(requests.Session, "get", side_effect=mocked_requests_response)
 def test_fetch_attributes_200_status(mock_request):
     actual = OpenTDFAttrAuthorityPlugin(HOST)
     attributes = actual.fetch_attributes(NAMESPACES)
@@ -82,22 +96,247 @@ def test_fetch_attributes_200_status(mock_request):
     assert "authority" in attributes[1]
 
 
-@patch.object(requests, "get", side_effect=requests.exceptions.ReadTimeout)
+@patch.object(requests.Session, "get", side_effect=requests.exceptions.ReadTimeout)
 def test_fetch_attributes_read_timeout_exception(mock_request):
     actual = OpenTDFAttrAuthorityPlugin(HOST)
     with pytest.raises(RequestTimeoutError):
         actual.fetch_attributes(NAMESPACES)
 
 
-@patch.object(requests, "get", side_effect=requests.exceptions.ConnectTimeout)
+@patch.object(requests.Session, "get", side_effect=requests.exceptions.ConnectTimeout)
 def test_fetch_attributes_connect_timeout_exception(mock_request):
     actual = OpenTDFAttrAuthorityPlugin(HOST)
     with pytest.raises(RequestTimeoutError):
         actual.fetch_attributes(NAMESPACES)
 
 
-@patch.object(requests, "get", side_effect=requests.exceptions.RequestException)
+@patch.object(requests.Session, "get", side_effect=requests.exceptions.RequestException)
 def test_fetch_attributes_request_exception(mock_request):
     actual = OpenTDFAttrAuthorityPlugin(HOST)
     with pytest.raises(InvalidAttributeError):
         actual.fetch_attributes(NAMESPACES)
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_requests_response)
+def test_fetch_attributes_cached(mock_request):
+    actual = OpenTDFAttrAuthorityPlugin(HOST)
+    actual.fetch_attributes(NAMESPACES)
+    attributes = actual.fetch_attributes(NAMESPACES)
+    assert len(attributes) == 4
+    assert mock_request.call_count == 2
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_requests_response)
+def test_fetch_attributes_cache_disabled(mock_request):
+    actual = OpenTDFAttrAuthorityPlugin(HOST, cache_ttl=0)
+    actual.fetch_attributes(NAMESPACES)
+    actual.fetch_attributes(NAMESPACES)
+    assert mock_request.call_count == 4
+
+
+@patch.object(requests.Session, "get", return_value=Mock(status_code=404))
+def test_fetch_attributes_404_cached(mock_request):
+    actual = OpenTDFAttrAuthorityPlugin(HOST)
+    assert actual.fetch_attributes(NAMESPACES) is None
+    assert actual.fetch_attributes(NAMESPACES) is None
+    assert mock_request.call_count == 2
+
+
+@patch.object(requests.Session, "get", return_value=Mock(status_code=503))
+def test_fetch_attributes_503_not_cached(mock_request):
+    actual = OpenTDFAttrAuthorityPlugin(HOST)
+    assert actual.fetch_attributes(NAMESPACES) is None
+    assert actual.fetch_attributes(NAMESPACES) is None
+    assert mock_request.call_count == 4
+
+
+@patch(
+    "tdf3_kas_app.plugins.opentdf_attr_authority_plugin.invalidate_decisions"
+)
+def test_fetch_attributes_changed_invalidates_decisions(mock_invalidate):
+    responses = [ATTRIBUTES[:1], ATTRIBUTES[:1], ATTRIBUTES]
+    mock_get = Mock(
+        side_effect=lambda *args, **kwargs: Mock(
+            status_code=200, json=Mock(return_value=responses.pop(0))
+        )
+    )
+    with patch.object(requests.Session, "get", mock_get):
+        actual = OpenTDFAttrAuthorityPlugin(HOST, cache_ttl=0)
+        actual.fetch_attributes(NAMESPACES[:1])
+        actual.fetch_attributes(NAMESPACES[:1])
+        mock_invalidate.assert_not_called()
+        actual.fetch_attributes(NAMESPACES[:1])
+        mock_invalidate.assert_called_once()
+
+
+def test_otdf_plugin_unknown_partial_failure():
+    with pytest.raises(ServerStartupError):
+        OpenTDFAttrAuthorityPlugin(HOST, partial_failure="ignore")
+
+
+def slow_requests_response(*args, **kwargs):
+    time.sleep(0.2)
+    return mocked_requests_response()
+
+
+@patch.object(requests.Session, "get", side_effect=slow_requests_response)
+def test_fetch_attributes_concurrently(mock_request):
+    actual = OpenTDFAttrAuthorityPlugin(HOST, cache_ttl=0)
+    start = time.perf_counter()
+    attributes = actual.fetch_attributes(NAMESPACES)
+    assert time.perf_counter() - start < 0.35
+    assert len(attributes) == 4
+    assert mock_request.call_count == 2
+
+
+@patch.object(requests.Session, "get", side_effect=slow_requests_response)
+def test_fetch_attributes_deadline(mock_request):
+    actual = OpenTDFAttrAuthorityPlugin(HOST, cache_ttl=0, fetch_deadline=0.05)
+    with pytest.raises(RequestTimeoutError):
+        actual.fetch_attributes(NAMESPACES)
+
+
+def test_fetch_attributes_partial_failure_cache():
+    responses = [mocked_requests_response(), requests.exceptions.ReadTimeout()]
+    mock_get = Mock(side_effect=responses)
+    with patch.object(requests.Session, "get", mock_get):
+        actual = OpenTDFAttrAuthorityPlugin(HOST, cache_ttl=0, partial_failure="cache")
+        assert actual.fetch_attributes(NAMESPACES[:1]) == ATTRIBUTES
+        # The authority is down; its last definitions are used
+        assert actual.fetch_attributes(NAMESPACES[:1]) == ATTRIBUTES
+        # An authority never reached still fails
+        mock_get.side_effect = requests.exceptions.ReadTimeout
+        with pytest.raises(RequestTimeoutError):
+            actual.fetch_attributes(NAMESPACES[1:])
+
+
+def test_fetch_attributes_partial_failure_fail():
+    responses = [mocked_requests_response(), requests.exceptions.ReadTimeout()]
+    with patch.object(requests.Session, "get", Mock(side_effect=responses)):
+        actual = OpenTDFAttrAuthorityPlugin(HOST, cache_ttl=0)
+        assert actual.fetch_attributes(NAMESPACES[:1]) == ATTRIBUTES
+        with pytest.raises(RequestTimeoutError):
+            actual.fetch_attributes(NAMESPACES[:1])
+
+
+def batch_response(*args, json=None, **kwargs):
+    known = {(a["authority"], a["name"]): a for a in BATCH_ATTRIBUTES}
+    found = [
+        known[(n["authority"], n["name"])]
+        for n in json
+        if (n["authority"], n["name"]) in known
+    ]
+    return Mock(status_code=200, json=Mock(return_value=found))
+
+
+BATCH_ATTRIBUTES = [
+    {
+        "authority": "https://acme.com",
+        "name": "IntellectualProperty",
+        "rule": "hierarchy",
+        "state": "published",
+        "order": ["TradeSecret", "Open"],
+    },
+    {
+        "authority": "https://acme.mil",
+        "name": "AcmeRestrictions",
+        "rule": "allOf",
+    },
+]
+
+
+@patch.object(requests.Session, "get")
+@patch.object(requests.Session, "post", side_effect=batch_response)
+def test_fetch_attributes_batch(mock_post, mock_get):
+    actual = OpenTDFAttrAuthorityPlugin(HOST)
+    assert actual.fetch_attributes(NAMESPACES) == BATCH_ATTRIBUTES
+    assert mock_post.call_count == 1
+    assert mock_post.call_args.kwargs["json"] == [
+        {"authority": "https://acme.com", "name": "IntellectualProperty"},
+        {"authority": "https://acme.mil", "name": "AcmeRestrictions"},
+    ]
+    # Cached by name
+    assert actual.fetch_attributes(NAMESPACES[:1]) == BATCH_ATTRIBUTES[:1]
+    assert mock_post.call_count == 1
+    mock_get.assert_not_called()
+
+
+@patch.object(requests.Session, "post", side_effect=batch_response)
+def test_fetch_attributes_batch_unknown_name(mock_post):
+    actual = OpenTDFAttrAuthorityPlugin(HOST)
+    assert actual.fetch_attributes(["https://acme.com/attr/Unknown"]) is None
+    assert actual.fetch_attributes(["https://acme.com/attr/Unknown"]) is None
+    assert mock_post.call_count == 1
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_requests_response)
+def test_fetch_attributes_batch_unsupported(mock_get, no_batch_lookup):
+    actual = OpenTDFAttrAuthorityPlugin(HOST, cache_ttl=0)
+    assert len(actual.fetch_attributes(NAMESPACES)) == 4
+    assert len(actual.fetch_attributes(NAMESPACES)) == 4
+    # Asked once, then fetched by authority
+    assert no_batch_lookup.call_count == 1
+    assert mock_get.call_count == 4
+
+
+@patch.object(requests.Session, "post", return_value=Mock(status_code=503))
+def test_fetch_attributes_batch_503_not_cached(mock_post):
+    actual = OpenTDFAttrAuthorityPlugin(HOST)
+    assert actual.fetch_attributes(NAMESPACES) is None
+    assert actual.fetch_attributes(NAMESPACES) is None
+    assert mock_post.call_count == 2
+
+
+def test_fetch_attributes_batch_partial_failure_cache():
+    responses = [batch_response, requests.exceptions.ReadTimeout()]
+
+    def post(*args, **kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response(*args, **kwargs)
+
+    with patch.object(requests.Session, "post", side_effect=post):
+        actual = OpenTDFAttrAuthorityPlugin(HOST, cache_ttl=0, partial_failure="cache")
+        assert actual.fetch_attributes(NAMESPACES) == BATCH_ATTRIBUTES
+        assert actual.fetch_attributes(NAMESPACES) == BATCH_ATTRIBUTES
+
+
+def test_fetch_attributes_batch_authority_case():
+    # The service matches authorities without regard to case
+    mock_post = Mock(
+        return_value=Mock(status_code=200, json=Mock(return_value=BATCH_ATTRIBUTES[:1]))
+    )
+    namespace = "https://ACME.com/attr/IntellectualProperty"
+    with patch.object(requests.Session, "post", mock_post):
+        actual = OpenTDFAttrAuthorityPlugin(HOST)
+        assert actual.fetch_attributes([namespace]) == BATCH_ATTRIBUTES[:1]
+        assert actual.fetch_attributes([namespace]) == BATCH_ATTRIBUTES[:1]
+    assert mock_post.call_count == 1
+
+
+def test_fetch_attributes_from_catalog():
+    catalog = Mock(lookup=Mock(return_value=ATTRIBUTES))
+    with patch.object(requests.Session, "get") as mock_get:
+        actual = OpenTDFAttrAuthorityPlugin(HOST, catalog=catalog)
+        assert actual.fetch_attributes(NAMESPACES) == ATTRIBUTES
+    catalog.lookup.assert_called_once_with(NAMESPACES)
+    mock_get.assert_not_called()
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_requests_response)
+def test_fetch_attributes_catalog_unavailable(mock_get):
+    catalog = Mock(lookup=Mock(side_effect=CatalogUnavailable("stale")))
+    actual = OpenTDFAttrAuthorityPlugin(HOST, catalog=catalog)
+    assert len(actual.fetch_attributes(NAMESPACES)) == 4
+    assert mock_get.call_count == 2
+
+
+@patch.object(requests.Session, "get", side_effect=mocked_requests_response)
+def test_fetch_attributes_index_is_shared(mock_get):
+    actual = OpenTDFAttrAuthorityPlugin(HOST)
+    index = actual.fetch_attributes(NAMESPACES)
+    assert isinstance(index, AttributeDefinitionIndex)
+    # Answered from the same cached definitions, the index is not rebuilt
+    assert actual.fetch_attributes(list(reversed(NAMESPACES))) is index
+    assert actual.fetch_attributes(NAMESPACES[:1]) is not index
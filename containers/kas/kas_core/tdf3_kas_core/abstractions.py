@@ -78,6 +78,9 @@ class AbstractRewrapPlugin(AbstractPlugin):
              state: Optional[str]
              group_by: Optional[AnyUrl]
 
+        Plugins that answer from cached definitions can return an
+        AttributeDefinitionIndex instead, built with combined_index, so the
+        definitions are not indexed again on every request.
         """
         logger.warning(
             "AbstractUpsertPlugin fetch_attributes method was called on [%s]",
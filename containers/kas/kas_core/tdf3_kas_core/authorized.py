@@ -1,19 +1,28 @@
 """Authorized function."""
 
+import copy
+import hashlib
 import jwt
 import logging
 import os
 import re
+import threading
+import time
+
 import requests
 
+from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.types import PublicKeyTypes
 from datetime import datetime, timedelta
+from jwt.jwk_set_cache import JWKSetCache
 
 from tdf3_kas_core.errors import AuthorizationError
 from tdf3_kas_core.errors import JWTError
 from tdf3_kas_core.errors import UnauthorizedError
 from tdf3_kas_core.keycloak import fetch_realm_key_by_jwt
 from tdf3_kas_core.models.key_master.key_master import KeyMaster
+from tdf3_kas_core.util import TTLCache
+from tdf3_kas_core.util import http_get
 
 
 logger = logging.getLogger(__name__)
@@ -97,11 +106,35 @@ def authorized(public_key, auth_token) -> bool:
         raise AuthorizationError("Not authorized") from e
 
 
-def oidc_discovery(server: str) -> dict:
-    """Looks up the OIDC Discovery information for the given OpenId provider"""
-    # https://openid.net/specs/openid-connect-discovery-1_0.html
-    cfg_url = f'{server.removesuffix("/")}/.well-known/openid-configuration'
-    r = requests.get(cfg_url, headers={"content-type": "application/json"})
+# Discovery documents and key sets are kept for the max-age the IdP sends in
+# Cache-Control, up to oidc_cache_max_ttl, or for oidc_cache_ttl if it sends
+# none. An unknown `kid` refetches the key set, but never more often than
+# jwks_min_refresh_interval, so a burst of tokens signed with a new (or
+# bogus) key costs one request to the IdP.
+oidc_cache_ttl = int(os.environ.get("KAS_OIDC_CACHE_TTL", "300"))
+oidc_cache_max_ttl = int(os.environ.get("KAS_OIDC_CACHE_MAX_TTL", "86400"))
+jwks_min_refresh_interval = float(
+    os.environ.get("KAS_JWKS_MIN_REFRESH_INTERVAL", "10")
+)
+
+
+def cache_max_age(headers) -> int:
+    """Return how many seconds a response may be cached, per Cache-Control."""
+    directives = {}
+    for directive in (headers.get("cache-control") or "").split(","):
+        name, _, value = directive.partition("=")
+        directives[name.strip().lower()] = value.strip().strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        return 0
+    try:
+        max_age = int(directives["max-age"])
+    except (KeyError, ValueError):
+        return oidc_cache_ttl
+    return min(max(max_age, 0), oidc_cache_max_ttl)
+
+
+def _load_oidc_discovery(cfg_url: str):
+    r = http_get(cfg_url, headers={"content-type": "application/json"})
     if r.status_code == 200:
         if "application/json" in r.headers["content-type"]:
             values = r.json()
@@ -113,15 +146,80 @@ def oidc_discovery(server: str) -> dict:
             )
             raise UnauthorizedError("oidc discovery: unrecognized content type")
     elif r.status_code >= 400:
-        logger.warning("oidc discovery: [%s] from [%s]", r.status_code, server)
+        logger.warning("oidc discovery: [%s] from [%s]", r.status_code, cfg_url)
         raise UnauthorizedError(f"oidc discovery: {r.status_code} from backend")
     else:
         raise UnauthorizedError("oidc discovery: network failure")
+    return values, cache_max_age(r.headers)
+
+
+# Keyed by discovery URL; values are (document, max_age) pairs.
+discovery_cache = TTLCache(
+    maxsize=64, ttl=oidc_cache_ttl, ttl_for=lambda entry: entry[1]
+)
+
+
+def oidc_discovery(server: str) -> dict:
+    """Looks up the OIDC Discovery information for the given OpenId provider"""
+    # https://openid.net/specs/openid-connect-discovery-1_0.html
+    cfg_url = f'{server.removesuffix("/")}/.well-known/openid-configuration'
+    values, _ = discovery_cache.get_or_load(cfg_url, _load_oidc_discovery)
     return values
 
 
+class CachingJWKClient(jwt.PyJWKClient):
+    """A PyJWKClient that fetches over the pooled session.
+
+    The key set is kept as long as the IdP's Cache-Control allows, and is
+    fetched at most once per `min_refresh_interval` seconds however many
+    callers ask for a key it does not hold.
+    """
+
+    def __init__(self, uri, *, min_refresh_interval=None, timer=time.monotonic):
+        """Construct a client for the key set at uri."""
+        super().__init__(uri, cache_jwk_set=True, lifespan=oidc_cache_ttl or 1)
+        if min_refresh_interval is None:
+            min_refresh_interval = jwks_min_refresh_interval
+        self.__min_refresh_interval = min_refresh_interval
+        self.__timer = timer
+        self.__lock = threading.Lock()
+        self.__fetched_at = None
+        self.__jwk_set = None
+
+    def fetch_data(self):
+        """Fetch the key set, unless it was fetched too recently."""
+        with self.__lock:
+            now = self.__timer()
+            if (
+                self.__jwk_set is not None
+                and now - self.__fetched_at < self.__min_refresh_interval
+            ):
+                return self.__jwk_set
+            try:
+                r = http_get(self.uri, headers=self.headers)
+            except requests.exceptions.RequestException as e:
+                raise jwt.exceptions.PyJWKClientConnectionError(
+                    f'Fail to fetch data from the url, err: "{e}"'
+                ) from e
+            if r.status_code != 200:
+                raise jwt.exceptions.PyJWKClientConnectionError(
+                    f"Fail to fetch data from the url, status: {r.status_code}"
+                )
+            jwk_set = r.json()
+            lifespan = max(cache_max_age(r.headers), self.__min_refresh_interval)
+            self.jwk_set_cache = JWKSetCache(lifespan)
+            self.jwk_set_cache.put(jwk_set)
+            self.__jwk_set = jwk_set
+            self.__fetched_at = now
+            return jwk_set
+
+
+# Keyed by jwks_uri. Each client expires its own key set.
+jwks_clients = TTLCache(maxsize=64, ttl=None)
+
+
 def jwt_verifier_key(
-    issuer: str, discovery_base: str | None, idpJWT: str | bytes
+    issuer: str, discovery_base: str | None, idpJWT: str | bytes, *, refresh=False
 ) -> PublicKeyTypes:
     logger.debug("jwt_verifier_key([%s], [%s], [%s]", issuer, discovery_base, idpJWT)
     # We must extract `iss` without validating the JWT,
@@ -138,9 +236,14 @@ def jwt_verifier_key(
         raise UnauthorizedError("Invalid auth header")
     oidc_config = oidc_discovery(discovery_base or issuer)
     # TODO Verify issuer matches oidc_config issuer field
-    # TODO Cache jwks_client by uri
-    jwks_client = jwt.PyJWKClient(oidc_config["jwks_uri"])
-    jwk = jwks_client.get_signing_key_from_jwt(idpJWT)
+    jwks_client = jwks_clients.get_or_load(oidc_config["jwks_uri"], CachingJWKClient)
+    try:
+        if refresh:
+            jwks_client.get_jwk_set(refresh=True)
+        jwk = jwks_client.get_signing_key_from_jwt(idpJWT)
+    except jwt.exceptions.PyJWKClientError as e:
+        logger.warning("No signing key for token from [%s]: %s", issuer_url, e)
+        raise UnauthorizedError("Invalid auth header") from e
     return jwk.key
 
 
@@ -154,18 +257,89 @@ def _get_single_auth_host():
 
 # For compatibility, this can look up a key from the OIDC_ISSUER_URL
 # (single oauth2 host) or via the OIDC_SERVER_URL (multiple 'realms' for keycloak)
-def issuer_verifier_key(id_jwt: str | bytes, key_master: KeyMaster):
+#
+# With refresh, cached keys are refetched (subject to rate limits).
+def issuer_verifier_key(id_jwt: str | bytes, key_master: KeyMaster, *, refresh=False):
     oidc_host = _get_single_auth_host()
     if oidc_host:
         discovery_base = os.environ.get("OIDC_DISCOVERY_BASE_URL")
-        return jwt_verifier_key(oidc_host, discovery_base, id_jwt)
+        return jwt_verifier_key(oidc_host, discovery_base, id_jwt, refresh=refresh)
     keycloak_host = _get_keycloak_host()
     if keycloak_host:
-        return fetch_realm_key_by_jwt(keycloak_host, id_jwt, key_master)
+        return fetch_realm_key_by_jwt(
+            keycloak_host, id_jwt, key_master, refresh=refresh
+        )
     raise UnauthorizedError("Issuer Invalid")
 
 
+def verify_issuer_jwt(id_jwt: str | bytes, key_master: KeyMaster) -> dict:
+    """Verify id_jwt with its issuer's key and return its claims.
+
+    If the signature does not match a cached key, the key is fetched again
+    once, in case the issuer has rotated it.
+    """
+    public_key = issuer_verifier_key(id_jwt, key_master)
+    if not public_key:
+        raise UnauthorizedError("Invalid auth header")
+    try:
+        return authorized_v2(public_key, id_jwt)
+    except UnauthorizedError as e:
+        if not isinstance(e.__cause__, jwt.exceptions.InvalidSignatureError):
+            raise
+        refreshed_key = issuer_verifier_key(id_jwt, key_master, refresh=True)
+        # A refresh builds a new key object even when the key is unchanged
+        if not refreshed_key or _key_bytes(refreshed_key) == _key_bytes(public_key):
+            raise
+    logger.info("Retrying token verification with a refreshed issuer key")
+    return authorized_v2(refreshed_key, id_jwt)
+
+
+# Claims of tokens that have already verified, keyed by a hash of the key and
+# the token, so a client sending the same bearer token with every request
+# (and DPoP validation re-checking it within one) pays for the signature
+# check once. Entries never outlive the token's `exp`; a TTL of 0 disables
+# the cache.
+verified_token_ttl = int(os.environ.get("KAS_VERIFIED_TOKEN_CACHE_TTL", "60"))
+verified_token_cache_size = int(
+    os.environ.get("KAS_VERIFIED_TOKEN_CACHE_SIZE", "4096")
+)
+verified_tokens = TTLCache(maxsize=verified_token_cache_size, ttl=verified_token_ttl)
+
+
+def _key_bytes(public_key) -> bytes:
+    if hasattr(public_key, "public_bytes"):
+        return public_key.public_bytes(
+            serialization.Encoding.DER,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    return str(public_key).encode()
+
+
+def _verified_token_key(public_key, auth_token) -> bytes:
+    h = hashlib.sha256()
+    h.update(_key_bytes(public_key))
+    h.update(b".")
+    h.update(auth_token if isinstance(auth_token, bytes) else auth_token.encode())
+    return h.digest()
+
+
+def _remember_verified(cache_key: bytes, decoded: dict):
+    ttl = verified_token_ttl
+    if "exp" in decoded:
+        try:
+            ttl = min(ttl, float(decoded["exp"]) - time.time())
+        except (TypeError, ValueError):
+            return
+    if ttl > 0:
+        verified_tokens.set(cache_key, copy.deepcopy(decoded), ttl=ttl)
+
+
 def authorized_v2(public_key: PublicKeyTypes, auth_token: str | bytes) -> dict:
+    if verified_token_ttl > 0:
+        cache_key = _verified_token_key(public_key, auth_token)
+        cached = verified_tokens.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
     try:
         decoded = jwt.decode(
             auth_token,
@@ -190,4 +364,6 @@ def authorized_v2(public_key: PublicKeyTypes, auth_token: str | bytes) -> dict:
                 public_key,
             )
             raise UnauthorizedError("Not authorized") from e2
+    if verified_token_ttl > 0:
+        _remember_verified(cache_key, decoded)
     return decoded
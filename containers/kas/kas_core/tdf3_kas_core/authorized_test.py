@@ -1,6 +1,11 @@
 """Test the authorization process between client and KAS."""
 
+import jwt
 import pytest
+import requests
+
+from cryptography.hazmat.primitives import serialization
+from unittest.mock import MagicMock, patch
 
 from tdf3_kas_core.authorized import pack_rs256_jwt
 from tdf3_kas_core.errors import AuthorizationError
@@ -33,6 +38,30 @@ D54ic3t2yZtcN8dqe26LA
 """
 
 
+@pytest.fixture
+def oidc_caches():
+    authorized.discovery_cache.clear()
+    authorized.jwks_clients.clear()
+    yield
+    authorized.discovery_cache.clear()
+    authorized.jwks_clients.clear()
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def verified_tokens():
+    authorized.verified_tokens.clear()
+    yield authorized.verified_tokens
+    authorized.verified_tokens.clear()
+
+
 @pytest.fixture
 def no_leeway():
     old_value = authorized.leeway
@@ -102,3 +131,143 @@ def test_jwt_utilities_rs256_unpack_expiration_leeway(private_key, public_key):
     jwt = authorized.pack_rs256_jwt(expected, private_key, exp_sec=-1)
     actual = authorized.unpack_rs256_jwt(jwt, public_key)
     assert actual == expected
+
+
+def test_cache_max_age():
+    assert authorized.cache_max_age({"cache-control": "public, max-age=60"}) == 60
+    assert authorized.cache_max_age({"cache-control": "no-cache"}) == 0
+    assert authorized.cache_max_age({"cache-control": "no-store, max-age=60"}) == 0
+    assert authorized.cache_max_age({}) == authorized.oidc_cache_ttl
+    assert authorized.cache_max_age({"cache-control": "max-age=x"}) == (
+        authorized.oidc_cache_ttl
+    )
+    assert authorized.cache_max_age({"cache-control": "max-age=9999999"}) == (
+        authorized.oidc_cache_max_ttl
+    )
+
+
+@patch.object(requests.Session, "get")
+def test_oidc_discovery_cached(mock_get, oidc_caches):
+    mock_get.return_value = MagicMock(
+        status_code=200,
+        headers={"content-type": "application/json", "cache-control": "max-age=60"},
+        json=lambda: {"jwks_uri": "https://idp/certs"},
+    )
+    assert authorized.oidc_discovery("https://idp/")["jwks_uri"] == "https://idp/certs"
+    assert authorized.oidc_discovery("https://idp")["jwks_uri"] == "https://idp/certs"
+    assert mock_get.call_count == 1
+
+
+@patch.object(requests.Session, "get")
+def test_oidc_discovery_errors_not_cached(mock_get, oidc_caches):
+    mock_get.return_value = MagicMock(status_code=503, headers={})
+    with pytest.raises(UnauthorizedError):
+        authorized.oidc_discovery("https://idp")
+    with pytest.raises(UnauthorizedError):
+        authorized.oidc_discovery("https://idp")
+    assert mock_get.call_count == 2
+
+
+@patch.object(requests.Session, "get")
+def test_jwks_refresh_rate_limited(mock_get, public_key_jwk_sig):
+    mock_get.return_value = MagicMock(
+        status_code=200,
+        headers={"cache-control": "max-age=600"},
+        json=lambda: {"keys": [public_key_jwk_sig]},
+    )
+    timer = FakeTimer()
+    client = authorized.CachingJWKClient(
+        "https://idp/certs", min_refresh_interval=10, timer=timer
+    )
+    assert client.get_signing_key("a")
+    assert mock_get.call_count == 1
+    for _ in range(5):
+        with pytest.raises(jwt.exceptions.PyJWKClientError):
+            client.get_signing_key("rotated")
+    assert mock_get.call_count == 1
+    timer.now += 11
+    with pytest.raises(jwt.exceptions.PyJWKClientError):
+        client.get_signing_key("rotated")
+    assert mock_get.call_count == 2
+
+
+@patch.object(requests.Session, "get")
+def test_jwks_fetch_failure(mock_get):
+    mock_get.return_value = MagicMock(status_code=500, headers={})
+    client = authorized.CachingJWKClient("https://idp/certs")
+    with pytest.raises(jwt.exceptions.PyJWKClientConnectionError):
+        client.get_signing_key("a")
+
+
+def test_verify_issuer_jwt_refreshes_rotated_key(
+    monkeypatch, private_key, public_key, entity_public_key
+):
+    token = pack_rs256_jwt({"sub": "alice"}, private_key, exp_sec=60)
+    refreshes = []
+
+    def verifier_key(id_jwt, key_master, *, refresh=False):
+        refreshes.append(refresh)
+        return public_key if refresh else entity_public_key
+
+    monkeypatch.setattr(authorized, "issuer_verifier_key", verifier_key)
+    assert authorized.verify_issuer_jwt(token, None)["sub"] == "alice"
+    assert refreshes == [False, True]
+
+
+def test_verify_issuer_jwt_unchanged_key(monkeypatch, private_key, entity_public_key):
+    token = pack_rs256_jwt({"sub": "alice"}, private_key, exp_sec=60)
+    pem = entity_public_key.public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    # Each fetch returns a new object for the same key
+    monkeypatch.setattr(
+        authorized,
+        "issuer_verifier_key",
+        lambda *a, **k: serialization.load_pem_public_key(pem),
+    )
+    checks = []
+    authorized_v2 = authorized.authorized_v2
+
+    def counted(public_key, auth_token):
+        checks.append(public_key)
+        return authorized_v2(public_key, auth_token)
+
+    monkeypatch.setattr(authorized, "authorized_v2", counted)
+    with pytest.raises(UnauthorizedError):
+        authorized.verify_issuer_jwt(token, None)
+    assert len(checks) == 1
+
+
+def test_verify_issuer_jwt_no_key(monkeypatch, private_key):
+    token = pack_rs256_jwt({}, private_key, exp_sec=60)
+    monkeypatch.setattr(authorized, "issuer_verifier_key", lambda *a, **k: None)
+    with pytest.raises(UnauthorizedError):
+        authorized.verify_issuer_jwt(token, None)
+
+
+def test_authorized_v2_caches_verified_token(
+    monkeypatch, verified_tokens, private_key, public_key, entity_public_key
+):
+    token = pack_rs256_jwt({"sub": "alice"}, private_key, exp_sec=60)
+    decode = authorized.jwt.decode
+    calls = []
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(authorized.jwt, "decode", counting_decode)
+    claims = authorized.authorized_v2(public_key, token)
+    claims["sub"] = "mallory"
+    assert authorized.authorized_v2(public_key, token)["sub"] == "alice"
+    assert len(calls) == 1
+    with pytest.raises(UnauthorizedError):
+        authorized.authorized_v2(entity_public_key, token)
+
+
+def test_authorized_v2_does_not_cache_past_exp(
+    verified_tokens, private_key, public_key
+):
+    token = pack_rs256_jwt({"sub": "alice"}, private_key, exp_sec=-1)
+    assert authorized.authorized_v2(public_key, token)["sub"] == "alice"
+    assert len(verified_tokens) == 0
@@ -9,7 +9,7 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from jwt import PyJWK, PyJWS, PyJWT
 
-from .authorized import authorized_v2, issuer_verifier_key, looks_like_jwt
+from .authorized import looks_like_jwt, verify_issuer_jwt
 from .errors import UnauthorizedError
 
 logger = logging.getLogger(__name__)
@@ -72,8 +72,7 @@ def validate_dpop(dpop, key_master, request=connexion.request, do_oidc=False):
         if do_oidc:
             raise UnauthorizedError("Invalid auth header")
         return False
-    verifier_key = issuer_verifier_key(id_jwt, key_master)
-    jwt_decoded = authorized_v2(verifier_key, id_jwt)
+    jwt_decoded = verify_issuer_jwt(id_jwt, key_master)
     logger.debug("jwt_decoded: [%s]", jwt_decoded)
     cnf = jwt_decoded.get("cnf", None)
     # NOTE: Somehow the dpop field isn't populated yet? What am I doing wrong
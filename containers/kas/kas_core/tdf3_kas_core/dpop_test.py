@@ -1,7 +1,6 @@
 import json
 import logging
 import os
-from urllib.error import URLError
 import pytest
 
 from cryptography.hazmat.primitives import serialization
@@ -11,6 +10,7 @@ from jwt import PyJWKSet, PyJWT
 from jwt.algorithms import RSAAlgorithm
 from unittest.mock import MagicMock, patch
 
+from . import authorized
 from .dpop import canonical, jwk_thumbprint, jws_sha, validate_dpop
 from .errors import UnauthorizedError
 from .models.key_master.key_master import KeyMaster
@@ -21,6 +21,17 @@ logger = logging.getLogger(__name__)
 keys = KeyMaster()
 
 
+@pytest.fixture(autouse=True)
+def clear_oidc_caches():
+    authorized.discovery_cache.clear()
+    authorized.jwks_clients.clear()
+    authorized.verified_tokens.clear()
+    yield
+    authorized.discovery_cache.clear()
+    authorized.jwks_clients.clear()
+    authorized.verified_tokens.clear()
+
+
 @pytest.fixture
 def with_single_auth(monkeypatch):
     """Set an environment variable and restore it to its previous value after the test."""
@@ -220,43 +231,24 @@ def mocked_requests_get(*args, **kwargs):
     return MockResponse(None, 404)
 
 
-class MockUrllibResponse:
-    def __init__(self, json_data, status_code, headers=None):
-        self.json_data = json_data
-        self.status_code = status_code
-        self.headers = headers or {}
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, type, value, tb):
-        pass
-
-    def __str__(self):
-        return json.dumps(self.json_data)
-
-    def read(self):
-        return str(self)
-
-    def json(self):
-        return self.json_data
-
-
-@patch("urllib.request.urlopen")
-@patch("requests.get", side_effect=mocked_requests_get)
+@patch("requests.Session.get")
 def test_validate_dpop_happy_path_single_auth(
-    mock_get, mock_urlopen, with_single_auth, private_key, public_key_jwk_sig
+    mock_get, with_single_auth, private_key, public_key_jwk_sig
 ):
-    def mock_urlib(*args, **kwargs):
-        if args[0].full_url == "https://localhost/realm/test":
-            return MockUrllibResponse({"keys": [public_key_jwk_sig]}, 200)
-        raise URLError(f"404 for {args}")
+    def mock_jwks_get(*args, **kwargs):
+        if args[0] == "https://localhost/realm/test":
+            return MagicMock(
+                status_code=200,
+                headers={"cache-control": "max-age=60"},
+                json=lambda: {"keys": [public_key_jwk_sig]},
+            )
+        return mocked_requests_get(*args, **kwargs)
 
     jwks = PyJWKSet.from_dict({"keys": [public_key_jwk_sig]})
     assert len(jwks.keys) == 1
     assert jwks.keys[0].public_key_use == "sig"
 
-    mock_urlopen.side_effect = mock_urlib
+    mock_get.side_effect = mock_jwks_get
     pop_private_rsa, _, _ = gen_sample_keypair()
     pop_jwk = json.loads(RSAAlgorithm.to_jwk(pop_private_rsa.public_key()))
 
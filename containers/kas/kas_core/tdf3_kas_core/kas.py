@@ -115,6 +115,35 @@ def create_session_rewrap_v2(key_master, plugins, trusted_entitlers):
     return session_rewrap
 
 
+def create_session_rewrap_v2_batch(key_master, plugins, trusted_entitlers):
+    """Create a callable for batch rewrap requests.
+
+    The rewrap hooks are applied to each item in the batch, so that every
+    key access object is audited as if it had been its own rewrap request.
+    A failure of the whole batch, such as an invalid token or too many
+    items, goes to the error hook once.
+    """
+    plugin_runner = RewrapPluginRunnerV2(plugins)
+
+    def session_rewrap_batch(data, options):
+        rewrap_item = hook_into(
+            post=Kas.get_instance()._post_rewrap_hook,
+            err=Kas.get_instance()._err_rewrap_hook,
+        )(services.rewrap_v2_batch_item)
+        return hook_into(err=Kas.get_instance()._err_rewrap_hook)(
+            services.rewrap_v2_batch
+        )(
+            data,
+            options,
+            plugin_runner,
+            key_master,
+            trusted_entitlers,
+            rewrap_item=rewrap_item,
+        )
+
+    return session_rewrap_batch
+
+
 def create_session_upsert(key_master, plugins):
     """Create a simpler callable that accepts one argument, the data.
 
@@ -199,6 +228,7 @@ class Kas(object):
         self._session_ping = None
         self._session_rewrap = None
         self._session_rewrap_v2 = None
+        self._session_rewrap_v2_batch = None
         self._session_upsert = None
         self._session_upsert_v2 = None
         self._session_kas_public_key = None
@@ -323,6 +353,10 @@ class Kas(object):
         """return the callable to process rewrap requests."""
         return self._session_rewrap_v2
 
+    def get_session_rewrap_v2_batch(self):
+        """return the callable to process batch rewrap requests."""
+        return self._session_rewrap_v2_batch
+
     def get_session_upsert(self):
         """return the callable to process upsert requests."""
         return self._session_upsert
@@ -358,6 +392,10 @@ class Kas(object):
             self._key_master, self._rewrap_plugins_v2, self._trusted_entitlers
         )
 
+        self._session_rewrap_v2_batch = create_session_rewrap_v2_batch(
+            self._key_master, self._rewrap_plugins_v2, self._trusted_entitlers
+        )
+
         self._session_upsert = create_session_upsert(
             self._key_master, self._upsert_plugins
         )
@@ -1,7 +1,11 @@
 """Test the KAS core code."""
 
+import pytest
 
+from . import services
+from .errors import BadRequestError
 from .kas import Kas, clean_trusted_url, swagger_enabled
+from .kas import create_session_rewrap_v2_batch
 
 name = "__main__"
 
@@ -59,3 +63,24 @@ def test_clean_trusted_url():
     assert "https://a/?alpha=beta" == clean_trusted_url("https://a?alpha=beta")
     assert "https://a/b" == clean_trusted_url("https://a/b")
     assert "https://a/b?a=b" == clean_trusted_url("https://a/b?a=b")
+
+
+def test_rewrap_v2_batch_failure_hooked(monkeypatch):
+    err = BadRequestError("Too many key access objects")
+
+    def rewrap_v2_batch(*args, **kwargs):
+        raise err
+
+    errors = []
+    monkeypatch.setattr(services, "rewrap_v2_batch", rewrap_v2_batch)
+    monkeypatch.setattr(
+        Kas.get_instance(),
+        "_err_rewrap_hook",
+        lambda function_name, e, data, *args, **kwargs: errors.append(
+            (function_name, e, data)
+        ),
+    )
+    session_rewrap_batch = create_session_rewrap_v2_batch(None, [], None)
+    with pytest.raises(BadRequestError):
+        session_rewrap_batch({"signedRequestToken": "token"}, None)
+    assert errors == [("rewrap_v2_batch", err, {"signedRequestToken": "token"})]
@@ -2,30 +2,44 @@
 
 import os
 import logging
+import re
 import jwt
-import requests
 from cryptography import hazmat
 from cryptography.hazmat.primitives.asymmetric.types import PublicKeyTypes
 from urllib.parse import urlparse
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
 
-from tdf3_kas_core.errors import KeyNotFoundError, UnauthorizedError
+from tdf3_kas_core.errors import KeyNotFoundError
+from tdf3_kas_core.errors import PluginBackendError
+from tdf3_kas_core.errors import UnauthorizedError
 
 from tdf3_kas_core.models.key_master.key_master import KeyMaster
+from tdf3_kas_core.util import TTLCache
+from tdf3_kas_core.util import http_get
 
 logger = logging.getLogger(__name__)
 
-
-def get_retryable_request():
-    retry_strategy = Retry(total=3, backoff_factor=1)
-
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-
-    http = requests.Session()
-    http.mount("https://", adapter)
-    http.mount("http://", adapter)
-    return http
+# Realm keys fetched from Keycloak, keyed by (host, realmId). Realms that
+# Keycloak does not know are remembered for realm_key_negative_ttl, so tokens
+# naming made-up realms do not each cost a request. A cached key is refetched
+# when a signature fails to verify against it, at most once per
+# realm_key_min_refresh_interval.
+realm_key_ttl = int(os.environ.get("KAS_REALM_KEY_CACHE_TTL", "300"))
+realm_key_negative_ttl = int(os.environ.get("KAS_REALM_KEY_NEGATIVE_TTL", "30"))
+realm_key_cache_size = int(os.environ.get("KAS_REALM_KEY_CACHE_SIZE", "256"))
+realm_key_min_refresh_interval = int(
+    os.environ.get("KAS_REALM_KEY_MIN_REFRESH_INTERVAL", "10")
+)
+
+realm_keys = TTLCache(
+    maxsize=realm_key_cache_size,
+    ttl=realm_key_ttl,
+    negative_ttl=realm_key_negative_ttl,
+)
+realm_key_refreshes = TTLCache(
+    maxsize=realm_key_cache_size, ttl=realm_key_min_refresh_interval
+)
+
+REALM_RE = re.compile(r"^[\w.~%-]{1,255}$")
 
 
 # Given a realm ID, request that realm's public key from Keycloak's endpoint
@@ -46,17 +60,22 @@ def get_retryable_request():
 def get_keycloak_public_key(host: str, realmId: str) -> PublicKeyTypes:
     url = f"{host}/auth/realms/{realmId}"
 
-    http = get_retryable_request()
-
-    response = http.get(
+    response = http_get(
         url, headers={"Content-Type": "application/json"}, timeout=5  # seconds
     )
 
-    if not response.ok:
+    if response.status_code == 404:
         logger.warning("No public key found for Keycloak realm %s", realmId)
         raise KeyNotFoundError(
             f"Failed to download Keycloak public key: [{response.text}]"
         )
+    if not response.ok:
+        logger.warning(
+            "Keycloak returned [%s] for realm %s", response.status_code, realmId
+        )
+        raise PluginBackendError(
+            f"Failed to download Keycloak public key: [{response.text}]"
+        )
 
     try:
         resp_json = response.json()
@@ -93,36 +112,64 @@ def try_extract_realm(unverified_jwt):
     return urlparse(issuer_url).path.rsplit("/", 1)[-1]
 
 
+def valid_realm_name(realmId) -> bool:
+    """Return True if realmId could name a realm, and is safe in a URL path."""
+    return (
+        isinstance(realmId, str)
+        and realmId not in (".", "..")
+        and REALM_RE.match(realmId) is not None
+    )
+
+
+def _fetch_realm_key(cache_key):
+    host, realmId = cache_key
+    try:
+        return get_keycloak_public_key(host, realmId)
+    except KeyNotFoundError:
+        # Keycloak answered; the realm does not exist. Cache the miss.
+        return None
+
+
 # If key_master already has a key for that realm, use that.
-# Otherwise, use the realm identifier to fetch the realm PK from Keycloak.
+# Otherwise, use the realm identifier to fetch the realm PK from Keycloak,
+# caching it in realm_keys.
 #
 # If we get nothing in either case, return an empty/falsy result
 #
-# For now, we're relying on key_master to handle caching, and just using
-# a cached pubkey if one exists - this (and key_master itself) could stand to be
-# more robust in terms of key validity checks, rotations, refreshes, etc.
-def load_realm_key(host: str, realmId: str, key_master: KeyMaster) -> PublicKeyTypes:
-    realmKey = {}
+# With refresh, drop the cached key first, e.g. because a token failed to
+# verify with it after the realm's keys were rotated.
+def load_realm_key(
+    host: str, realmId: str, key_master: KeyMaster, *, refresh=False
+) -> PublicKeyTypes:
     try:
-        realmKey = key_master.public_key(f"KEYCLOAK-PUBLIC-{realmId}")
+        return key_master.public_key(f"KEYCLOAK-PUBLIC-{realmId}")
     except KeyNotFoundError:
-        try:
-            realmKey = get_keycloak_public_key(host, realmId)
-        except Exception:
-            logger.warning(
-                f"Unable to fetch public key for realm: {realmId} from Keycloak endpoint",
-                exc_info=1,
-            )
-        else:
-            key_master.set_key_pem(f"KEYCLOAK-PUBLIC-{realmId}", "PUBLIC", realmKey)
+        pass
 
-    return realmKey
+    if not valid_realm_name(realmId):
+        logger.warning("Invalid realm identifier [%s]", realmId)
+        return None
+
+    cache_key = (host, realmId)
+    if refresh and cache_key not in realm_key_refreshes:
+        realm_key_refreshes.set(cache_key, True)
+        realm_keys.invalidate(cache_key)
+    try:
+        return realm_keys.get_or_load(cache_key, _fetch_realm_key)
+    except Exception:
+        logger.warning(
+            f"Unable to fetch public key for realm: {realmId} from Keycloak endpoint",
+            exc_info=1,
+        )
+        return None
 
 
 # Given a JWT and the keymaster, attempt to obtain the right pubkey from
 # Keycloak for the realm this JWT was issued from.
 # If anything goes wrong, return an empty/falsy value
-def fetch_realm_key_by_jwt(host: str, idpJWT, key_master: KeyMaster) -> PublicKeyTypes:
+def fetch_realm_key_by_jwt(
+    host: str, idpJWT, key_master: KeyMaster, *, refresh=False
+) -> PublicKeyTypes:
     # We must extract `iss` without validating the JWT,
     # because we need `iss` to know which specific realm endpoint to hit
     # to get the public key we would verify it with
@@ -146,4 +193,4 @@ def fetch_realm_key_by_jwt(host: str, idpJWT, key_master: KeyMaster) -> PublicKe
         )
         return None
 
-    return load_realm_key(host, realmId, key_master)
+    return load_realm_key(host, realmId, key_master, refresh=refresh)
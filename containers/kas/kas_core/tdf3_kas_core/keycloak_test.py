@@ -74,11 +74,21 @@ def key_master(private_key):
     return FakeKeyMaster(private_key)
 
 
+@pytest.fixture(autouse=True)
+def clear_realm_keys():
+    keycloak.realm_keys.clear()
+    keycloak.realm_key_refreshes.clear()
+    yield
+    keycloak.realm_keys.clear()
+    keycloak.realm_key_refreshes.clear()
+
+
 class MockResponse:
     def __init__(self, json_data, status_code):
         self.fakejson = json_data
         self.status_code = status_code
         self.ok = status_code < 399
+        self.text = ""
 
     def json(self):
         return self.fakejson
@@ -136,3 +146,40 @@ def test_uncached_key_fetch_fails_returns_falsy_empty(mock_get, key_master):
     realmKey = keycloak.load_realm_key("https://mykc.com", realm, key_master)
     assert mock_get.called == True
     assert not realmKey
+
+
+@patch("requests.Session.get", side_effect=mocked_requests_get)
+def test_load_realm_key_caches_fetched_key(mock_get, key_master):
+    first = keycloak.load_realm_key("https://mykc.com", "someRealm", key_master)
+    second = keycloak.load_realm_key("https://mykc.com", "someRealm", key_master)
+    assert first is second
+    assert mock_get.call_count == 1
+
+
+@patch("requests.Session.get", return_value=MockResponse(None, 404))
+def test_load_realm_key_caches_unknown_realm(mock_get, key_master):
+    assert not keycloak.load_realm_key("https://mykc.com", "nope", key_master)
+    assert not keycloak.load_realm_key("https://mykc.com", "nope", key_master)
+    assert mock_get.call_count == 1
+
+
+@patch("requests.Session.get", side_effect=mocked_requests_get_fails)
+def test_load_realm_key_does_not_cache_backend_errors(mock_get, key_master):
+    assert not keycloak.load_realm_key("https://mykc.com", "someRealm", key_master)
+    assert not keycloak.load_realm_key("https://mykc.com", "someRealm", key_master)
+    assert mock_get.call_count == 2
+
+
+@patch("requests.Session.get", side_effect=mocked_requests_get)
+def test_load_realm_key_rejects_invalid_realm(mock_get, key_master):
+    for realm in ["", "..", "a/b", "a b", "x" * 256]:
+        assert not keycloak.load_realm_key("https://mykc.com", realm, key_master)
+    assert mock_get.called == False
+
+
+@patch("requests.Session.get", side_effect=mocked_requests_get)
+def test_load_realm_key_refresh_is_rate_limited(mock_get, key_master):
+    keycloak.load_realm_key("https://mykc.com", "someRealm", key_master)
+    keycloak.load_realm_key("https://mykc.com", "someRealm", key_master, refresh=True)
+    keycloak.load_realm_key("https://mykc.com", "someRealm", key_master, refresh=True)
+    assert mock_get.call_count == 2
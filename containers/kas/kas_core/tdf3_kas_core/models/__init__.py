@@ -40,3 +40,6 @@ from .access_pdp import AccessPDP  # noqa: F401
 
 from .attribute_policies import AttributePolicyCache  # noqa: F401
 from .attribute_policies import AttributePolicy  # noqa: F401
+from .attribute_policies import AttributeDefinitionIndex  # noqa: F401
+from .attribute_policies import definition_index  # noqa: F401
+from .attribute_policies import combined_index  # noqa: F401
@@ -1,3 +1,10 @@
 """This module wraps the external access PDP component, which makes policy decisions."""
 
 from .access_pdp import AccessPDP  # noqa: F401
+from .access_pdp import invalidate_decisions  # noqa: F401
+from .backends import PDPBackend  # noqa: F401
+from .backends import GrpcPDPBackend  # noqa: F401
+from .backends import LocalPDPBackend  # noqa: F401
+from .channel import pdp_channel  # noqa: F401
+from .channel import pdp_stub  # noqa: F401
+from .channel import reset_pdp_channel  # noqa: F401
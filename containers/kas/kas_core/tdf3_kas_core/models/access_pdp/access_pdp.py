@@ -1,18 +1,47 @@
 """The AccessPDP makes a decision, which the surrounding KAS PEP uses to determine access to the wrapped key."""
+import hashlib
+import json
 import logging
+import os
 
 
-import grpc
-from google.protobuf.json_format import MessageToJson
-import tdf3_kas_core.pdp_grpc as pdp_grpc
-
 from tdf3_kas_core.errors import AuthorizationError
+from tdf3_kas_core.models.attribute_policies import definition_index
+from tdf3_kas_core.util import TTLCache
+from tdf3_kas_core.util import metrics
 
-from accesspdp.v1 import accesspdp_pb2_grpc, accesspdp_pb2
+from . import backends
 
 logger = logging.getLogger(__name__)
 
-local_pdp = "localhost:50052"
+# Recent PDP decisions, keyed by a fingerprint of everything the PDP is sent,
+# so repeat requests skip the protobuf conversion and the gRPC round trip.
+# Only decisions are cached, never failures to reach the PDP. A TTL of 0
+# turns the cache off.
+decision_ttl = int(os.environ.get("ACCESS_PDP_DECISION_CACHE_TTL", "10"))
+decision_cache_size = int(os.environ.get("ACCESS_PDP_DECISION_CACHE_SIZE", "4096"))
+decisions = TTLCache(maxsize=decision_cache_size, ttl=decision_ttl)
+
+
+def invalidate_decisions():
+    """Forget every cached decision, e.g. when attribute definitions change."""
+    decisions.clear()
+
+
+def decision_fingerprint(data_attributes, entity_attributes, attribute_definitions):
+    """Return a digest that is equal for inputs the PDP must decide alike."""
+    data = []
+    if data_attributes:
+        data = sorted(v.attribute for v in data_attributes.values)
+    canonical = {
+        "data": data,
+        "entities": {
+            entity_id: sorted(v.attribute for v in attributes.values)
+            for entity_id, attributes in (entity_attributes or {}).items()
+        },
+        "definitions": definition_index(attribute_definitions).digest,
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
 
 
 class AccessPDP(object):
@@ -30,16 +59,55 @@ class AccessPDP(object):
     KAS is an Access PEP (policy enforcement point), and it "wraps" this PDP.
 
     The PDP makes the decision, KAS decides what to *do* with the decision.
+
+    Decisions are made by a backend: the gRPC service, or an in-process
+    engine that follows the same rules. See backends.py.
     """
 
+    def __init__(self, backend=None):
+        """Construct with the given backend, or the configured one."""
+        self.__backend = backend or backends.default_backend
+
+    @property
+    def backend(self):
+        """Return the PDP backend."""
+        return self.__backend
+
+    @backend.setter
+    def backend(self, value):
+        """Do not allow the backend to be set."""
+        pass
+
     def can_access(self, policy, claims, attribute_definitions):
         # TODO deprecated, remove, this skips all ABAC checks
         # Check to see if this claimset fails the dissem tests.
         self._check_dissem(policy.dissem, claims.user_id)
-        # Then check the attributes
-        self._check_attributes(
-            policy.data_attributes, claims.entity_attributes, attribute_definitions
-        )
+        # Compile the definitions once; the index is shared between requests
+        attribute_definitions = definition_index(attribute_definitions)
+        # Then check the attributes, or recall a recent decision on them
+        fingerprint = None
+        if decision_ttl > 0:
+            fingerprint = decision_fingerprint(
+                policy.data_attributes, claims.entity_attributes, attribute_definitions
+            )
+            allowed = decisions.get(fingerprint)
+            if allowed is not None:
+                metrics.incr("access_pdp.decision_cache.hit")
+                if not allowed:
+                    raise AuthorizationError("Access Denied")
+                return True
+            metrics.incr("access_pdp.decision_cache.miss")
+        try:
+            self._check_attributes(
+                policy.data_attributes, claims.entity_attributes, attribute_definitions
+            )
+        except AuthorizationError as e:
+            # A denial by the PDP has no cause; an unreachable PDP does.
+            if fingerprint is not None and e.__cause__ is None:
+                decisions.set(fingerprint, False)
+            raise
+        if fingerprint is not None:
+            decisions.set(fingerprint, True)
         # Passed all the tests, The entity who was issued this claimset is Worthy!
         return True
 
@@ -73,7 +141,7 @@ class AccessPDP(object):
     def _check_attributes(
         self, data_attributes, entity_attributes, data_attribute_definitions
     ):
-        """Invoke the PDP over gRPC and obtain decisions.
+        """Ask the PDP backend for decisions.
 
         We should obtain 1 Decision per entity in the `entity_attributes` dict
 
@@ -81,49 +149,17 @@ class AccessPDP(object):
         """
         access = True
 
-        # BEGIN grpc
-        logger.debug(f"Invoking local PDP: {local_pdp}")
-        channel = grpc.insecure_channel(local_pdp)
-        stub = accesspdp_pb2_grpc.AccessPDPEndpointStub(channel)
-
-        logger.debug("Serializing KAS structures")
-        attr_defs = pdp_grpc.convert_attribute_defs(data_attribute_definitions)
-        entity_attrs = pdp_grpc.convert_entity_attrs(entity_attributes)
-        data_attrs = pdp_grpc.convert_data_attrs(data_attributes)
-
-        req = accesspdp_pb2.DetermineAccessRequest(
-            data_attributes=data_attrs,
-            entity_attribute_sets=entity_attrs,
-            attribute_definitions=attr_defs,
+        decisions = self.__backend.determine_access(
+            data_attributes, entity_attributes, data_attribute_definitions
         )
 
-        logger.debug(f"Requesting decision - request is {MessageToJson(req)}")
-        try:
-            responses = stub.DetermineAccess(req)
-        except grpc.RpcError as e:
-            raise AuthorizationError("Access Denied by Policy") from e
-
-        entity_responses = []
-
         # if claims are empty
         if not entity_attributes and data_attributes:
             access=False
 
-        for response in responses:
-            logger.debug(
-                "Received response for entity %s with access decision %s"
-                % (response.entity, response.access)
-            )
+        for entity_access in decisions.values():
             # Boolean AND the results - e.g. flip `access` to false if any response.Result is false
-            access = access and response.access
-            # Capture the per-data-attribute result details for each entity decision, for logging/etc
-            logger.debug(
-                f"Detailed data attribute results for entity {response.entity}: \n"
-            )
-            string_res = MessageToJson(response)
-            logger.debug(f"{string_res}\n")
-            entity_responses.append(string_res)
-        # END grpc
+            access = access and entity_access
 
         # Final check - KAS wants an error thrown if access == false
         if not access:
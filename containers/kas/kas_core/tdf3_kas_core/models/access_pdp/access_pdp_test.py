@@ -2,14 +2,28 @@ import unittest
 from unittest.mock import patch, Mock
 import grpc
 from tdf3_kas_core.errors import AuthorizationError
+from tdf3_kas_core.models import DataAttributes
+from tdf3_kas_core.models import Dissem
 from tdf3_kas_core.models.access_pdp import AccessPDP
+from tdf3_kas_core.models.access_pdp import GrpcPDPBackend
+from tdf3_kas_core.models.access_pdp import invalidate_decisions
+from tdf3_kas_core.models.access_pdp import reset_pdp_channel
+from tdf3_kas_core.models.access_pdp.access_pdp import decision_fingerprint
 
 
 class TestAccessPDP(unittest.TestCase):
+    def setUp(self):
+        reset_pdp_channel()
+        invalidate_decisions()
+
+    def tearDown(self):
+        reset_pdp_channel()
+        invalidate_decisions()
+
     @patch('grpc.insecure_channel')
     @patch('accesspdp.v1.accesspdp_pb2_grpc.AccessPDPEndpointStub')
     def test_check_attributes_grpc_error(self, MockStub, _):
-        pdp = AccessPDP()
+        pdp = AccessPDP(GrpcPDPBackend())
 
         mock_stub_instance = Mock()
         mock_stub_instance.DetermineAccess.side_effect = grpc.RpcError("Some gRPC error")
@@ -20,6 +34,86 @@ class TestAccessPDP(unittest.TestCase):
 
         self.assertEqual(str(context.exception), "Access Denied by Policy")
 
+    @patch('grpc.insecure_channel')
+    @patch('accesspdp.v1.accesspdp_pb2_grpc.AccessPDPEndpointStub')
+    def test_check_attributes_reuses_channel(self, MockStub, MockChannel):
+        pdp = AccessPDP(GrpcPDPBackend())
+        MockStub.return_value.DetermineAccess.return_value = iter([])
+
+        pdp._check_attributes({}, {}, {})
+        MockStub.return_value.DetermineAccess.return_value = iter([])
+        pdp._check_attributes({}, {}, {})
+
+        MockChannel.assert_called_once()
+        MockStub.assert_called_once()
+        self.assertIn("timeout", MockStub.return_value.DetermineAccess.call_args.kwargs)
+
+
+    @patch('grpc.insecure_channel')
+    @patch('accesspdp.v1.accesspdp_pb2_grpc.AccessPDPEndpointStub')
+    def test_can_access_caches_decisions(self, MockStub, _):
+        pdp = AccessPDP(GrpcPDPBackend())
+        determine_access = MockStub.return_value.DetermineAccess
+        determine_access.side_effect = lambda *args, **kwargs: iter([])
+        policy = Mock(dissem=Dissem(), data_attributes={})
+        claims = Mock(user_id="alice", entity_attributes={})
+
+        self.assertTrue(pdp.can_access(policy, claims, []))
+        self.assertTrue(pdp.can_access(policy, claims, []))
+        self.assertEqual(determine_access.call_count, 1)
+
+        invalidate_decisions()
+        self.assertTrue(pdp.can_access(policy, claims, []))
+        self.assertEqual(determine_access.call_count, 2)
+
+    @patch('grpc.insecure_channel')
+    @patch('accesspdp.v1.accesspdp_pb2_grpc.AccessPDPEndpointStub')
+    def test_can_access_caches_denials_not_errors(self, MockStub, _):
+        pdp = AccessPDP(GrpcPDPBackend())
+        determine_access = MockStub.return_value.DetermineAccess
+        determine_access.side_effect = grpc.RpcError("unavailable")
+        data_attributes = DataAttributes.create_from_raw(
+            [{"attribute": "https://example.com/attr/COI/value/PRX"}]
+        )
+        policy = Mock(dissem=Dissem(), data_attributes=data_attributes)
+        claims = Mock(user_id="alice", entity_attributes={})
+
+        for _ in range(2):
+            with self.assertRaises(AuthorizationError):
+                pdp.can_access(policy, claims, [])
+        self.assertEqual(determine_access.call_count, 2)
+
+        determine_access.side_effect = lambda *args, **kwargs: iter([])
+        for _ in range(2):
+            with self.assertRaises(AuthorizationError):
+                pdp.can_access(policy, claims, [])
+        self.assertEqual(determine_access.call_count, 3)
+
+    def test_decision_fingerprint_is_canonical(self):
+        first = DataAttributes.create_from_raw(
+            [
+                {"attribute": "https://example.com/attr/COI/value/PRX"},
+                {"attribute": "https://example.com/attr/COI/value/ABC"},
+            ]
+        )
+        second = DataAttributes.create_from_raw(
+            [
+                {"attribute": "https://example.com/attr/COI/value/ABC"},
+                {"attribute": "https://EXAMPLE.com/attr/COI/value/PRX"},
+            ]
+        )
+        definitions = [
+            {"authority": "https://example.com", "name": "COI", "rule": "anyOf"}
+        ]
+        self.assertEqual(
+            decision_fingerprint(first, {}, definitions),
+            decision_fingerprint(second, {}, list(reversed(definitions))),
+        )
+        self.assertNotEqual(
+            decision_fingerprint(first, {}, definitions),
+            decision_fingerprint(first, {}, [dict(definitions[0], rule="allOf")]),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
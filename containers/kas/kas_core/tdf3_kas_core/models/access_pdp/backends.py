@@ -0,0 +1,142 @@
+"""Policy decision point backends.
+
+The backend is chosen once, from ACCESS_PDP_BACKEND:
+
+    grpc    ask the Access PDP service, at ACCESS_PDP_ADDRESS (default)
+    local   decide in this process, with the same rules
+
+The local backend is not yet documented for deployments; it is checked
+against the Access PDP by models/access_pdp_tests/pdp_decisions_test.py.
+"""
+
+import abc
+import logging
+import os
+
+import grpc
+from google.protobuf.json_format import MessageToJson
+import tdf3_kas_core.pdp_grpc as pdp_grpc
+
+from tdf3_kas_core.errors import AttributePolicyConfigError
+from tdf3_kas_core.errors import AuthorizationError
+from tdf3_kas_core.errors import ServerStartupError
+from tdf3_kas_core.models.attribute_policies import definition_index
+
+from accesspdp.v1 import accesspdp_pb2_grpc, accesspdp_pb2
+
+from . import channel
+from . import engine
+
+logger = logging.getLogger(__name__)
+
+
+class PDPBackend(abc.ABC):
+    """The interface to a policy decision point."""
+
+    name = None
+
+    @abc.abstractmethod
+    def determine_access(
+        self, data_attributes, entity_attributes, data_attribute_definitions
+    ):
+        """Return a dict of entity id to access decision (a bool).
+
+        Only entities that a rule applied to are included. Raise an
+        AuthorizationError, caused by the underlying error, if no decision
+        could be made.
+        """
+
+
+class GrpcPDPBackend(PDPBackend):
+    """Invoke the Access PDP service over gRPC."""
+
+    name = "grpc"
+
+    def determine_access(
+        self, data_attributes, entity_attributes, data_attribute_definitions
+    ):
+        """Invoke the PDP over gRPC and obtain one decision per entity."""
+        logger.debug(f"Invoking PDP: {channel.target}")
+        stub = channel.pdp_stub(accesspdp_pb2_grpc.AccessPDPEndpointStub)
+
+        logger.debug("Serializing KAS structures")
+        attr_defs = definition_index(data_attribute_definitions).pb_definitions
+        entity_attrs = pdp_grpc.convert_entity_attrs(entity_attributes)
+        data_attrs = pdp_grpc.convert_data_attrs(data_attributes)
+
+        req = accesspdp_pb2.DetermineAccessRequest(
+            data_attributes=data_attrs,
+            entity_attribute_sets=entity_attrs,
+            attribute_definitions=attr_defs,
+        )
+
+        logger.debug(f"Requesting decision - request is {MessageToJson(req)}")
+        try:
+            # Responses are streamed; read them all within the deadline.
+            responses = list(stub.DetermineAccess(req, timeout=channel.deadline))
+        except grpc.RpcError as e:
+            raise AuthorizationError("Access Denied by Policy") from e
+
+        decisions = {}
+        for response in responses:
+            logger.debug(
+                "Received response for entity %s with access decision %s"
+                % (response.entity, response.access)
+            )
+            # Capture the per-data-attribute result details for each entity decision, for logging/etc
+            logger.debug(
+                f"Detailed data attribute results for entity {response.entity}: \n"
+            )
+            logger.debug(f"{MessageToJson(response)}\n")
+            decisions[response.entity] = response.access
+        return decisions
+
+
+class LocalPDPBackend(PDPBackend):
+    """Decide in process, following the Access PDP service's rules."""
+
+    name = "local"
+
+    def determine_access(
+        self, data_attributes, entity_attributes, data_attribute_definitions
+    ):
+        """Run the in-process engine and obtain one decision per entity."""
+        try:
+            decisions = engine.determine_access(
+                data_attributes.values if data_attributes else [],
+                {
+                    entity_id: attributes.values
+                    for entity_id, attributes in (entity_attributes or {}).items()
+                },
+                data_attribute_definitions,
+            )
+        except AttributePolicyConfigError as e:
+            logger.warning("Unable to decide access: %s", e)
+            raise AuthorizationError("Access Denied by Policy") from e
+        for entity_id, decision in decisions.items():
+            logger.debug(
+                "Decision for entity %s: %s %s",
+                entity_id,
+                decision.access,
+                decision.results,
+            )
+        return {entity_id: d.access for entity_id, d in decisions.items()}
+
+
+backends = {
+    GrpcPDPBackend.name: GrpcPDPBackend,
+    LocalPDPBackend.name: LocalPDPBackend,
+}
+
+
+def create_backend(name):
+    """Return a new backend of the named kind."""
+    try:
+        return backends[name]()
+    except KeyError:
+        raise ServerStartupError(
+            f"Unknown ACCESS_PDP_BACKEND [{name}]; use one of {sorted(backends)}"
+        )
+
+
+default_backend = create_backend(os.environ.get("ACCESS_PDP_BACKEND", "grpc"))
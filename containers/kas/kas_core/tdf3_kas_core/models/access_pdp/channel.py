@@ -0,0 +1,82 @@
+"""A process-wide gRPC channel to the Access PDP.
+
+Every worker process holds one channel, kept alive between calls, so a
+rewrap does not pay for channel setup. Stubs are cached on the channel.
+
+Configuration is read once, from the environment:
+
+    ACCESS_PDP_ADDRESS      host:port of the Access PDP (default localhost:50052)
+    ACCESS_PDP_TIMEOUT      deadline for each call, in seconds (default 5)
+    ACCESS_PDP_KEEPALIVE    seconds between keepalive pings (default 30)
+"""
+
+import logging
+import os
+import threading
+
+import grpc
+
+logger = logging.getLogger(__name__)
+
+target = os.environ.get("ACCESS_PDP_ADDRESS", "localhost:50052")
+deadline = float(os.environ.get("ACCESS_PDP_TIMEOUT", "5"))
+keepalive = int(os.environ.get("ACCESS_PDP_KEEPALIVE", "30"))
+
+options = [
+    ("grpc.keepalive_time_ms", keepalive * 1000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.initial_reconnect_backoff_ms", 100),
+    ("grpc.min_reconnect_backoff_ms", 100),
+    ("grpc.max_reconnect_backoff_ms", 5000),
+]
+
+_lock = threading.Lock()
+_channel = None
+_stubs = {}
+
+
+def _reset_after_fork():
+    # A channel is not safe to share with a forked child; open a new one.
+    global _lock, _channel, _stubs
+    _lock = threading.Lock()
+    _channel = None
+    _stubs = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def pdp_channel():
+    """Return the channel to the Access PDP for this process."""
+    global _channel
+    if _channel is None:
+        with _lock:
+            if _channel is None:
+                logger.debug("Opening channel to Access PDP: %s", target)
+                _channel = grpc.insecure_channel(target, options=options)
+    return _channel
+
+
+def pdp_stub(stub_class):
+    """Return a stub_class stub on the shared channel."""
+    stub = _stubs.get(stub_class)
+    if stub is None:
+        channel = pdp_channel()
+        with _lock:
+            stub = _stubs.get(stub_class)
+            if stub is None:
+                stub = _stubs[stub_class] = stub_class(channel)
+    return stub
+
+
+def reset_pdp_channel():
+    """Close the shared channel; the next call opens a new one."""
+    global _channel
+    with _lock:
+        channel, _channel = _channel, None
+        _stubs.clear()
+    if channel is not None:
+        channel.close()
@@ -0,0 +1,129 @@
+"""An in-process access decision engine.
+
+This follows the rules of the Access PDP service
+(https://github.com/virtru/access-pdp), so either can make the decision:
+
+* Data attribute values are grouped by attribute definition. A data value
+  with no definition is an error.
+* Each definition's rule is applied to every entity:
+
+  - allOf: the entity has every data value.
+  - anyOf: the entity has at least one data value.
+  - hierarchy: the entity has a value ranked at or above the highest ranked
+    data value. Rank is position in the definition's order, first highest.
+    A data value missing from the order is an error.
+
+* With group_by, the rule only applies to entities holding the group_by
+  value; all other entities pass it.
+* An entity is granted access if it passes every rule. With no data
+  attributes there are no rules, and no decisions.
+"""
+
+import collections
+import logging
+
+from tdf3_kas_core.errors import AttributePolicyConfigError
+from tdf3_kas_core.models.attribute_policies import definition_index
+
+logger = logging.getLogger(__name__)
+
+ALL_OF = "allOf"
+ANY_OF = "anyOf"
+HIERARCHY = "hierarchy"
+
+Decision = collections.namedtuple("Decision", ["access", "results"])
+RuleResult = collections.namedtuple("RuleResult", ["definition", "passed"])
+
+
+def _field(obj, name):
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _instance(obj):
+    """Return an (authority, name, value) key for an attribute instance."""
+    return (
+        (_field(obj, "authority") or "").lower(),
+        _field(obj, "name"),
+        _field(obj, "value"),
+    )
+
+
+def _canonical_name(authority, name):
+    return f"{authority.lower()}/attr/{name}"
+
+
+def _group_by_definition(data_attributes, index):
+    groups = collections.OrderedDict()
+    for authority, name, value in sorted(_instance(v) for v in data_attributes):
+        canonical = _canonical_name(authority, name)
+        definition = index.get(canonical)
+        if definition is None:
+            raise AttributePolicyConfigError(
+                f"No attribute definition found for [{canonical}]"
+            )
+        groups.setdefault(canonical, (definition, []))[1].append(value)
+    return groups
+
+
+def _rule(definition, data_values, ranks):
+    """Return a test of one entity's values for this definition."""
+    rule = definition.get("rule") or ALL_OF
+    if rule == ALL_OF:
+        return lambda entity_values: all(v in entity_values for v in data_values)
+    if rule == ANY_OF:
+        return lambda entity_values: any(v in entity_values for v in data_values)
+    if rule == HIERARCHY:
+        ranks = ranks or {}
+        for value in data_values:
+            if value not in ranks:
+                raise AttributePolicyConfigError(
+                    f"Data value [{value}] is not in the hierarchy {list(ranks)}"
+                )
+        highest = min(ranks[value] for value in data_values)
+        return lambda entity_values: any(
+            ranks.get(v, highest + 1) <= highest for v in entity_values
+        )
+    raise AttributePolicyConfigError(f"Unrecognized attribute definition rule [{rule}]")
+
+
+def determine_access(data_attributes, entity_attribute_sets, attribute_definitions):
+    """Decide access for each entity.
+
+    data_attributes is an iterable of attribute instances, entity_attribute_sets
+    maps entity ids to iterables of attribute instances, and
+    attribute_definitions is an AttributeDefinitionIndex or a list of
+    definition dicts. Attribute instances may be AttributeValues or dicts with
+    authority, name and value.
+
+    Returns a dict of entity id to Decision.
+    """
+    index = definition_index(attribute_definitions)
+    groups = _group_by_definition(data_attributes or [], index)
+    entities = {
+        entity_id: {_instance(v) for v in instances}
+        for entity_id, instances in (entity_attribute_sets or {}).items()
+    }
+
+    decisions = {}
+    for canonical, (definition, data_values) in groups.items():
+        test = _rule(definition, data_values, index.ranks(canonical))
+        authority = definition["authority"].lower()
+        name = definition["name"]
+        group_by = definition.get("group_by")
+        group_key = _instance(group_by) if group_by else None
+        for entity_id, instances in entities.items():
+            if group_key is not None and group_key not in instances:
+                passed = True
+            else:
+                passed = test(
+                    {v for (a, n, v) in instances if a == authority and n == name}
+                )
+            logger.debug("Entity [%s] passed [%s]: %s", entity_id, canonical, passed)
+            previous = decisions.get(entity_id, Decision(True, []))
+            decisions[entity_id] = Decision(
+                previous.access and passed,
+                previous.results + [RuleResult(canonical, passed)],
+            )
+    return decisions
@@ -0,0 +1,38 @@
+"""Test the in-process decision engine and the choice of PDP backend.
+
+The engine's decisions are checked against the Access PDP's in
+models/access_pdp_tests/pdp_decisions_test.py.
+"""
+
+import pytest
+
+from tdf3_kas_core.errors import ServerStartupError
+from tdf3_kas_core.models import DataAttributes
+from tdf3_kas_core.models import EntityAttributes
+
+from . import backends
+from .engine import determine_access
+
+COI = {"authority": "https://example.com", "name": "COI", "rule": "anyOf"}
+
+
+def test_determine_access_authority_case_insensitive():
+    attrs = [{"attribute": "https://example.com/attr/COI/value/A"}]
+    decisions = determine_access(
+        DataAttributes.create_from_raw(attrs).values,
+        {"alice": EntityAttributes.create_from_list(attrs).values},
+        [dict(COI, authority="https://EXAMPLE.com")],
+    )
+    assert decisions["alice"].access is True
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        backends.PDPBackend()
+
+
+def test_create_backend():
+    assert isinstance(backends.create_backend("local"), backends.LocalPDPBackend)
+    assert isinstance(backends.create_backend("grpc"), backends.GrpcPDPBackend)
+    with pytest.raises(ServerStartupError):
+        backends.create_backend("remote")
@@ -0,0 +1,129 @@
+"""Test both PDP backends against the decisions in pdp_decisions.json.
+
+The in-process engine is always checked. The gRPC backend is checked when
+an Access PDP is listening, and must be when ACCESS_PDP_REQUIRED is set, as
+it is in CI by scripts/test.env.
+"""
+
+import copy
+import os
+
+import grpc
+import pytest
+
+from tdf3_kas_core.errors import AttributePolicyConfigError
+from tdf3_kas_core.errors import AuthorizationError
+from tdf3_kas_core.models import DataAttributes
+from tdf3_kas_core.models import EntityAttributes
+from tdf3_kas_core.models.access_pdp import backends
+from tdf3_kas_core.models.access_pdp import channel
+from tdf3_kas_core.models.access_pdp.engine import determine_access
+from tdf3_kas_core.models.access_pdp_tests import record_pdp_decisions
+from tdf3_kas_core.models.access_pdp_tests.record_pdp_decisions import attrs
+from tdf3_kas_core.models.access_pdp_tests.record_pdp_decisions import run
+
+FIXTURE = record_pdp_decisions.load()
+CASES = [case for case in FIXTURE["cases"] if not case.get("error")]
+ERROR_CASES = [case for case in FIXTURE["cases"] if case.get("error")]
+
+
+def case_id(case):
+    return case["name"]
+
+
+def decide(case):
+    authority = FIXTURE["authority"]
+    decisions = determine_access(
+        DataAttributes.create_from_raw(attrs(authority, case["data"])).values,
+        {
+            entity_id: EntityAttributes.create_from_list(
+                attrs(authority, values)
+            ).values
+            for entity_id, values in case["entities"].items()
+        },
+        [FIXTURE["definitions"][name] for name in case["definitions"]],
+    )
+    return {entity_id: d.access for entity_id, d in decisions.items()}
+
+
+def test_fixture_covers_the_rules():
+    definitions = [
+        FIXTURE["definitions"][name] for case in CASES for name in case["definitions"]
+    ]
+    assert {d["rule"] for d in definitions} >= {"allOf", "anyOf", "hierarchy", None}
+    assert any("group_by" in d for d in definitions)
+    assert any(len(case["entities"]) > 2 for case in CASES)
+
+
+@pytest.mark.parametrize("case", CASES, ids=case_id)
+def test_determine_access(case):
+    assert decide(case) == case["decisions"]
+
+
+@pytest.mark.parametrize("case", CASES, ids=case_id)
+def test_local_backend(case):
+    assert run(backends.LocalPDPBackend(), FIXTURE, case) == case["decisions"]
+
+
+@pytest.mark.parametrize("case", ERROR_CASES, ids=case_id)
+def test_determine_access_errors(case):
+    with pytest.raises(AttributePolicyConfigError):
+        decide(case)
+
+
+@pytest.mark.parametrize("case", ERROR_CASES, ids=case_id)
+def test_local_backend_errors(case):
+    with pytest.raises(AuthorizationError):
+        run(backends.LocalPDPBackend(), FIXTURE, case)
+
+
+class RecordingBackend(backends.PDPBackend):
+    """Allow every entity, except for the entities that fail."""
+
+    def determine_access(self, data_attributes, entity_attributes, definitions):
+        if "failing" in entity_attributes:
+            raise AuthorizationError("Access Denied by Policy")
+        return {entity_id: True for entity_id in entity_attributes}
+
+
+def test_record_rewrites_outcomes():
+    fixture = copy.deepcopy(FIXTURE)
+    (allowed, failed) = fixture["cases"][:2]
+    failed["entities"] = {"failing": []}
+    record_pdp_decisions.record(RecordingBackend(), fixture)
+    assert allowed["decisions"] == {e: True for e in allowed["entities"]}
+    assert "error" not in allowed
+    assert failed["error"] is True
+    assert "decisions" not in failed
+
+
+@pytest.fixture(scope="module")
+def grpc_backend():
+    required = bool(os.environ.get("ACCESS_PDP_REQUIRED"))
+    try:
+        grpc.channel_ready_future(channel.pdp_channel()).result(
+            timeout=channel.deadline if required else 1
+        )
+    except grpc.FutureTimeoutError:
+        message = f"No Access PDP listening at {channel.target}"
+        if required:
+            pytest.fail(message)
+        pytest.skip(message)
+    return backends.GrpcPDPBackend()
+
+
+@pytest.mark.parametrize("case", CASES, ids=case_id)
+def test_grpc_backend(grpc_backend, case):
+    assert run(grpc_backend, FIXTURE, case) == case["decisions"]
+
+
+@pytest.mark.parametrize("case", ERROR_CASES, ids=case_id)
+def test_grpc_backend_errors(grpc_backend, case):
+    with pytest.raises(AuthorizationError):
+        run(grpc_backend, FIXTURE, case)
+
+
+@pytest.mark.parametrize("case", CASES, ids=case_id)
+def test_backends_agree(grpc_backend, case):
+    local = backends.LocalPDPBackend()
+    assert run(local, FIXTURE, case) == run(grpc_backend, FIXTURE, case)
@@ -0,0 +1,81 @@
+"""Record Access PDP decisions for the cases in pdp_decisions.json.
+
+pdp_decisions_test checks the in-process engine against the decisions in
+pdp_decisions.json, and, with an Access PDP listening, the gRPC backend too.
+To record them from the gRPC Access PDP (access-pdp v1.10.0, as in the KAS
+image) listening at ACCESS_PDP_ADDRESS, run from containers/kas/kas_core:
+
+    python -m tdf3_kas_core.models.access_pdp_tests.record_pdp_decisions
+
+Each case's decisions, or whether it failed, are replaced with the PDP's
+answer. Review the diff before committing it; a change is a difference
+between the engine and the PDP.
+"""
+
+import datetime
+import json
+import os
+import sys
+
+from tdf3_kas_core.errors import AuthorizationError
+from tdf3_kas_core.models import DataAttributes
+from tdf3_kas_core.models import EntityAttributes
+from tdf3_kas_core.models.access_pdp import backends
+from tdf3_kas_core.models.access_pdp import channel
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "pdp_decisions.json")
+
+
+def load(path=FIXTURE):
+    """Return the recorded fixture."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def attrs(authority, values):
+    """Return raw attributes for a list of "Name=Value" strings."""
+    return [
+        {"attribute": f"{authority}/attr/{name}/value/{value}"}
+        for name, value in (v.split("=", 1) for v in values)
+    ]
+
+
+def run(backend, fixture, case):
+    """Return the backend's decisions for a case, or raise its error."""
+    authority = fixture["authority"]
+    return backend.determine_access(
+        DataAttributes.create_from_raw(attrs(authority, case["data"])),
+        {
+            entity_id: EntityAttributes.create_from_list(attrs(authority, values))
+            for entity_id, values in case["entities"].items()
+        },
+        [fixture["definitions"][name] for name in case["definitions"]],
+    )
+
+
+def record(backend, fixture):
+    """Replace the outcome of every case with the backend's."""
+    for case in fixture["cases"]:
+        case.pop("decisions", None)
+        case.pop("error", None)
+        try:
+            case["decisions"] = run(backend, fixture, case)
+        except AuthorizationError:
+            case["error"] = True
+
+
+def main(path=FIXTURE):
+    """Record the decisions of the gRPC Access PDP into the fixture."""
+    fixture = load(path)
+    record(backends.GrpcPDPBackend(), fixture)
+    fixture["source"] = (
+        f"Recorded from the Access PDP at {channel.target}"
+        f" on {datetime.date.today().isoformat()}."
+    )
+    with open(path, "w") as f:
+        f.write(json.dumps(fixture, indent=2) + "\n")
+    print(f"Recorded {len(fixture['cases'])} cases to {path}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
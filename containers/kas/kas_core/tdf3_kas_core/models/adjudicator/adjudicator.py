@@ -92,7 +92,10 @@ class Adjudicator(object):
             # CASE HIERARCHY
             if rule == HIERARCHY:
                 hierarchy_decision(
-                    data_values, entity_values, attr_policy.options["order"]
+                    data_values,
+                    entity_values,
+                    attr_policy.options["order"],
+                    ranks=attr_policy.ranks,
                 )
 
         return True
@@ -28,24 +28,31 @@ def any_of_decision(data_values, entity_values):
     raise AuthorizationError("AnyOf not satisfied")
 
 
-def hierarchy_decision(data_values, entity_values, order):
-    """Test hierarchy decision function."""
+def hierarchy_decision(data_values, entity_values, order, ranks=None):
+    """Test hierarchy decision function.
+
+    ranks, if given, maps each value in order to its position.
+    """
     logger.debug("Hierarchical decision function called")
+    if ranks is None:
+        ranks = {}
+        for rank, value in enumerate(order):
+            ranks.setdefault(value, rank)
     # Compute the rank of the data_attribute value
     if len(data_values) != 1:
         raise AuthorizationError("Hiearchy - must be one data value")
     data_value = next(iter(data_values))
-    if data_value.value not in order:
+    if data_value.value not in ranks:
         raise AuthorizationError("Hiearchy - data value not in attrib policy")
-    data_rank = order.index(data_value.value)
+    data_rank = ranks[data_value.value]
 
     # Compute the rank of the entity_attribute value
     if len(entity_values) != 1:
         raise AuthorizationError("Hierarchy - must be one entity value")
     entity_value = next(iter(entity_values))
-    if entity_value.value not in order:
+    if entity_value.value not in ranks:
         raise AuthorizationError("Hiearchy - entity value not in attrib policy")
-    entity_rank = order.index(entity_value.value)
+    entity_rank = ranks[entity_value.value]
 
     # Compare the ranks to determine value satisfaction
     if entity_rank <= data_rank:
@@ -0,0 +1,60 @@
+"""Time all_of_decision and any_of_decision on large attribute clusters.
+
+Run from containers/kas/kas_core:
+
+    python -m tdf3_kas_core.models.adjudicator_tests.decision_benchmark [size ...]
+
+Each size is the number of values in the data cluster; the entity holds
+them all plus as many again, as with large classification policies. The
+cluster values are read the way Adjudicator._check_attributes reads them.
+"""
+
+import sys
+import timeit
+
+from tdf3_kas_core.models import AttributeValue
+from tdf3_kas_core.models import DataAttributes
+from tdf3_kas_core.models import EntityAttributes
+
+from tdf3_kas_core.models.adjudicator.decision_functions import all_of_decision
+from tdf3_kas_core.models.adjudicator.decision_functions import any_of_decision
+
+NAMESPACE = "https://example.com/attr/Classification"
+
+
+def attribute_set(cls, count):
+    """Return an attribute set with count values in one namespace."""
+    attributes = cls()
+    for i in range(count):
+        attributes.add(AttributeValue(f"{NAMESPACE}/value/V{i:05d}"))
+    return attributes
+
+
+def check(decision, data_attributes, entity_attributes):
+    """Decide on every cluster, as the adjudicator does."""
+    for data_cluster in data_attributes.clusters:
+        entity_cluster = entity_attributes.cluster(data_cluster.namespace)
+        decision(data_cluster.values, entity_cluster.values)
+
+
+def main(sizes=(100, 500, 1000), number=2000):
+    """Print the time per decision for each size."""
+    for size in sizes:
+        data_attributes = attribute_set(DataAttributes, size)
+        entity_attributes = attribute_set(EntityAttributes, size * 2)
+        for decision in (all_of_decision, any_of_decision):
+            elapsed = min(
+                timeit.repeat(
+                    lambda: check(decision, data_attributes, entity_attributes),
+                    number=number,
+                    repeat=5,
+                )
+            )
+            print(
+                f"{decision.__name__:>16} {size:>5} values:"
+                f" {elapsed / number * 1e6:8.2f} us"
+            )
+
+
+if __name__ == "__main__":
+    main(*([[int(arg) for arg in sys.argv[1:]]] if sys.argv[1:] else []))
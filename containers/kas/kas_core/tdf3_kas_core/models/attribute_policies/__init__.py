@@ -12,3 +12,7 @@ from .attribute_policy import HIERARCHY  # noqa: F401
 
 from .attribute_policy_cache import AttributePolicyCache  # noqa: F401
 from .attribute_policy import AttributePolicy  # noqa: F401
+
+from .attribute_definition_index import AttributeDefinitionIndex  # noqa: F401
+from .attribute_definition_index import definition_index  # noqa: F401
+from .attribute_definition_index import combined_index  # noqa: F401
@@ -0,0 +1,232 @@
+"""AttributeDefinitionIndex, a compiled set of attribute definitions."""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import types
+
+from tdf3_kas_core.errors import InvalidAttributeError
+from tdf3_kas_core.util import TTLCache
+
+from .attribute_policy import AttributePolicy
+from .attribute_policy import HIERARCHY
+
+logger = logging.getLogger(__name__)
+
+ATTR_ = "/attr/"
+
+# Indexes are shared by every request that fetched the same definitions.
+index_cache_size = int(os.environ.get("ATTRIBUTE_DEFINITION_INDEX_CACHE_SIZE", "256"))
+indexes = TTLCache(maxsize=index_cache_size, ttl=None)
+# Indexes of definitions put together from cached lists, by the identity of
+# the lists; each entry keeps its lists, so their ids are not reused.
+combined_indexes = TTLCache(maxsize=index_cache_size, ttl=None)
+
+
+def namespace_key(namespace):
+    """Return the index key for an attribute namespace.
+
+    Authorities are case insensitive; names are not.
+    """
+    authority, sep, name = namespace.partition(ATTR_)
+    return f"{authority.lower()}{sep}{name}"
+
+
+def _canonical(value):
+    if hasattr(value, "attribute"):
+        return value.attribute
+    return str(value)
+
+
+def definitions_digest(definitions):
+    """Return a digest that is equal for lists of the same definitions."""
+    canonical = json.dumps(
+        sorted(
+            json.dumps(definition, sort_keys=True, default=_canonical)
+            for definition in definitions
+        )
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def policy_from_definition(definition):
+    """Construct an AttributePolicy from a definition dict."""
+    namespace = f"{definition['authority']}/attr/{definition['name']}"
+    rule = definition.get("rule")
+    if rule is None:
+        # Use the default rule
+        return AttributePolicy(namespace)
+    if rule == HIERARCHY:
+        if "order" not in definition:
+            raise InvalidAttributeError(
+                "Failed to create hierarchy policy - no order array"
+            )
+        return AttributePolicy(namespace, rule=rule, order=definition["order"])
+    return AttributePolicy(namespace, rule=rule)
+
+
+class AttributeDefinitionIndex(object):
+    """An immutable index of attribute definitions by namespace.
+
+    Hierarchy ranks are computed when the index is built. AttributePolicies
+    and protobuf AttributeDefinitions are built on first use and kept, so
+    requests that share an index share that work. Where a namespace has more
+    than one definition the first is used, as the Access PDP does.
+
+    The index is also a read-only sequence of its definitions, and equal to
+    a list of the same definitions, so it can stand in for the list that
+    attribute plugins return.
+    """
+
+    def __init__(self, definitions=None, *, digest=None):
+        """Build the index from a list of definition dicts."""
+        self.__definitions = tuple(copy.deepcopy(list(definitions or [])))
+        self.__digest = digest or definitions_digest(self.__definitions)
+        self.__by_namespace = {}
+        self.__ranks = {}
+        for definition in self.__definitions:
+            key = namespace_key(f"{definition['authority']}/attr/{definition['name']}")
+            if key in self.__by_namespace:
+                if self.__by_namespace[key] != definition:
+                    logger.warning("Ignoring a second definition of [%s]", key)
+                continue
+            self.__by_namespace[key] = definition
+            if definition.get("rule") == HIERARCHY:
+                ranks = {}
+                for rank, value in enumerate(definition.get("order") or []):
+                    ranks.setdefault(value, rank)
+                self.__ranks[key] = types.MappingProxyType(ranks)
+        self.__lock = threading.Lock()
+        self.__policies = {}
+        self.__pb_definitions = None
+
+    def __len__(self):
+        """Return the number of definitions, as given."""
+        return len(self.__definitions)
+
+    def __contains__(self, namespace):
+        """Return true if the namespace has a definition."""
+        return namespace_key(namespace) in self.__by_namespace
+
+    def __iter__(self):
+        """Iterate over the definitions, in the order given."""
+        return iter(self.__definitions)
+
+    def __getitem__(self, i):
+        """Return a definition by position, in the order given."""
+        return self.__definitions[i]
+
+    def __eq__(self, other):
+        """Compare the definitions with an index, list or tuple, in order."""
+        if isinstance(other, AttributeDefinitionIndex):
+            other = other.definitions
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return self.__definitions == tuple(other)
+
+    __hash__ = None
+
+    @property
+    def digest(self):
+        """Return the digest of the definitions."""
+        return self.__digest
+
+    @digest.setter
+    def digest(self, value):
+        """Do not allow the digest to be set."""
+        pass
+
+    @property
+    def definitions(self):
+        """Return the definitions, in the order given."""
+        return self.__definitions
+
+    @definitions.setter
+    def definitions(self, value):
+        """Do not allow the definitions to be set."""
+        pass
+
+    @property
+    def namespaces(self):
+        """Return the defined namespaces."""
+        return tuple(self.__by_namespace)
+
+    @namespaces.setter
+    def namespaces(self, value):
+        """Do not allow the namespaces to be set."""
+        pass
+
+    def get(self, namespace):
+        """Return the definition for a namespace, or None."""
+        return self.__by_namespace.get(namespace_key(namespace))
+
+    def ranks(self, namespace):
+        """Return a read-only dict of value to rank for a hierarchy, or None.
+
+        Rank 0 is the highest value.
+        """
+        return self.__ranks.get(namespace_key(namespace))
+
+    def policy(self, namespace):
+        """Return the AttributePolicy for a namespace, or None."""
+        key = namespace_key(namespace)
+        definition = self.__by_namespace.get(key)
+        if definition is None:
+            return None
+        with self.__lock:
+            if key not in self.__policies:
+                self.__policies[key] = policy_from_definition(definition)
+            return self.__policies[key]
+
+    @property
+    def pb_definitions(self):
+        """Return the definitions as protobuf AttributeDefinitions."""
+        with self.__lock:
+            if self.__pb_definitions is None:
+                # The protobufs are only needed by the gRPC PDP backend.
+                import tdf3_kas_core.pdp_grpc as pdp_grpc
+
+                self.__pb_definitions = pdp_grpc.convert_attribute_defs(
+                    list(self.__definitions)
+                )
+            return self.__pb_definitions
+
+    @pb_definitions.setter
+    def pb_definitions(self, value):
+        """Do not allow the protobuf definitions to be set."""
+        pass
+
+
+def definition_index(definitions):
+    """Return the shared AttributeDefinitionIndex for a list of definitions.
+
+    An index is returned as is.
+    """
+    if isinstance(definitions, AttributeDefinitionIndex):
+        return definitions
+    definitions = list(definitions or [])
+    digest = definitions_digest(definitions)
+    return indexes.get_or_load(
+        digest,
+        lambda key: AttributeDefinitionIndex(definitions, digest=key),
+    )
+
+
+def combined_index(parts):
+    """Return the shared AttributeDefinitionIndex of lists of definitions.
+
+    The lists are matched by identity, so a plugin that answers from cached
+    lists serializes their definitions only the first time it combines
+    them. The lists must not be changed afterwards.
+    """
+    parts = tuple(parts)
+    key = tuple(id(part) for part in parts)
+    entry = combined_indexes.get(key)
+    if entry is not None and all(a is b for (a, b) in zip(entry[0], parts)):
+        return entry[1]
+    index = definition_index([definition for part in parts for definition in part])
+    combined_indexes.set(key, (parts, index))
+    return index
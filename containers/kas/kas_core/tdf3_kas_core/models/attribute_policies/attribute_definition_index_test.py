@@ -0,0 +1,138 @@
+"""Test AttributeDefinitionIndex."""
+
+import pytest
+
+from tdf3_kas_core.errors import InvalidAttributeError
+
+from . import attribute_definition_index
+from .attribute_definition_index import AttributeDefinitionIndex
+from .attribute_definition_index import combined_index
+from .attribute_definition_index import definition_index
+from .attribute_policy import ALL_OF
+from .attribute_policy import AttributePolicy
+from .attribute_policy import HIERARCHY
+from .attribute_policy_cache import AttributePolicyCache
+
+CLASSIFICATION = {
+    "authority": "https://example.com",
+    "name": "Classification",
+    "rule": "hierarchy",
+    "order": ["TS", "S", "C", "U"],
+}
+NTK = {"authority": "https://Example.com", "name": "NTK"}
+DEFINITIONS = [CLASSIFICATION, NTK]
+
+
+@pytest.fixture(autouse=True)
+def clear_indexes():
+    attribute_definition_index.indexes.clear()
+    attribute_definition_index.combined_indexes.clear()
+    yield
+    attribute_definition_index.indexes.clear()
+    attribute_definition_index.combined_indexes.clear()
+
+
+def test_index_lookup():
+    index = AttributeDefinitionIndex(DEFINITIONS)
+    assert len(index) == 2
+    assert index.get("https://example.com/attr/Classification") == CLASSIFICATION
+    # Authorities are case insensitive, names are not
+    assert "https://EXAMPLE.com/attr/NTK" in index
+    assert "https://example.com/attr/ntk" not in index
+    assert index.get("https://example.com/attr/Rel") is None
+    assert list(index) == DEFINITIONS
+
+
+def test_index_ranks():
+    index = AttributeDefinitionIndex(DEFINITIONS)
+    ranks = index.ranks("https://example.com/attr/Classification")
+    assert ranks == {"TS": 0, "S": 1, "C": 2, "U": 3}
+    with pytest.raises(TypeError):
+        ranks["X"] = 4
+    assert index.ranks("https://example.com/attr/NTK") is None
+
+
+def test_index_is_a_copy():
+    definitions = [dict(CLASSIFICATION, order=["TS", "S"])]
+    index = AttributeDefinitionIndex(definitions)
+    definitions[0]["order"].append("C")
+    assert index.get("https://example.com/attr/Classification")["order"] == [
+        "TS",
+        "S",
+    ]
+
+
+def test_index_first_definition_wins():
+    index = AttributeDefinitionIndex(
+        [CLASSIFICATION, dict(CLASSIFICATION, rule=ALL_OF)]
+    )
+    assert len(index) == 2
+    assert len(index.namespaces) == 1
+    assert index.get("https://example.com/attr/Classification")["rule"] == HIERARCHY
+
+
+def test_index_policies_are_built_once():
+    index = AttributeDefinitionIndex(DEFINITIONS)
+    policy = index.policy("https://example.com/attr/Classification")
+    assert isinstance(policy, AttributePolicy)
+    assert policy.rule == HIERARCHY
+    assert policy.ranks == {"TS": 0, "S": 1, "C": 2, "U": 3}
+    assert index.policy("https://example.com/attr/Classification") is policy
+    assert index.policy("https://example.com/attr/NTK").rule == ALL_OF
+    assert index.policy("https://example.com/attr/Rel") is None
+
+
+def test_index_policy_errors():
+    definition = {k: v for k, v in CLASSIFICATION.items() if k != "order"}
+    index = AttributeDefinitionIndex([definition])
+    with pytest.raises(InvalidAttributeError):
+        index.policy("https://example.com/attr/Classification")
+
+
+def test_definition_index_is_shared():
+    index = definition_index(DEFINITIONS)
+    assert definition_index(list(reversed(DEFINITIONS))) is index
+    assert definition_index(index) is index
+    assert definition_index([CLASSIFICATION]) is not index
+    assert index.digest == AttributeDefinitionIndex(DEFINITIONS).digest
+
+
+def test_index_is_a_sequence():
+    index = AttributeDefinitionIndex(DEFINITIONS)
+    assert index[1] == NTK
+    assert index == DEFINITIONS
+    assert index == AttributeDefinitionIndex(DEFINITIONS)
+    assert index != [NTK, CLASSIFICATION]
+    assert AttributeDefinitionIndex() == []
+
+
+def test_combined_index_is_shared(monkeypatch):
+    classification = [CLASSIFICATION]
+    ntk = [NTK]
+    index = combined_index([classification, ntk])
+    assert index == DEFINITIONS
+    assert index is definition_index(DEFINITIONS)
+
+    # The same lists are not serialized again
+    def digest(definitions):
+        raise AssertionError("definitions serialized")
+
+    monkeypatch.setattr(attribute_definition_index, "definitions_digest", digest)
+    assert combined_index([classification, ntk]) is index
+
+
+def test_combined_index_by_identity():
+    index = combined_index([[CLASSIFICATION], [NTK]])
+    # Equal lists that are not the same lists are indexed afresh
+    other = combined_index([[CLASSIFICATION], [dict(NTK, rule="anyOf")]])
+    assert other is not index
+    assert other[1]["rule"] == "anyOf"
+
+
+def test_attribute_policy_cache_with_index():
+    cache = AttributePolicyCache(definition_index(DEFINITIONS))
+    assert cache.size == 2
+    assert cache.get("https://example.com/attr/Classification").rule == HIERARCHY
+    # Namespaces without a definition still get the default policy
+    assert cache.get("https://example.com/attr/Rel").rule == ALL_OF
+    assert cache.size == 3
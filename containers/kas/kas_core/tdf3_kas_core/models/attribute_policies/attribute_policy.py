@@ -47,6 +47,7 @@ class AttributePolicy(object):
 
         # Check and remember the keyword options
         self.__options = {}
+        self.__ranks = None
         if rule == HIERARCHY:
             if "order" not in kwargs:
                 raise AttributePolicyConfigError(
@@ -57,6 +58,10 @@ class AttributePolicy(object):
             for val in kwargs["order"]:
                 order.append(val)
             self.__options["order"] = tuple(order)
+            # Rank 0 is the highest value
+            self.__ranks = {}
+            for rank, val in enumerate(order):
+                self.__ranks.setdefault(val, rank)
 
     def __eq__(self, other):
         """Return equality of equal but different objects."""
@@ -98,3 +103,13 @@ class AttributePolicy(object):
     def options(self, new_options):
         """Setter for options property is a noop. Read-only."""
         pass
+
+    @property
+    def ranks(self):
+        """Getter for the value to rank dict of a hierarchy, or None."""
+        return self.__ranks
+
+    @ranks.setter
+    def ranks(self, new_ranks):
+        """Setter for ranks property is a noop. Read-only."""
+        pass
@@ -1,10 +1,8 @@
 """AttributesCache, a reference for AttributePolicies."""
 import logging
 
-from tdf3_kas_core.errors import InvalidAttributeError
-
+from .attribute_definition_index import policy_from_definition
 from .attribute_policy import AttributePolicy
-from .attribute_policy import HIERARCHY
 from .get_attribute_policy import get_attribute_policy
 
 logger = logging.getLogger(__name__)
@@ -13,17 +11,21 @@ logger = logging.getLogger(__name__)
 class AttributePolicyCache(object):
     """The AttributePolicyCache Class.
 
-    This class caches AttributePolicies.
+    This class caches AttributePolicies. Policies for namespaces in the
+    optional AttributeDefinitionIndex come from the index, which is shared
+    between requests.
     """
 
-    def __init__(self):
-        """Construct an empty set."""
+    def __init__(self, index=None):
+        """Construct an empty set, backed by an optional index."""
         self.__policies = {}  # URL keyed dict of AttributePolicies
+        self.__index = index
 
     @property
     def size(self):
         """Return the number of policies in the cache."""
-        return len(self.__policies)
+        indexed = len(self.__index.namespaces) if self.__index is not None else 0
+        return len(self.__policies) + indexed
 
     def load_config(self, attribute_policy_config):
         """Load policies defined in a config dict."""
@@ -39,28 +41,7 @@ class AttributePolicyCache(object):
             authority_namespace = attribute_object["authority"]
             attribute_name = attribute_object["name"]
             attribute_name_object = f"{authority_namespace}/attr/{attribute_name}"
-            if "rule" in attribute_object:
-                # specialize the arguments for the rule
-                if attribute_object["rule"] == HIERARCHY:
-                    if "order" not in attribute_object:
-                        raise InvalidAttributeError(
-                            """
-                            Failed to create hierarchy policy
-                             - no order array
-                        """
-                        )
-                    policy = AttributePolicy(
-                        attribute_name_object,
-                        rule=attribute_object["rule"],
-                        order=attribute_object["order"],
-                    )
-                else:  # No special options argument list
-                    policy = AttributePolicy(
-                        attribute_name_object, rule=attribute_object["rule"]
-                    )
-            else:
-                # Use the default rule
-                policy = AttributePolicy(attribute_name_object)
+            policy = policy_from_definition(attribute_object)
 
             # Add to the cache
             logger.debug("--- cached  [policy = %s] ---", str(policy))
@@ -69,6 +50,8 @@ class AttributePolicyCache(object):
 
     def get(self, namespace):
         """Get an AttributePolicy."""
+        if self.__index is not None and namespace in self.__index:
+            return self.__index.policy(namespace)
         try:
             count = 2
             while (namespace not in self.__policies) and (count > 0):
@@ -21,6 +21,8 @@ class AttributeCluster(object):
             raise InvalidAttributeError(namespace)
         self.__namespace = namespace
         self.__values = {}
+        # Built on first use and kept until the cluster changes
+        self.__frozen = None
 
     @property
     def namespace(self):
@@ -35,7 +37,9 @@ class AttributeCluster(object):
     @property
     def values(self):
         """Return an immutable set of the values."""
-        return frozenset(self.__values.values())
+        if self.__frozen is None:
+            self.__frozen = frozenset(self.__values.values())
+        return self.__frozen
 
     @values.setter
     def values(self, data):
@@ -55,6 +59,7 @@ class AttributeCluster(object):
         if not isinstance(attr, AttributeValue):
             raise InvalidAttributeError("Not an AttributeValue")
         self.__values[attr.attribute] = attr
+        self.__frozen = None
         return attr
 
     def get(self, attribute):
@@ -68,5 +73,6 @@ class AttributeCluster(object):
         if attribute in self.__values:
             removed = self.__values[attribute]
             del self.__values[attribute]
+            self.__frozen = None
             return removed
         return None
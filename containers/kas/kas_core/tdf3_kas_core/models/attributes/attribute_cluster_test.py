@@ -98,3 +98,17 @@ def test_attribute_cluster_remove_non_existing():
     actual = test_set.remove("https://www.virtru.com/attr/NTK/value/B")
     assert test_set.size == 1
     assert actual is None
+
+
+def test_attribute_cluster_values_follow_changes():
+    """The values set is kept between calls and rebuilt after a change."""
+    test_set = AttributeCluster("https://www.virtru.com/attr/NTK")
+    A = AttributeValue("https://www.virtru.com/attr/NTK/value/A")
+    B = AttributeValue("https://www.virtru.com/attr/NTK/value/B")
+    test_set.add(A)
+    values = test_set.values
+    assert test_set.values is values
+    test_set.add(B)
+    assert test_set.values == frozenset([A, B])
+    test_set.remove(A.attribute)
+    assert test_set.values == frozenset([B])
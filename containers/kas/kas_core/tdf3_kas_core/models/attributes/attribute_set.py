@@ -30,13 +30,12 @@ class AttributeSet(object):
     def values(self):
         """Return an immutable set of AttributeValues.
 
-        This is a fairly expensive operation. Use sparingly. If a set clone
-        is needed do it directly at the AttributeCluster level.
+        This builds a new set from every cluster. Use sparingly. If a set
+        clone is needed do it directly at the AttributeCluster level.
         """
-        values = set()
-        for cluster in self.__clusters.values():
-            values = values | cluster.values
-        return frozenset(values)
+        return frozenset().union(
+            *(cluster.values for cluster in self.__clusters.values())
+        )
 
     @values.setter
     def values(self, data):
@@ -1,6 +1,7 @@
 """AttributeValue."""
 
 import logging
+import sys
 
 from tdf3_kas_core.errors import InvalidAttributeError
 from tdf3_kas_core.validation import attr_attribute_check
@@ -22,6 +23,10 @@ class AttributeValue(object):
     the "attribute" string is required.
     """
 
+    # Values are created for every attribute of every policy and entity,
+    # so keep them small and do the string work once.
+    __slots__ = ("_authority", "_name", "_value", "_namespace", "_attribute", "_hash")
+
     def __init__(self, attribute=None):
         """Initialize with a attribute string (aka URL or attribute)."""
         if not attribute:
@@ -32,11 +37,15 @@ class AttributeValue(object):
         first_splits = attribute.split(ATTR_)
         second_splits = first_splits[1].split(VALUE_)
 
-        # Authority namespace is case insensitive
-        self._authority = first_splits[0].lower()
+        # Authority namespace is case insensitive. Authorities and names
+        # repeat across values, so share one copy of each.
+        self._authority = sys.intern(first_splits[0].lower())
         # Name and value are case sensitive
-        self._name = second_splits[0]
+        self._name = sys.intern(second_splits[0])
         self._value = second_splits[1]
+        self._namespace = sys.intern(f"{self._authority}{ATTR_}{self._name}")
+        self._attribute = f"{self._namespace}{VALUE_}{self._value}"
+        self._hash = hash((self._namespace, self._value))
 
         logger.debug("Attribute Authority = %s", self._authority)
         logger.debug("Attribute Name  = %s", self._name)
@@ -44,24 +53,24 @@ class AttributeValue(object):
 
     def __eq__(self, other):
         """Compare self to other for equality."""
-        namespace_equal = self.namespace == other.namespace
-        logger.debug(
-            "Is self namespace %s == other namespace %s?",
-            self.namespace,
-            other.namespace,
+        if self is other:
+            return True
+        if not isinstance(other, AttributeValue):
+            return NotImplemented
+        return (
+            self._hash == other._hash
+            and self._value == other._value
+            and self._namespace == other._namespace
         )
-        value_equal = self.value == other.value
-        logger.debug("Is self value %s == other value %s?", self.value, other.value)
-        return namespace_equal and value_equal
 
     def __hash__(self):
         """Generate a hash value common between all equal instances."""
-        return hash((self.namespace, self.value))
+        return self._hash
 
     @property
     def namespace(self):
         """Return the fully defined namespace = authority + name name."""
-        return f"{self._authority}/attr/{self._name}"
+        return self._namespace
 
     @namespace.setter
     def namespace(self, new_namespace):
@@ -106,7 +115,7 @@ class AttributeValue(object):
     @property
     def attribute(self):
         """Return the entire attribute string."""
-        return self.make_uri(self._authority, self._name, self._value)
+        return self._attribute
 
     @attribute.setter
     def attribute(self, new_attribute):
@@ -78,3 +78,22 @@ def test_attribute_value_equal_namespace_case_insensitive():
     v1 = AttributeValue("https://www.example.com/attr/Foo/value/Bar")
     v2 = AttributeValue("https://www.example.com/attr/Foo/value/Bar")
     assert v1 == v2
+
+
+def test_attribute_value_not_equal():
+    """Values differ by value, name and authority, and from other types."""
+    v1 = AttributeValue("https://www.example.com/attr/Foo/value/Bar")
+    assert v1 != AttributeValue("https://www.example.com/attr/Foo/value/Baz")
+    assert v1 != AttributeValue("https://www.example.com/attr/Foz/value/Bar")
+    assert v1 != AttributeValue("https://example.com/attr/Foo/value/Bar")
+    assert v1 != "https://www.example.com/attr/Foo/value/Bar"
+
+
+def test_attribute_value_is_compact():
+    """Values have no __dict__ and share namespace strings."""
+    v1 = AttributeValue("https://www.EXAMPLE.com/attr/Foo/value/Bar")
+    v2 = AttributeValue("https://www.example.com/attr/Foo/value/Baz")
+    assert not hasattr(v1, "__dict__")
+    assert v1.namespace is v2.namespace
+    assert v1.attribute == "https://www.example.com/attr/Foo/value/Bar"
+    assert hash(v1) == hash(AttributeValue(v1.attribute))
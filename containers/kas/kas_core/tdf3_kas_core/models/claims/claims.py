@@ -1,13 +1,12 @@
 """The claims object represents the entity asking for the rewrap."""
 import logging
 
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePublicKey
 
 from tdf3_kas_core.models import ClaimsAttributes
 from tdf3_kas_core.errors import ClaimsError
+from tdf3_kas_core.util import load_pem_public_key
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +32,8 @@ class Claims(object):
     def load_from_raw_tdf_claims(cls, user_id, claims_cert_obj):
         """Create an Claims object from raw data."""
         # The public key is packaged in the cert string
-        claims_public_key = serialization.load_pem_public_key(
-            str.encode(claims_cert_obj["client_public_signing_key"]),
-            backend=default_backend(),
+        claims_public_key = load_pem_public_key(
+            claims_cert_obj["client_public_signing_key"]
         )
 
         # ClaimsAttributes class takes a list of entitlements, each with
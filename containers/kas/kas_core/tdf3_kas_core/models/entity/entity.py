@@ -1,10 +1,12 @@
 """The entity object represents the entity asking for the rewrap."""
+import hashlib
 import logging
+import os
+import time
 
-import logging
+import jwt
 
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePublicKey
 
@@ -13,9 +15,54 @@ from tdf3_kas_core.models import EntityAttributes
 from tdf3_kas_core.models import ClaimsAttributes
 from tdf3_kas_core.errors import AuthorizationError
 from tdf3_kas_core.errors import EntityError
+from tdf3_kas_core.util import load_pem_public_key
+from tdf3_kas_core.util import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Entities whose cert and attribute JWTs have already verified, keyed by a
+# hash of the AA key and the cert, so a legacy client sending the same entity
+# object with every request pays for the N+1 signature checks once. Entries
+# never outlive the earliest `exp` of those JWTs; a TTL of 0 disables the
+# cache.
+verified_entity_ttl = int(os.environ.get("KAS_VERIFIED_ENTITY_CACHE_TTL", "60"))
+verified_entity_cache_size = int(
+    os.environ.get("KAS_VERIFIED_ENTITY_CACHE_SIZE", "1024")
+)
+verified_entities = TTLCache(
+    maxsize=verified_entity_cache_size, ttl=verified_entity_ttl
+)
+
+
+def _verified_entity_key(aa_public_key, cert) -> bytes:
+    h = hashlib.sha256()
+    h.update(
+        aa_public_key.public_bytes(
+            serialization.Encoding.DER,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    h.update(b".")
+    h.update(cert if isinstance(cert, bytes) else cert.encode())
+    return h.digest()
+
+
+def _remember_verified(cache_key, entity, entity_cert_obj):
+    ttl = verified_entity_ttl
+    try:
+        # The attribute JWTs have verified; only their claims are read here.
+        payloads = [entity_cert_obj] + [
+            jwt.decode(attribute["jwt"], options={"verify_signature": False})
+            for attribute in entity_cert_obj["attributes"]
+        ]
+        for payload in payloads:
+            if "exp" in payload:
+                ttl = min(ttl, float(payload["exp"]) - time.time())
+    except (TypeError, ValueError, jwt.exceptions.PyJWTError):
+        return
+    if ttl > 0:
+        verified_entities.set(cache_key, entity, ttl=ttl)
+
 
 class Entity(object):
     """Entity models the requesting entity.
@@ -29,7 +76,21 @@ class Entity(object):
         """Create an Entity object from raw data.
 
         The raw data is trusted if it checks out with the AA public key.
+        Entities that have verified recently are shared; treat them as
+        read-only.
         """
+        cache_key = None
+        cert = raw_data.get("cert") if isinstance(raw_data, dict) else None
+        if (
+            verified_entity_ttl > 0
+            and isinstance(cert, (str, bytes))
+            and hasattr(aa_public_key, "public_bytes")
+        ):
+            cache_key = _verified_entity_key(aa_public_key, cert)
+            entity = verified_entities.get(cache_key)
+            if entity is not None:
+                return entity
+
         # Ensure the cert is valid
         try:
             entity_cert_obj = unpack_rs256_jwt(raw_data["cert"], aa_public_key)
@@ -39,15 +100,16 @@ class Entity(object):
         # Unpack the raw data
         user_id = entity_cert_obj["userId"]
         # The public key is packaged in the cert string
-        entity_public_key = serialization.load_pem_public_key(
-            str.encode(entity_cert_obj["publicKey"]), backend=default_backend()
-        )
+        entity_public_key = load_pem_public_key(entity_cert_obj["publicKey"])
         # EntityAttributes class takes unpacks the raw data for each attribute
         entity_attributes = EntityAttributes.create_from_raw(
             entity_cert_obj["attributes"], aa_public_key
         )
         # Pack and ship the instance
-        return cls(user_id, entity_public_key, entity_attributes)
+        entity = cls(user_id, entity_public_key, entity_attributes)
+        if cache_key is not None:
+            _remember_verified(cache_key, entity, entity_cert_obj)
+        return entity
 
     def __init__(self, user_id, public_key, entity_attributes=None):
         """Initialize with verified data.
@@ -1,5 +1,7 @@
 """Test the entity object."""
 
+import time
+
 import jwt
 import pytest
 from cryptography.hazmat.primitives import serialization
@@ -9,6 +11,7 @@ import tdf3_kas_core
 from tdf3_kas_core.errors import EntityError
 from tdf3_kas_core.models import EntityAttributes
 
+from . import entity
 from .entity import Entity
 
 
@@ -125,3 +128,63 @@ def test_load_from_raw_data_raises_on_invalid_jwt(public_key, private_key):
     data["cert"] = data["cert"] + "aaaaaaa"
     with pytest.raises(tdf3_kas_core.errors.AuthorizationError):
         Entity.load_from_raw_data(data, public_key)
+
+
+@pytest.fixture
+def verified_entities(monkeypatch):
+    cache = entity.TTLCache(maxsize=8, ttl=60)
+    monkeypatch.setattr(entity, "verified_entities", cache)
+    monkeypatch.setattr(entity, "verified_entity_ttl", 60)
+    return cache
+
+
+def test_load_from_raw_data_is_cached(
+    monkeypatch, verified_entities, public_key, private_key, entity_public_key
+):
+    data = make_eo(public_key, private_key)
+    first = Entity.load_from_raw_data(data, public_key)
+
+    def fail(*args):
+        raise AssertionError("verified again")
+
+    monkeypatch.setattr(entity, "unpack_rs256_jwt", fail)
+    monkeypatch.setattr(entity.EntityAttributes, "create_from_raw", fail)
+    assert Entity.load_from_raw_data(data, public_key) is first
+    assert len(verified_entities) == 1
+
+    # A different AA key does not share the entry
+    with pytest.raises(tdf3_kas_core.errors.AuthorizationError):
+        Entity.load_from_raw_data(data, entity_public_key)
+
+
+def test_load_from_raw_data_cache_expires_with_jwts(
+    monkeypatch, public_key, private_key
+):
+    now = [1000.0]
+    cache = entity.TTLCache(maxsize=8, ttl=60, timer=lambda: now[0])
+    monkeypatch.setattr(entity, "verified_entities", cache)
+    monkeypatch.setattr(entity, "verified_entity_ttl", 60)
+    data = make_eo(public_key, private_key)
+    # The earliest exp, on an attribute JWT, bounds the entry
+    data["attributes"][1]["jwt"] = jwt.encode(
+        {
+            "attribute": "https://example.com/attr/COI/value/PRX",
+            "exp": int(time.time()) + 30,
+        },
+        private_key,
+        algorithm="RS256",
+    )
+    data["cert"] = jwt.encode(
+        {k: v for k, v in data.items() if k != "cert"}, private_key, algorithm="RS256"
+    )
+    first = Entity.load_from_raw_data(data, public_key)
+    assert Entity.load_from_raw_data(data, public_key) is first
+    now[0] += 31
+    assert Entity.load_from_raw_data(data, public_key) is not first
+
+
+def test_load_from_raw_data_without_cache(monkeypatch, public_key, private_key):
+    monkeypatch.setattr(entity, "verified_entity_ttl", 0)
+    data = make_eo(public_key, private_key)
+    first = Entity.load_from_raw_data(data, public_key)
+    assert Entity.load_from_raw_data(data, public_key) is not first
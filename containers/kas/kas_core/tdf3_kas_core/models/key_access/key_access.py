@@ -2,6 +2,7 @@
 import logging
 
 from tdf3_kas_core.errors import KeyAccessError
+from tdf3_kas_core.models import WrappedKey
 from tdf3_kas_core.validation import attr_authority_check
 
 from .key_access_helpers import add_required_values
@@ -34,6 +35,7 @@ class KeyAccess(object):
         self.__url = None
         self.__protocol = None
         self.__wrapped_key = None
+        self.__wrapped_key_model = None
         self.__policy_binding = None
         self.__metadata = None
         self.__policy_sync_options = None
@@ -80,7 +82,10 @@ class KeyAccess(object):
             raise KeyAccessError(msg)
 
         kao.metadata = decrypt_metadata_string(
-            raw_dict, wrapped_key=kao.wrapped_key, private_key=private_key
+            raw_dict,
+            wrapped_key=kao.wrapped_key,
+            private_key=private_key,
+            wrapped_key_model=kao.wrapped_key_model,
         )
 
         logger.debug("Key Access Object Complete = %s", kao)
@@ -176,8 +181,35 @@ class KeyAccess(object):
             msg = "wrapped key must be string"
             logger.error("%s, got [%s]", msg, value)
             raise KeyAccessError(msg)
+        if value != self.__wrapped_key:
+            # The unwrapped key belongs to the old wrapped key
+            self.__wrapped_key_model = None
         self.__wrapped_key = value
 
+    @property
+    def wrapped_key_model(self):
+        """Get the unwrapped WrappedKey model (may be None)."""
+        return self.__wrapped_key_model
+
+    @wrapped_key_model.setter
+    def wrapped_key_model(self, value):
+        """Set the WrappedKey model unwrapped from wrapped_key."""
+        self.__wrapped_key_model = value
+
+    def unwrap(self, private_key):
+        """Return the WrappedKey model, unwrapping the wrapped key at most once.
+
+        Unwrapping is an RSA private key operation, so the binding check,
+        metadata decrypt and rewrap all share the one model.
+        """
+        if self.__wrapped_key is None:
+            raise KeyAccessError("No wrapped key in key access model")
+        if self.__wrapped_key_model is None:
+            self.__wrapped_key_model = WrappedKey.from_raw(
+                self.__wrapped_key, private_key
+            )
+        return self.__wrapped_key_model
+
     @property
     def metadata(self):
         """Get the meta-data (may be None)."""
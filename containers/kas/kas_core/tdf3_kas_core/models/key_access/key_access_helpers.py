@@ -61,7 +61,7 @@ def add_wrapped_values(kao, raw_dict, private_key=None, canonical_policy=None):
     try:
         # This used to be a WrappedKey model. Now it is just the string.
         kao.wrapped_key = raw_dict["wrappedKey"]
-        kao.wrapped_key_model = WrappedKey.from_raw(kao.wrapped_key, private_key)
+        kao.unwrap(private_key)
 
         kao.policy_binding = raw_dict["policyBinding"]
 
@@ -78,11 +78,15 @@ def add_wrapped_values(kao, raw_dict, private_key=None, canonical_policy=None):
     return kao
 
 
-def decrypt_metadata_string(raw_dict, wrapped_key=None, private_key=None):
+def decrypt_metadata_string(
+    raw_dict, wrapped_key=None, private_key=None, wrapped_key_model=None
+):
     """Decrypt and unpack the metadata.
 
     Wrapped_key is (currently) the kas-wrapped symmetric object key, and
     private_key is the kas private key used to unwrap the object key.
+    If the object key has already been unwrapped, pass it as
+    wrapped_key_model to skip unwrapping it again.
 
     In the (near) future this will change.  The kas-private as a single key
     that "rules them all" may change.  Also, and more importantly, the object
@@ -113,7 +117,9 @@ def decrypt_metadata_string(raw_dict, wrapped_key=None, private_key=None):
 
     # Policies currently work with a single KAS environment.
     # Future implementations may support a multi-KAS environment.
-    object_key = WrappedKey.from_raw(wrapped_key, private_key)
+    object_key = wrapped_key_model
+    if object_key is None:
+        object_key = WrappedKey.from_raw(wrapped_key, private_key)
     metadata = decrypt_encrypted_metadata(metadata_dict, object_key)
 
     logger.debug("decrypted metadata = %s", metadata)
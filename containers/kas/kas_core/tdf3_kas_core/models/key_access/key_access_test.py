@@ -112,6 +112,35 @@ def test_key_access_from_raw_wrapped(raw_wrapped_key, private_key):
     assert actual.wrapped_key == raw_wrapped_key
 
 
+def test_key_access_unwrap_once(raw_wrapped_key, private_key, public_key):
+    """The wrapped key is unwrapped once, until it is replaced."""
+    raw = {
+        "type": "wrapped",
+        "url": "http://127.0.0.1:4000",
+        "protocol": "kas",
+        "wrappedKey": raw_wrapped_key,
+        "policyBinding": raw_binding,
+    }
+    actual = KeyAccess.from_raw(
+        raw, private_key=private_key, canonical_policy=canonical_policy
+    )
+    model = actual.wrapped_key_model
+    assert model is not None
+    assert actual.unwrap(private_key) is model
+
+    actual.wrapped_key = bytes.decode(
+        base64.b64encode(aes_encrypt_sha1(plain_key, public_key))
+    )
+    assert actual.wrapped_key_model is None
+    assert actual.unwrap(private_key) is not model
+
+
+def test_key_access_unwrap_without_wrapped_key(private_key):
+    """Unwrap needs a wrapped key."""
+    with pytest.raises(KeyAccessError):
+        KeyAccess().unwrap(private_key)
+
+
 def test_key_access_to_dict_remote(private_key):
     """Test the key_access to_dict production method."""
     raw = {"type": "remote", "url": "http://127.0.0.1:4000", "protocol": "kas"}
@@ -6,6 +6,7 @@ import logging
 from typing import Union
 
 from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.asymmetric.types import (
     PrivateKeyTypes,
     PublicKeyTypes,
@@ -91,6 +92,19 @@ class KeyMaster(object):
         # with key_manager.
         raise KeyNotFoundError(msg)
 
+    def ec_private_key(self, curve_name: str) -> ec.EllipticCurvePrivateKey:
+        """Get the KAS EC private key for a curve, e.g. secp256r1.
+
+        The key is ready to use for ECDH; callers need not serialize it.
+        """
+        key_name = f"KAS-EC-{curve_name.upper()}-PRIVATE"
+        key = self.private_key(key_name)
+        if not (
+            isinstance(key, ec.EllipticCurvePrivateKey) and key.curve.name == curve_name
+        ):
+            raise KeyNotFoundError(f"Key '{key_name}' is not a {curve_name} key")
+        return key
+
     def get_export_string(self, key_name: str) -> str:
         """Get an exportable key string."""
         if key_name in self.__keys:
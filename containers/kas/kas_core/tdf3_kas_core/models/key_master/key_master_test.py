@@ -4,6 +4,7 @@ import pytest
 
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePrivateKey
 
 #
 from tdf3_kas_core.errors import KeyNotFoundError
@@ -56,6 +57,21 @@ def test_key_master_get_private(private_key_path):
     assert isinstance(actual, RSAPrivateKey)
 
 
+def test_key_master_ec_private_key(ec_private_key_path, private_key_path):
+    """Get the EC private key for a curve."""
+    km = KeyMaster()
+    km.set_key_path("KAS-EC-SECP256R1-PRIVATE", "PRIVATE", ec_private_key_path)
+    actual = km.ec_private_key("secp256r1")
+    assert isinstance(actual, EllipticCurvePrivateKey)
+    assert actual is km.private_key("KAS-EC-SECP256R1-PRIVATE")
+    with pytest.raises(KeyNotFoundError):
+        km.ec_private_key("secp384r1")
+
+    km.set_key_path("KAS-EC-SECP256R1-PRIVATE", "PRIVATE", private_key_path)
+    with pytest.raises(KeyNotFoundError):
+        km.ec_private_key("secp256r1")
+
+
 def test_key_master_private_key_non_existant():
     """Try to get a non-existant key."""
     km = KeyMaster()
@@ -3,3 +3,6 @@ Constants
 """
 
 MAGIC_STRING = b"L1L"
+
+# The version in the low six bits of the third magic byte
+VERSION = 12
@@ -6,6 +6,7 @@ import logging
 import math
 import os
 from enum import Enum
+from typing import Union
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
@@ -18,6 +19,10 @@ from cryptography.hazmat.primitives.asymmetric.utils import (
 )
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
+from tdf3_kas_core.util import crypto_executor
+
+from . import key_pool
+
 
 logger = logging.getLogger(__name__)
 
@@ -121,6 +126,45 @@ class CurveMode(Enum):
     Curve25519 = 4
 
 
+def exchange_with_private_key(key_alg, peer_public_key_bytes, private_key=None):
+    """Derive the symmetric key shared by private_key and a peer public key.
+
+    Run on the crypto executor.
+    """
+    peer_public_key = ec.EllipticCurvePublicKey.from_encoded_point(
+        key_alg(), peer_public_key_bytes
+    )
+    shared_key = private_key.exchange(ec.ECDH(), peer_public_key)
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=DEFAULT_SALT,
+        info=None,
+        backend=default_backend(),
+    ).derive(shared_key)
+
+
+def exchange_with_ephemeral_key(key_alg, receiver_public_key_bytes, private_key=None):
+    """Generate an ephemeral key and derive the key it shares with a receiver.
+
+    Run on the crypto executor. Returns the ephemeral private key as DER,
+    its compressed public key and the derived key.
+    """
+    ephemeral_key = ec.generate_private_key(key_alg(), default_backend())
+    public_key_bytes = ephemeral_key.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
+    )
+    derived_key = exchange_with_private_key(
+        key_alg, receiver_public_key_bytes, private_key=ephemeral_key
+    )
+    private_key_bytes = ephemeral_key.private_bytes(
+        serialization.Encoding.DER,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return (private_key_bytes, public_key_bytes, derived_key)
+
+
 class Encryptor(object):
     key_alg = ec.SECP256K1
 
@@ -138,24 +182,21 @@ class Encryptor(object):
 
     @classmethod
     def create(cls, curve: "Curve", receiver_public_key_bytes: bytes):
-        private_key = ec.generate_private_key(cls.key_alg(), default_backend())
-        public_key_bytes = private_key.public_key().public_bytes(
-            serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
-        )
-        receiver_public_key = ec.EllipticCurvePublicKey.from_encoded_point(
-            cls.key_alg(), receiver_public_key_bytes
-        )
-        shared_key = private_key.exchange(ec.ECDH(), receiver_public_key)
-
-        derived_key = HKDF(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=DEFAULT_SALT,
-            info=None,
-            backend=default_backend(),
-        ).derive(shared_key)
+        key_pair = key_pool.take(cls.key_alg)
+        if key_pair is not None:
+            # Only the exchange is left; run it here, not on the executor,
+            # which would have to send the one-time key to its workers.
+            (private_key, public_key_bytes) = key_pair
+            derived_key = exchange_with_private_key(
+                cls.key_alg, receiver_public_key_bytes, private_key=private_key
+            )
+            return cls(curve, public_key_bytes, derived_key, private_key)
 
-        return cls(curve, public_key_bytes, derived_key, private_key)
+        (private_key_bytes, public_key_bytes, derived_key) = crypto_executor.run(
+            exchange_with_ephemeral_key, cls.key_alg, receiver_public_key_bytes
+        )
+        # The private key is only loaded if this encryptor is asked to sign
+        return cls(curve, public_key_bytes, derived_key, private_key_bytes)
 
     def __init__(
         self, curve: "Curve", public_key: bytes, symmetric_key: bytes, private_key
@@ -174,6 +215,10 @@ class Encryptor(object):
         return self._public_key
 
     def sign(self, data_to_sign: bytes) -> bytes:
+        if isinstance(self._private_key, bytes):
+            self._private_key = serialization.load_der_private_key(
+                self._private_key, None, backend=default_backend()
+            )
         der_encoded_signature = self._private_key.sign(
             data_to_sign, ec.ECDSA(hashes.SHA256())
         )
@@ -200,24 +245,29 @@ class Decryptor(object):
 
     @classmethod
     def create(
-        cls, curve: "Curve", ephemeral_public_key_bytes: bytes, private_key_bytes: bytes
+        cls,
+        curve: "Curve",
+        ephemeral_public_key_bytes: bytes,
+        private_key: Union[bytes, ec.EllipticCurvePrivateKey],
     ):
-        private_key = serialization.load_der_private_key(
-            private_key_bytes, None, backend=default_backend()
-        )
+        """Derive the key shared with an ephemeral public key.
+
+        private_key is a loaded EC private key, or one in PKCS8 DER.
+        """
+        if isinstance(private_key, bytes):
+            private_key = serialization.load_der_private_key(
+                private_key, None, backend=default_backend()
+            )
 
         ephemeral_public_key = ec.EllipticCurvePublicKey.from_encoded_point(
             cls.key_alg(), ephemeral_public_key_bytes
         )
-        shared_key = private_key.exchange(ec.ECDH(), ephemeral_public_key)
-
-        derived_key = HKDF(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=DEFAULT_SALT,
-            info=None,
-            backend=default_backend(),
-        ).derive(shared_key)
+        derived_key = crypto_executor.run(
+            exchange_with_private_key,
+            cls.key_alg,
+            ephemeral_public_key_bytes,
+            private_key=private_key,
+        )
 
         return cls(curve, private_key, ephemeral_public_key, derived_key)
 
@@ -277,7 +327,9 @@ class Curve(object):
         return self.encryptor_cls.create(self, public_key)
 
     def create_decryptor(
-        self, ephemeral_public: bytes, private_key: bytes
+        self,
+        ephemeral_public: bytes,
+        private_key: Union[bytes, ec.EllipticCurvePrivateKey],
     ) -> Decryptor:
         return self.decryptor_cls.create(self, ephemeral_public, private_key)
 
@@ -1,6 +1,8 @@
 import pytest
 
-from .crypto import GCMCipher, flags
+from cryptography.hazmat.primitives import serialization
+
+from .crypto import CurveSECP256R1, GCMCipher, flags
 
 
 @pytest.fixture
@@ -49,3 +51,21 @@ def test_encrypt_standard_iv_future(disallow_small_iv):
     (ciphertext, tag) = cipher.encrypt(b"hello")
     assert cipher.decrypt(ciphertext, tag) == b"hello"
     assert len(tag) == 12
+
+
+def test_decryptor_accepts_loaded_key(ec_private_key):
+    curve = CurveSECP256R1()
+    encryptor = curve.create_encryptor(
+        ec_private_key.public_key().public_bytes(
+            serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
+        )
+    )
+    private_key_bytes = ec_private_key.private_bytes(
+        serialization.Encoding.DER,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+    from_key = curve.create_decryptor(encryptor.public_key, ec_private_key)
+    from_der = curve.create_decryptor(encryptor.public_key, private_key_bytes)
+    assert from_key.symmetric_key == from_der.symmetric_key == encryptor.symmetric_key
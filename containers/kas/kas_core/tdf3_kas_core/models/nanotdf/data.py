@@ -26,6 +26,17 @@ class ByteData(object):
     def parse_with_content_length(cls, size: int, data: bytes) -> ("ByteData", bytes):
         return (cls(data[0:size]), data[size:])
 
+    @classmethod
+    def read(cls, reader, length_bytes: int, field: str) -> "ByteData":
+        """Read data preceded by its length in length_bytes."""
+        size = reader.uint(length_bytes, f"{field} length")
+        return cls(reader.read(size, field))
+
+    @classmethod
+    def read_with_content_length(cls, reader, size: int, field: str) -> "ByteData":
+        """Read size bytes of data."""
+        return cls(reader.read(size, field))
+
     def __init__(self, data: bytes):
         self._data = data
 
@@ -15,6 +15,18 @@ class ECCMode(object):
 
         return (cls(use_ecdsa_binding, CurveMode(ecc_params)), data[1:])
 
+    @classmethod
+    def read(cls, reader) -> "ECCMode":
+        offset = reader.offset
+        ecc_mode_byte = reader.byte("ECC mode")
+        try:
+            curve_mode = CurveMode(ecc_mode_byte & 0x07)
+        except ValueError:
+            raise reader.error(
+                f"Unknown ECC mode curve [{ecc_mode_byte & 0x07}]", offset
+            ) from None
+        return cls(bool(ecc_mode_byte & 0x80), curve_mode)
+
     def __init__(self, use_ecdsa_binding: bool, params: CurveMode):
         self._use_ecdsa_binding = use_ecdsa_binding
         self._params = params
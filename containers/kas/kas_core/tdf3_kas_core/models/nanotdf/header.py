@@ -1,12 +1,42 @@
 from .constants import MAGIC_STRING
+from .constants import VERSION
 from .locator import ResourceLocator
 from .eccbinding import ECCMode
 from .symconfig import SymmetricAndPayloadConfig
 from .policy import Policy
 from .data import ByteData
+from .reader import Reader
 
 
 class Header(object):
+    @classmethod
+    def parse(cls, data) -> ("Header", memoryview):
+        """Parse a header, from its magic number, in one pass.
+
+        Fields are read through a memoryview, so the buffer is not sliced
+        per field; only the field values are copied out. Returns the header
+        and a view of the bytes after it.
+        """
+        reader = Reader(data)
+        magic_number = reader.view(2, "magic number")
+        if magic_number != MAGIC_STRING[0:2]:
+            raise reader.error("Invalid nanoTDF magic number", 0)
+        version = reader.byte("version") & 0x3F
+        if version != VERSION:
+            raise reader.error(f"Unsupported nanoTDF version [{version}]", 2)
+
+        kas = ResourceLocator.read(reader, "KAS locator")
+        ecc_mode = ECCMode.read(reader)
+        symmetric_and_payload_config = SymmetricAndPayloadConfig.read(reader)
+        policy = Policy.read(reader, ecc_mode)
+        key = ByteData.read_with_content_length(
+            reader, ecc_mode.public_key_length, "ephemeral key"
+        )
+        return (
+            cls(kas, ecc_mode, symmetric_and_payload_config, policy, key),
+            reader.rest(),
+        )
+
     def __init__(
         self,
         kas: ResourceLocator,
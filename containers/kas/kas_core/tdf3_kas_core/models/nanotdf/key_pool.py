@@ -0,0 +1,156 @@
+"""Pools of pre-generated ephemeral EC key pairs, one per curve.
+
+Every nanoTDF rewrap response is wrapped with a fresh ephemeral key pair.
+With a pool, key generation happens on a background thread, refilling the
+pool whenever it falls below its low watermark, and a request takes a
+ready-made key. Each key is handed out once. When the pool is empty the
+request generates its own key, as it does without a pool, and the
+nanotdf.key_pool.starved counter is incremented.
+
+Configuration is read once, from the environment:
+
+    KAS_NANOTDF_KEY_POOL_SIZE            high watermark (default 0: no pool)
+    KAS_NANOTDF_KEY_POOL_LOW_WATERMARK   refill below this (default: half)
+"""
+
+import collections
+import logging
+import os
+import threading
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from tdf3_kas_core.util import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def generate_key_pair(key_alg):
+    """Return a new private key and its compressed public key."""
+    private_key = ec.generate_private_key(key_alg(), default_backend())
+    public_key_bytes = private_key.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
+    )
+    return (private_key, public_key_bytes)
+
+
+class EphemeralKeyPool(object):
+    """A bounded pool of one-time-use key pairs, refilled in the background."""
+
+    def __init__(self, key_alg, size, low_watermark=None):
+        """Construct an empty pool; the filler starts on first use."""
+        self.__key_alg = key_alg
+        self.__size = size
+        if low_watermark is None:
+            low_watermark = size // 2
+        self.__low_watermark = min(low_watermark, size)
+        self.__name = key_alg.name
+        self.reset()
+
+    @property
+    def size(self):
+        """Return the high watermark."""
+        return self.__size
+
+    @size.setter
+    def size(self, value):
+        """Do not allow the size to be set."""
+        pass
+
+    @property
+    def low_watermark(self):
+        """Return the level below which the pool is refilled."""
+        return self.__low_watermark
+
+    @low_watermark.setter
+    def low_watermark(self, value):
+        """Do not allow the low watermark to be set."""
+        pass
+
+    def __len__(self):
+        """Return the number of keys ready."""
+        return len(self.__keys)
+
+    def take(self):
+        """Return a (private key, public key bytes) pair, or None if empty."""
+        with self.__lock:
+            key_pair = self.__keys.popleft() if self.__keys else None
+            remaining = len(self.__keys)
+            if remaining < self.__low_watermark:
+                self.__start_filling()
+        metrics.gauge(f"nanotdf.key_pool.{self.__name}.size", remaining)
+        if key_pair is None:
+            metrics.incr("nanotdf.key_pool.starved")
+            logger.debug("Ephemeral key pool for %s is empty", self.__name)
+        return key_pair
+
+    def fill(self):
+        """Generate keys until the pool is full."""
+        while True:
+            with self.__lock:
+                if len(self.__keys) >= self.__size:
+                    return
+            key_pair = generate_key_pair(self.__key_alg)
+            with self.__lock:
+                if len(self.__keys) >= self.__size:
+                    return
+                self.__keys.append(key_pair)
+
+    def reset(self):
+        """Drop every key; also run in a forked child, so no key is shared."""
+        self.__lock = threading.Lock()
+        self.__keys = collections.deque()
+        self.__filler = None
+
+    def __start_filling(self):
+        if self.__filler is not None and self.__filler.is_alive():
+            return
+        self.__filler = threading.Thread(
+            target=self.__fill,
+            name=f"key-pool-{self.__name}",
+            daemon=True,
+        )
+        self.__filler.start()
+
+    def __fill(self):
+        try:
+            self.fill()
+        except Exception as e:
+            logger.warning("Failed to fill the %s key pool: %s", self.__name, e)
+
+
+pool_size = int(os.environ.get("KAS_NANOTDF_KEY_POOL_SIZE", "0"))
+pool_low_watermark = os.environ.get("KAS_NANOTDF_KEY_POOL_LOW_WATERMARK")
+if pool_low_watermark is not None:
+    pool_low_watermark = int(pool_low_watermark)
+
+# Pools by curve name, created on first use
+pools = {}
+pools_lock = threading.Lock()
+
+
+def take(key_alg):
+    """Return a pooled key pair for the curve, or None."""
+    if pool_size <= 0:
+        return None
+    pool = pools.get(key_alg.name)
+    if pool is None:
+        with pools_lock:
+            pool = pools.setdefault(
+                key_alg.name,
+                EphemeralKeyPool(key_alg, pool_size, pool_low_watermark),
+            )
+    return pool.take()
+
+
+def _reset_after_fork():
+    global pools_lock
+    pools_lock = threading.Lock()
+    for pool in list(pools.values()):
+        pool.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
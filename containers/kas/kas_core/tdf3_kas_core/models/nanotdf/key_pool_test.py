@@ -0,0 +1,90 @@
+"""Test the ephemeral key pools."""
+
+import time
+
+import pytest
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from . import key_pool
+from .crypto import CurveSECP256R1
+from .crypto import exchange_with_private_key
+from .key_pool import EphemeralKeyPool
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    monkeypatch.setattr(key_pool, "pool_size", 4)
+    monkeypatch.setattr(key_pool, "pool_low_watermark", 2)
+    monkeypatch.setattr(key_pool, "pools", {})
+    yield key_pool.pools
+    for pool in key_pool.pools.values():
+        pool.reset()
+
+
+def test_pool_fill_and_take():
+    pool = EphemeralKeyPool(ec.SECP256R1, 3)
+    assert pool.low_watermark == 1
+    pool.fill()
+    assert len(pool) == 3
+    taken = [pool.take() for _ in range(3)]
+    public_keys = {public_key for (_, public_key) in taken}
+    assert len(public_keys) == 3
+    for private_key, public_key in taken:
+        assert isinstance(private_key, ec.EllipticCurvePrivateKey)
+        assert len(public_key) == 33
+
+
+def test_pool_refills_below_low_watermark():
+    pool = EphemeralKeyPool(ec.SECP256R1, 4, low_watermark=2)
+    pool.fill()
+    pool.take()
+    pool.take()
+    assert len(pool) == 2
+    # Falling below the low watermark starts the filler
+    pool.take()
+    deadline = time.monotonic() + 5
+    while len(pool) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(pool) == 4
+
+
+def test_pool_starved():
+    pool = EphemeralKeyPool(ec.SECP256R1, 0)
+    assert pool.take() is None
+
+
+def test_pool_reset_drops_keys():
+    pool = EphemeralKeyPool(ec.SECP256R1, 2)
+    pool.fill()
+    pool.reset()
+    assert len(pool) == 0
+
+
+def test_take_without_pool():
+    assert key_pool.pool_size == 0
+    assert key_pool.take(ec.SECP256R1) is None
+
+
+def test_encryptor_uses_pooled_key(pooled):
+    pool = EphemeralKeyPool(ec.SECP256R1, 4, low_watermark=0)
+    pool.fill()
+    pooled[ec.SECP256R1.name] = pool
+    kas_key = ec.generate_private_key(ec.SECP256R1())
+    kas_public = kas_key.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
+    )
+
+    encryptor = CurveSECP256R1().create_encryptor(kas_public)
+    assert len(pool) == 3
+    assert encryptor.symmetric_key == exchange_with_private_key(
+        ec.SECP256R1, encryptor.public_key, private_key=kas_key
+    )
+    # Pooled keys can still sign
+    signature = encryptor.sign(b"data")
+    CurveSECP256R1().create_verifier(encryptor.public_key).verify(signature, b"data")
+
+    # Keys are used once
+    other = CurveSECP256R1().create_encryptor(kas_public)
+    assert other.public_key != encryptor.public_key
@@ -77,6 +77,19 @@ class ResourceLocator(object):
         resource_locator = cls(ResourceProtocol(locator_mode), locator_data)
         return (resource_locator, data[2 + locator_data_length :])
 
+    @classmethod
+    def read(cls, reader, field: str = "resource locator") -> "ResourceLocator":
+        offset = reader.offset
+        locator_mode = reader.byte(f"{field} protocol")
+        try:
+            mode = ResourceProtocol(locator_mode)
+        except ValueError:
+            raise reader.error(
+                f"Unknown {field} protocol [{locator_mode}]", offset
+            ) from None
+        locator_data_length = reader.byte(f"{field} length")
+        return cls(mode, reader.read(locator_data_length, field))
+
     def __init__(self, mode: ResourceProtocol, data: bytes):
         self._mode = mode
         self._data = data
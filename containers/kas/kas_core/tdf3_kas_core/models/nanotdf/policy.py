@@ -67,6 +67,30 @@ class Policy(object):
         # load the binding
         return (cls(policy_type, body, binding), data)
 
+    @classmethod
+    def read(cls, reader, ecc_mode: ECCMode) -> "Policy":
+        offset = reader.offset
+        policy_type_byte = reader.byte("policy type")
+        try:
+            policy_type = PolicyType(policy_type_byte)
+        except ValueError:
+            policy_type = None
+        if policy_type not in cls.body_parsers:
+            raise reader.error(f"Unsupported policy type [{policy_type_byte}]", offset)
+
+        if policy_type == PolicyType.REMOTE:
+            body = ResourceLocator.read(reader, "policy locator")
+        else:
+            body = ByteData.read(reader, 2, "policy body")
+
+        binding_length = ecc_mode.signature_length
+        if ecc_mode.use_ecdsa_binding is False:
+            binding_length = cls.GMAC_TAG_LENGTH
+        binding = ByteData.read_with_content_length(
+            reader, binding_length, "policy binding"
+        )
+        return cls(policy_type, body, binding)
+
     def __init__(self, type: PolicyType, body, binding: ByteData):
         self._type = type
         self._body = body
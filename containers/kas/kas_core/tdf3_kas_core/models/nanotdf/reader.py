@@ -0,0 +1,63 @@
+"""A cursor over the bytes of a nanoTDF, for parsing without copies."""
+
+from tdf3_kas_core.errors import NanoTDFParseError
+
+
+class Reader(object):
+    """Read fields from a buffer, in order, without copying the rest.
+
+    Errors name the field and its offset from the start of the buffer.
+    """
+
+    def __init__(self, data):
+        """Construct a reader at the start of data."""
+        self.__view = memoryview(data)
+        self.__offset = 0
+
+    @property
+    def offset(self) -> int:
+        """Return the offset of the next field."""
+        return self.__offset
+
+    @offset.setter
+    def offset(self, value):
+        """Do not allow the offset to be set."""
+        pass
+
+    def error(self, message: str, offset: int = None) -> NanoTDFParseError:
+        """Return a parse error at offset, by default the next field."""
+        if offset is None:
+            offset = self.__offset
+        return NanoTDFParseError(f"{message} at offset {offset}")
+
+    def view(self, length: int, field: str) -> memoryview:
+        """Read length bytes as a view into the buffer."""
+        start = self.__offset
+        end = start + length
+        if end > len(self.__view):
+            raise self.error(
+                f"Truncated {field}: need {length} bytes, have"
+                f" {len(self.__view) - start}"
+            )
+        self.__offset = end
+        return self.__view[start:end]
+
+    def read(self, length: int, field: str) -> bytes:
+        """Read length bytes."""
+        return self.view(length, field).tobytes()
+
+    def uint(self, length: int, field: str) -> int:
+        """Read a big-endian unsigned integer of length bytes."""
+        return int.from_bytes(self.view(length, field), "big")
+
+    def byte(self, field: str) -> int:
+        """Read one byte as an integer."""
+        if self.__offset >= len(self.__view):
+            raise self.error(f"Truncated {field}")
+        value = self.__view[self.__offset]
+        self.__offset += 1
+        return value
+
+    def rest(self) -> memoryview:
+        """Return a view of the unread bytes."""
+        return self.__view[self.__offset :]
@@ -23,6 +23,19 @@ class SymmetricAndPayloadConfig(object):
             data[1:],
         )
 
+    @classmethod
+    def read(cls, reader) -> "SymmetricAndPayloadConfig":
+        offset = reader.offset
+        config_byte = reader.byte("symmetric and payload config")
+        try:
+            signature_ecc_mode = CurveMode((config_byte >> 4) & 0x07)
+            symmetric_cipher = CipherMode(config_byte & 0x0F)
+        except ValueError:
+            raise reader.error(
+                f"Unknown symmetric and payload config [{config_byte:#04x}]", offset
+            ) from None
+        return cls(bool(config_byte & 0x80), signature_ecc_mode, symmetric_cipher)
+
     def __init__(
         self, has_signature: bool, signature_ecc_mode: int, symmetric_cipher: int
     ):
@@ -0,0 +1,104 @@
+"""Compare Header.parse with the per-field parse chain.
+
+Run from containers/kas/kas_core:
+
+    python -m tdf3_kas_core.models.nanotdf_tests.header_benchmark [count]
+
+Headers are generated with every curve, both binding types, remote and
+embedded policies and a range of policy sizes.
+"""
+
+import itertools
+import os
+import sys
+import timeit
+
+from tdf3_kas_core.models.nanotdf import (
+    ByteData,
+    CipherMode,
+    CurveMode,
+    ECCMode,
+    Header,
+    Policy,
+    PolicyType,
+    ResourceLocator,
+    SymmetricAndPayloadConfig,
+    create_resource_locator,
+)
+
+CURVES = [
+    CurveMode.SECP256R1,
+    CurveMode.SECP384R1,
+    CurveMode.SECP521R1,
+    CurveMode.SECP256K1,
+]
+POLICY_SIZES = [0, 64, 512, 4096]
+
+
+def generate_headers():
+    """Return serialized headers covering the header variants."""
+    headers = []
+    for curve_mode, ecdsa, policy_size in itertools.product(
+        CURVES, (True, False), POLICY_SIZES
+    ):
+        ecc_mode = ECCMode(ecdsa, curve_mode)
+        binding_length = ecc_mode.signature_length if ecdsa else 8
+        if policy_size:
+            policy = Policy(
+                PolicyType.ENCRYPTED,
+                ByteData(os.urandom(policy_size)),
+                ByteData(os.urandom(binding_length)),
+            )
+        else:
+            policy = Policy(
+                PolicyType.REMOTE,
+                create_resource_locator("https://kas.example.com/policy/abcdef"),
+                ByteData(os.urandom(binding_length)),
+            )
+        header = Header(
+            create_resource_locator("https://kas.example.com"),
+            ecc_mode,
+            SymmetricAndPayloadConfig(False, curve_mode, CipherMode.AES_256_GCM_TAG128),
+            policy,
+            ByteData(os.urandom(ecc_mode.public_key_length)),
+        )
+        headers.append(header.serialize())
+    return headers
+
+
+def parse_chain(data):
+    """Parse a header the way the rewrap service did, a field at a time."""
+    kas, data = ResourceLocator.parse(data[3:])
+    ecc_mode, data = ECCMode.parse(data)
+    payload_config, data = SymmetricAndPayloadConfig.parse(data)
+    policy, data = Policy.parse(ecc_mode, payload_config, data)
+    key, data = ByteData.parse_with_content_length(ecc_mode.public_key_length, data)
+    return (Header(kas, ecc_mode, payload_config, policy, key), data)
+
+
+def parse_single_pass(data):
+    """Parse a header with Header.parse."""
+    return Header.parse(data)
+
+
+def main(count=2000):
+    """Print the time per header for each parser."""
+    headers = generate_headers()
+    for header in headers:
+        assert parse_chain(header)[0].serialize() == header
+        assert parse_single_pass(header)[0].serialize() == header
+
+    for name, parse in (("chain", parse_chain), ("single", parse_single_pass)):
+        elapsed = min(
+            timeit.repeat(
+                lambda: [parse(header) for header in headers],
+                number=count,
+                repeat=5,
+            )
+        )
+        per_header = elapsed / (count * len(headers)) * 1e6
+        print(f"{name:>8}: {per_header:.2f} us/header ({len(headers)} headers)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -1,9 +1,14 @@
+import pytest
+
+from tdf3_kas_core.errors import NanoTDFParseError
 from tdf3_kas_core.models.nanotdf import (
     CurveMode,
+    Header,
     PolicyType,
     ResourceProtocol,
     CipherMode,
 )
+from tdf3_kas_core.models.nanotdf.reader import Reader
 from tdf3_kas_core.models.nanotdf_tests import (
     basic,
     plainpolicy,
@@ -145,3 +150,46 @@ def test_serialize_payload():
 
     print(parsed.serialize())
     assert payload.serialize() == parsed.serialize()
+
+
+@pytest.mark.parametrize("tdf_bytes", [basic.NANOTDF, plainpolicy.NANOTDF])
+def test_header_parse_matches_parse_chain(tdf_bytes):
+    expected, expected_rest = nanotdf.load_header(tdf_bytes[3:])
+    header, rest = Header.parse(tdf_bytes)
+
+    assert isinstance(rest, memoryview)
+    assert rest == expected_rest
+    assert header.serialize() == expected.serialize()
+    assert header.serialize() == tdf_bytes[: len(tdf_bytes) - len(rest)]
+    assert header.policy.type == expected.policy.type
+    assert isinstance(header.key.data, bytes)
+
+
+def test_header_parse_errors():
+    header, _ = Header.parse(plainpolicy.NANOTDF)
+    header_bytes = header.serialize()
+
+    with pytest.raises(NanoTDFParseError, match="magic number at offset 0"):
+        Header.parse(b"XYL" + header_bytes[3:])
+    with pytest.raises(NanoTDFParseError, match=r"version \[13\] at offset 2"):
+        Header.parse(b"L1M" + header_bytes[3:])
+    with pytest.raises(NanoTDFParseError, match="KAS locator protocol .* offset 3"):
+        Header.parse(b"L1L\x07" + header_bytes[4:])
+    # The locator is 3 bytes, the ECC mode 1 and the config 1
+    with pytest.raises(NanoTDFParseError, match=r"policy type \[9\] at offset 8"):
+        Header.parse(header_bytes[:8] + b"\x09" + header_bytes[9:])
+    with pytest.raises(NanoTDFParseError, match="Truncated ephemeral key"):
+        Header.parse(header_bytes[:-1])
+    with pytest.raises(NanoTDFParseError, match="Truncated"):
+        Header.parse(b"L1")
+
+
+def test_reader():
+    reader = Reader(b"\x01\x00\x02abc")
+    assert reader.byte("first") == 1
+    assert reader.uint(2, "size") == 2
+    assert reader.read(2, "body") == b"ab"
+    assert reader.offset == 5
+    assert reader.rest() == b"c"
+    with pytest.raises(NanoTDFParseError, match="Truncated tail: need 2 bytes"):
+        reader.read(2, "tail")
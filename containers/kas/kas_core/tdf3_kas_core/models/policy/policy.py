@@ -1,7 +1,9 @@
 """The Policy model."""
 
 import base64
+import collections
 import json
+import os
 
 import logging
 
@@ -9,15 +11,59 @@ from tdf3_kas_core.errors import PolicyError
 from tdf3_kas_core.models import DataAttributes
 
 from tdf3_kas_core.models.dissem import Dissem
+from tdf3_kas_core.util import TTLCache
 
 logger = logging.getLogger(__name__)
 
 
+# Parsed policies by canonical string; files from one project share a few.
+policy_cache_size = int(os.environ.get("KAS_POLICY_CACHE_SIZE", "512"))
+parsed_policies = TTLCache(maxsize=policy_cache_size, ttl=None)
+
+_ParsedPolicy = collections.namedtuple(
+    "_ParsedPolicy", ["uuid", "data_attributes", "dissem"]
+)
+
+
 def is_string(data):
     """Determine if data is string."""
     return isinstance(data, str)
 
 
+def _parse_canonical(canonical):
+    """Decode and validate a canonical policy into an immutable form."""
+    raw_policy = json.JSONDecoder().decode(
+        bytes.decode(base64.b64decode(str.encode(canonical)))
+    )
+
+    if is_string(raw_policy):  # special case for remote types
+        return _ParsedPolicy(raw_policy, (), ())
+
+    # all other types
+    if "uuid" not in raw_policy:
+        raise PolicyError("PolicyError: Polices must have uuids")
+
+    uuid = raw_policy["uuid"]
+    if not isinstance(uuid, str):
+        raise PolicyError("PolicyError: UUID is not a string")
+
+    data_attributes = DataAttributes()
+    dissem = ()
+    # Load the body data
+    if "body" in raw_policy:
+        body = raw_policy["body"]
+        if "dataAttributes" in body:
+            data_attrs = body["dataAttributes"]
+            logger.debug("Data attributes = %s", data_attrs)
+            data_attributes.load_raw(data_attrs)
+        if "dissem" in raw_policy["body"]:
+            dissem = body["dissem"]
+            logger.debug("Dissem = %s", dissem)
+            dissem = tuple(Dissem.from_iterable(dissem).list)
+
+    return _ParsedPolicy(uuid, tuple(data_attributes.values), dissem)
+
+
 class Policy(object):
     """This Policy model represents the policy.
 
@@ -36,37 +82,17 @@ class Policy(object):
         is not to be trusted as a representation of the policy as changes
         may occur in the attribute list and/or the dissem list.
         """
-        raw_policy = json.JSONDecoder().decode(
-            bytes.decode(base64.b64decode(str.encode(canonical)))
-        )
-
-        if is_string(raw_policy):  # special case for remote types
-            policy = cls(raw_policy, canonical)
-
-        else:  # all other types
-            # Construct an "empty" policy object
-            if "uuid" not in raw_policy:
-                raise PolicyError("PolicyError: Polices must have uuids")
-
-            uuid = raw_policy["uuid"]
-            if not isinstance(uuid, str):
-                raise PolicyError("PolicyError: UUID is not a string")
-
-            # Construct the base policy
-            policy = cls(uuid, canonical)
-
-            # Load the body data
-            if "body" in raw_policy:
-                body = raw_policy["body"]
-                if "dataAttributes" in body:
-                    data_attrs = body["dataAttributes"]
-                    logger.debug("Data attributes = %s", data_attrs)
-                    policy.data_attributes.load_raw(data_attrs)
-                if "dissem" in raw_policy["body"]:
-                    dissem = body["dissem"]
-                    logger.debug("Dissem = %s", dissem)
-                    policy.dissem.list = dissem
-
+        if policy_cache_size <= 0:
+            parsed = _parse_canonical(canonical)
+        else:
+            parsed = parsed_policies.get_or_load(canonical, _parse_canonical)
+
+        # Each policy gets its own attribute and dissem containers, so
+        # plugins can change them; the validated values themselves are shared.
+        policy = cls(parsed.uuid, canonical)
+        for attribute in parsed.data_attributes:
+            policy.data_attributes.add(attribute)
+        policy.dissem.list = parsed.dissem
         return policy
 
     def __init__(self, uuid, canonical=None):
@@ -5,8 +5,11 @@ import pytest  # noqa: F401
 import json
 import base64
 
+from . import policy as policy_module
 from .policy import Policy
 
+from tdf3_kas_core.errors import PolicyError
+from tdf3_kas_core.models import AttributeValue
 from tdf3_kas_core.models import DataAttributes
 
 
@@ -155,3 +158,38 @@ def test_policy_produces_canonical():
     assert set(a_list) == set(d_list)
 
     assert set(body["dissem"]) == set(dissem)
+
+
+def test_policy_parses_are_cached_and_copied(monkeypatch):
+    """Policies from one canonical string share a parse, not their state."""
+    parsed_policies = policy_module.TTLCache(maxsize=4, ttl=None)
+    monkeypatch.setattr(policy_module, "parsed_policies", parsed_policies)
+    raw_dict = {
+        "uuid": "1111-2222-33333-44444-abddef-timestamp",
+        "body": {
+            "dataAttributes": [{"attribute": "https://example.com/attr/COI/value/PRX"}],
+            "dissem": ["user-id@domain.com"],
+        },
+    }
+    raw_can = bytes.decode(base64.b64encode(str.encode(json.dumps(raw_dict))))
+    first = Policy.construct_from_raw_canonical(raw_can)
+    # A plugin changes its copy
+    first.data_attributes.add(AttributeValue("https://example.com/attr/COI/value/ABC"))
+    first.dissem.add("other@domain.com")
+
+    second = Policy.construct_from_raw_canonical(raw_can)
+    assert parsed_policies.stats == {"hits": 1, "misses": 1}
+    assert second is not first
+    assert second.canonical == raw_can
+    assert second.export_raw() == raw_dict
+    assert second.data_attributes.n_values == 1
+    assert first.data_attributes.n_values == 2
+
+
+def test_policy_parse_errors_are_not_cached(monkeypatch):
+    parsed_policies = policy_module.TTLCache(maxsize=4, ttl=None)
+    monkeypatch.setattr(policy_module, "parsed_policies", parsed_policies)
+    raw_can = bytes.decode(base64.b64encode(str.encode(json.dumps({"uuid": 1}))))
+    with pytest.raises(PolicyError):
+        Policy.construct_from_raw_canonical(raw_can)
+    assert len(parsed_policies) == 0
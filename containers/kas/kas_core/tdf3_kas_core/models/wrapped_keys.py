@@ -11,6 +11,7 @@ from cryptography.hazmat.primitives.asymmetric import padding
 
 from tdf3_kas_core.errors import CryptoError
 from tdf3_kas_core.util import aes_gcm_decrypt, validate_hmac
+from tdf3_kas_core.util import crypto_executor
 
 
 logger = logging.getLogger(__name__)
@@ -84,7 +85,9 @@ class WrappedKey(object):
         """Create a WrappedKey from raw data."""
         logger.debug("------ Unpacking Wrapped Key")
         wrapped_key = base64.b64decode(raw_wrapped_key)
-        plain_key = decrypt_algs[algorithm](wrapped_key, private_unwrap_key)
+        plain_key = crypto_executor.run(
+            decrypt_algs[algorithm], wrapped_key, private_key=private_unwrap_key
+        )
         wk = cls(plain_key)
         logger.debug("------ Wrapped Key construction complete")
         return wk
@@ -39,20 +39,32 @@ def convert_attribute_defs(attribute_defs):
             authority=authority, name=name, rule=ALL_OF
         )
 
-        if "rule" in attribute_def:
+        if attribute_def.get("rule"):
             pb_attr_def.rule = attribute_def["rule"]
-        if "order" in attribute_def:
+        if attribute_def.get("order"):
             pb_attr_def.order.extend(attribute_def["order"])
-        if "state" in attribute_def:
+        if attribute_def.get("state"):
             pb_attr_def.state = attribute_def["state"]
         if "group_by" in attribute_def and attribute_def["group_by"]:
             logger.debug("Adding group_by to definition")
-            logger.debug(dir(attribute_def["group_by"]))
-            pb_attr_def.group_by = attributes_pb2.AttributeInstance(
-                authority=attribute_def["group_by"].authority,
-                name=attribute_def["group_by"].name,
-                value=attribute_def["group_by"].value,
-            )
+            group_by = attribute_def["group_by"]
+            # Definitions from an attribute authority carry group_by as a dict
+            if isinstance(group_by, dict):
+                pb_attr_def.group_by.CopyFrom(
+                    attributes_pb2.AttributeInstance(
+                        authority=group_by.get("authority"),
+                        name=group_by.get("name"),
+                        value=group_by.get("value"),
+                    )
+                )
+            else:
+                pb_attr_def.group_by.CopyFrom(
+                    attributes_pb2.AttributeInstance(
+                        authority=group_by.authority,
+                        name=group_by.name,
+                        value=group_by.value,
+                    )
+                )
 
         pb_attr_defs.append(pb_attr_def)
 
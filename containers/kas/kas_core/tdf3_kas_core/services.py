@@ -28,13 +28,11 @@ import json
 import jwt
 import logging
 import os
-import requests
 import typing
 
 import tdf3_kas_core.keycloak as keycloak
 
 from cryptography import x509
-from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.serialization import Encoding
 from cryptography.hazmat.primitives.serialization import PublicFormat
@@ -55,20 +53,22 @@ from tdf3_kas_core.errors import UnauthorizedError
 from tdf3_kas_core.models import Adjudicator
 from tdf3_kas_core.models import AccessPDP
 from tdf3_kas_core.models import AttributePolicyCache
+from tdf3_kas_core.models import definition_index
 from tdf3_kas_core.models import Entity
 from tdf3_kas_core.models import KeyAccess
 from tdf3_kas_core.models import Policy
-from tdf3_kas_core.models import WrappedKey
 from tdf3_kas_core.models import Claims
 
-from tdf3_kas_core.models.nanotdf import Policy as PolicyInfo
-from tdf3_kas_core.models.nanotdf import ResourceLocator
-from tdf3_kas_core.models.nanotdf import ECCMode
-from tdf3_kas_core.models.nanotdf import SymmetricAndPayloadConfig
+from tdf3_kas_core.models.nanotdf import Header
+
+from tdf3_kas_core.util import http_get
+from tdf3_kas_core.util import load_pem_public_key
+from tdf3_kas_core.util import stages
+from tdf3_kas_core.util import TTLCache
 
 from tdf3_kas_core.authorized import authorized
 from tdf3_kas_core.authorized import authorized_v2
-from tdf3_kas_core.authorized import issuer_verifier_key
+from tdf3_kas_core.authorized import verify_issuer_jwt
 from tdf3_kas_core.authorized import looks_like_jwt
 from tdf3_kas_core.authorized import leeway
 
@@ -82,6 +82,17 @@ flags = {
     "idp": os.environ.get("USE_OIDC") == "1",
 }
 
+# Upper bound on the number of key access objects in one /v2/rewrap/batch call
+batch_max_size = int(os.environ.get("KAS_REWRAP_BATCH_MAX_SIZE", "1000"))
+
+# Derived keys and policies of recently seen nanoTDF headers; off by default
+nanotdf_header_cache_ttl = float(os.environ.get("KAS_NANOTDF_HEADER_CACHE_TTL", "0"))
+nanotdf_header_cache = TTLCache(
+    maxsize=int(os.environ.get("KAS_NANOTDF_HEADER_CACHE_SIZE", "1024")),
+    ttl=nanotdf_header_cache_ttl,
+    on_evict=lambda nano_header: nano_header.zeroize(),
+)
+
 PublicKeyAlgorithmTypes = typing.Literal["ec:secp256r1", "rsa:2048"]
 PublicKeyFormats = typing.Literal["jwks", "pkcs8"]
 PublicKeyVersions = typing.Literal["1", "2"]
@@ -162,9 +173,7 @@ def rewrap(data, context, plugin_runner, key_master):
         except ValueError as e:
             raise BadRequestError(f"Error in jwt or content [{e}]") from e
 
-        signer_public_key = serialization.load_pem_public_key(
-            str.encode(dataJson["entity"]["signerPublicKey"]), backend=default_backend()
-        )
+        signer_public_key = load_pem_public_key(dataJson["entity"]["signerPublicKey"])
         try:
             jwt.decode(
                 data["signedRequestToken"],
@@ -253,12 +262,9 @@ def _decode_and_validate_oidc_jwt(context, key_master):
     then returns the JSON
     """
     idpJWT = _get_bearer_token_from_header(context)
-    realmKey = (
-        key_master.public_key("AA-PUBLIC")
-        if (context.has("X-Tdf-Claims") and os.environ.get("V2_SAAS_ENABLED"))
-        else issuer_verifier_key(idpJWT, key_master)
-    )
-    return authorized_v2(realmKey, idpJWT)
+    if context.has("X-Tdf-Claims") and os.environ.get("V2_SAAS_ENABLED"):
+        return authorized_v2(key_master.public_key("AA-PUBLIC"), idpJWT)
+    return verify_issuer_jwt(idpJWT, key_master)
 
 
 def _fetch_distributed_claims(names, sources, claim_name, allowlist):
@@ -288,11 +294,11 @@ def _fetch_distributed_claims(names, sources, claim_name, allowlist):
     if not endpoint.startswith("https://"):
         logger.warning("untrusted distributed source: [%s]", endpoint)
     if "access_token" in source:
-        r = requests.get(
+        r = http_get(
             endpoint, headers={"Authorization": f'Bearer {source["access_token"]}'}
         )
     else:
-        r = requests.get(endpoint)
+        r = http_get(endpoint)
 
     if r.status_code == 200:
         if "application/json" in r.headers["content-type"]:
@@ -383,6 +389,28 @@ def _fetch_attribute_definitions_from_authority_plugins(original_policy, plugin_
     return data_attribute_definitions
 
 
+def _decode_signed_request_token(data, signer_public_key, algorithms=None):
+    """Verify the signed request token and return its decoded request body."""
+    if "signedRequestToken" not in data:
+        raise AuthorizationError("Request not authorized")
+
+    try:
+        decoded = jwt.decode(
+            data["signedRequestToken"],
+            signer_public_key,
+            algorithms=algorithms or ["RS256", "ES256", "ES384", "ES512"],
+            leeway=leeway,
+        )
+
+        requestBody = decoded["requestBody"]
+        json_string = requestBody.replace("'", '"')
+        return json.loads(json_string)
+    except ValueError as e:
+        raise BadRequestError(f"Error in jwt or content [{e}]") from e
+    except Exception as e:
+        raise UnauthorizedError("Not authorized") from e
+
+
 def rewrap_v2(data, context, plugin_runner, key_master, trusted_entitlers=None):
     """Rewrap a key split.
 
@@ -419,21 +447,7 @@ def rewrap_v2(data, context, plugin_runner, key_master, trusted_entitlers=None):
         )
     )
 
-    try:
-        decoded = jwt.decode(
-            data["signedRequestToken"],
-            signer_public_key,
-            algorithms=["RS256", "ES256", "ES384", "ES512"],
-            leeway=leeway,
-        )
-
-        requestBody = decoded["requestBody"]
-        json_string = requestBody.replace("'", '"')
-        dataJson = json.loads(json_string)
-    except ValueError as e:
-        raise BadRequestError(f"Error in jwt or content [{e}]") from e
-    except Exception as e:
-        raise UnauthorizedError("Not authorized") from e
+    dataJson = _decode_signed_request_token(data, signer_public_key)
 
     algorithm = dataJson.get("algorithm", None)
     if algorithm is None:
@@ -451,6 +465,136 @@ def rewrap_v2(data, context, plugin_runner, key_master, trusted_entitlers=None):
         return _tdf3_rewrap_v2(dataJson, context, plugin_runner, key_master, claims)
 
 
+def rewrap_v2_batch(
+    data,
+    context,
+    plugin_runner,
+    key_master,
+    trusted_entitlers=None,
+    rewrap_item=None,
+):
+    """Rewrap many key splits under one signed request.
+
+    The OIDC token and the signed request token are verified once, and the
+    attribute definitions for the union of all item policy namespaces are
+    fetched once. Each item is then rewrapped with `rewrap_item` (by default
+    `rewrap_v2_batch_item`). The result is a list in request order holding
+    either the item's `(res, policy, claims)` tuple or the error it raised.
+    An authority that cannot be fetched fails only the items whose policies
+    use it.
+    """
+    logger.debug("===== REWRAPV2 BATCH SERVICE START ====")
+    rewrap_item = rewrap_item or rewrap_v2_batch_item
+
+    claims = _get_tdf_claims(context, key_master, trusted_entitlers)
+    dataJson = _decode_signed_request_token(data, claims.client_public_signing_key)
+
+    items = dataJson.get("keyAccessObjects")
+    if not isinstance(items, list) or not items:
+        raise KeyAccessError("No key access objects")
+    if len(items) > batch_max_size:
+        raise BadRequestError(
+            f"Too many key access objects [{len(items)} > {batch_max_size}]"
+        )
+
+    # Unwrap and parse everything first so that the namespaces of every
+    # policy are known before the attribute authorities are consulted.
+    prepared = []
+    for item in items:
+        try:
+            if not isinstance(item, dict):
+                raise KeyAccessError("Invalid key access object")
+            item.setdefault("clientPublicKey", dataJson.get("clientPublicKey"))
+            prepared.append(_prepare_rewrap_v2(item, context, key_master, claims))
+        except Exception as e:
+            prepared.append(e)
+
+    namespaces = set()
+    for p in prepared:
+        if not isinstance(p, Exception):
+            namespaces.update(p[0].data_attributes.cluster_namespaces)
+    data_attr_defs = []
+    fetch_errors = {}
+    if namespaces:
+        logger.debug(f"Got batch data attr def namespaces: {namespaces}")
+        (data_attr_defs, fetch_errors) = _fetch_batch_attribute_definitions(
+            plugin_runner, namespaces
+        )
+
+    results = []
+    for item, p in zip(items, prepared):
+        if fetch_errors and not isinstance(p, Exception):
+            item_namespaces = p[0].data_attributes.cluster_namespaces
+            failed = sorted(ns for ns in item_namespaces if ns in fetch_errors)
+            if failed:
+                p = fetch_errors[failed[0]]
+        try:
+            results.append(
+                rewrap_item(
+                    item, context, plugin_runner, key_master, p, data_attr_defs
+                )
+            )
+        except Exception as e:
+            results.append(e)
+
+    logger.debug("===== REWRAPV2 BATCH SERVICE FINISH ====")
+    return results
+
+
+def _fetch_batch_attribute_definitions(plugin_runner, namespaces):
+    """Fetch the attribute definitions of a batch.
+
+    Return the definitions and a dict of the error raised for each namespace
+    that could not be fetched. All namespaces are fetched at once; only if
+    that fails are they fetched again an authority at a time, so that one
+    failing authority fails only the items that use it.
+    """
+    try:
+        return (plugin_runner.fetch_attributes(sorted(namespaces)), {})
+    except Exception as e:
+        logger.warning("Batch attribute fetch failed [%s]; fetching by authority", e)
+
+    by_authority = {}
+    for ns in namespaces:
+        authority = ns.split("/attr/")[0].lower()
+        by_authority.setdefault(authority, []).append(ns)
+    definitions = []
+    errors = {}
+    for authority in sorted(by_authority):
+        group = sorted(by_authority[authority])
+        try:
+            definitions.extend(plugin_runner.fetch_attributes(group) or [])
+        except Exception as e:
+            logger.warning("Attribute fetch failed for [%s]: %s", authority, e)
+            errors.update((ns, e) for ns in group)
+    return (definitions, errors)
+
+
+def rewrap_v2_batch_item(
+    item, context, plugin_runner, key_master, prepared, data_attr_defs
+):
+    """Finish one item of a batch rewrap.
+
+    `prepared` is the result of preparing the item, or the error raised while
+    preparing it; errors are re-raised here so that rewrap hooks see them.
+    """
+    if isinstance(prepared, Exception):
+        raise prepared
+    (_, finish) = prepared
+    return finish(plugin_runner, data_attr_defs)
+
+
+def _prepare_rewrap_v2(data, context, key_master, claims):
+    """Unwrap one /v2/rewrap key access object up to the point of fetching attributes."""
+    algorithm = data.get("algorithm", None)
+    if algorithm == "ec:secp256r1":
+        return _nano_tdf_rewrap_prepare(data, context, key_master, claims)
+    if "keyAccess" not in data:
+        logger.error("Key Access missing from %s", data)
+        raise KeyAccessError("No key access object")
+    return _tdf3_rewrap_v2_prepare(data, context, key_master, claims)
+
+
 def _tdf3_rewrap(data, context, plugin_runner, key_master, entity):
     """
     Handle rewrap request for tdf3 type.
@@ -478,14 +622,18 @@ def _tdf3_rewrap(data, context, plugin_runner, key_master, entity):
     # Run the plugins
     #
 
-    # Fetch attributes from EAS and create attribute policy cache.
-    attribute_policy_cache = AttributePolicyCache()
+    # Fetch attributes from EAS and create attribute policy cache, backed by
+    # the index shared by every request that fetched the same definitions.
+    index = None
     data_attributes_namespaces = list(
         original_policy.data_attributes.cluster_namespaces
     )
     if data_attributes_namespaces:
         config = plugin_runner.fetch_attributes(data_attributes_namespaces)
-        attribute_policy_cache.load_config(config)
+        if not config:
+            logger.warning("No attribute configs found")
+        index = definition_index(config)
+    attribute_policy_cache = AttributePolicyCache(index)
 
     # Create adjudicator from the attributes from EAS.
     adjudicator = Adjudicator(attribute_policy_cache)
@@ -522,7 +670,7 @@ def _tdf3_rewrap(data, context, plugin_runner, key_master, entity):
         logger.debug("========= Rewrap allowed = %s", allowed)
         # Re-wrap the kas-wrapped key with the entity's public key.
         if key_access.wrapped_key is not None:
-            wrapped_key = WrappedKey.from_raw(key_access.wrapped_key, kas_private)
+            wrapped_key = key_access.unwrap(kas_private)
             res["entityWrappedKey"] = wrapped_key.rewrap_key(entity.public_key)
             logger.debug("REWRAP SERVICE FINISH")
             return res
@@ -541,15 +689,53 @@ def _tdf3_rewrap(data, context, plugin_runner, key_master, entity):
 def _tdf3_rewrap_v2(data, context, plugin_runner, key_master, claims):
     """
     Handle rewrap request for tdf3 type.
+
+    The key unwrap and the attribute definition fetch are independent, so
+    they run as concurrent stages; an unwrap failure is raised without
+    waiting for the fetch.
     """
+    original_policy = _tdf3_rewrap_v2_policy(data)
+
+    results = stages.run(
+        "rewrap.stage",
+        {
+            "unwrap": lambda: _tdf3_rewrap_v2_prepare(
+                data, context, key_master, claims, original_policy
+            ),
+            "fetch_attributes": lambda: (
+                _fetch_attribute_definitions_from_authority_plugins(
+                    original_policy, plugin_runner
+                )
+            ),
+        },
+    )
+    (_, finish) = results["unwrap"]
 
-    # Unpack the policy.
+    return finish(plugin_runner, results["fetch_attributes"])
+
+
+def _tdf3_rewrap_v2_policy(data):
+    """Unpack the policy of a tdf3 rewrap request."""
     if "policy" not in data:
         raise PolicyError("No policy")
 
+    try:
+        return Policy.construct_from_raw_canonical(data["policy"])
+    except ValueError as e:
+        raise BadRequestError(f"Error in Policy or Key Binding [{e}]") from e
+
+
+def _tdf3_rewrap_v2_prepare(data, context, key_master, claims, original_policy=None):
+    """Unpack the policy and key access of a tdf3 rewrap request.
+
+    Returns the original policy and a callable that finishes the rewrap
+    given the plugin runner and the data attribute definitions.
+    """
+    if original_policy is None:
+        original_policy = _tdf3_rewrap_v2_policy(data)
+
     try:
         canonical_policy = data["policy"]
-        original_policy = Policy.construct_from_raw_canonical(canonical_policy)
 
         kas_private = key_master.private_key("KAS-PRIVATE")
         key_access = KeyAccess.from_raw(
@@ -561,120 +747,129 @@ def _tdf3_rewrap_v2(data, context, plugin_runner, key_master, claims):
     except ValueError as e:
         raise BadRequestError(f"Error in Policy or Key Binding [{e}]") from e
 
-    data_attr_defs = _fetch_attribute_definitions_from_authority_plugins(
-        original_policy, plugin_runner
-    )
-
-    # Run any rewrap plugins.
-    (policy, res) = plugin_runner.update(original_policy, claims, key_access, context)
-
-    # Execute a premature bailout if the plugins provide a rewrapped key.
-    if "entityWrappedKey" in res:
-        logger.debug(
-            "REMOTE RETURNED AN ENTITY WRAPPED KEY [res = %s] REWRAP SERVICE FINISH",
-            res,
+    def finish(plugin_runner, data_attr_defs):
+        # Run any rewrap plugins.
+        (policy, res) = plugin_runner.update(
+            original_policy, claims, key_access, context
         )
-        # Assume this is ok as is; DO NOT CHECK CREDENTIALS (?)
-        return res
 
-    elif "kasWrappedKey" in res:
-        # replace the wrapped key object in key_access with the new key
-        logger.debug(
-            "REMOTE RETURNED A KAS WRAPPED KEY; B64 KAS Wrapped key=[%s]",
-            res["kasWrappedKey"],
-        )
-        key_access.wrapped_key = res["kasWrappedKey"]
-
-    else:
-        logger.debug("KEY TO REWRAP CAME FROM REQUEST")
-        # A purely KAS operation
-        pass
+        # Execute a premature bailout if the plugins provide a rewrapped key.
+        if "entityWrappedKey" in res:
+            logger.debug(
+                "REMOTE RETURNED AN ENTITY WRAPPED KEY [res = %s] REWRAP SERVICE FINISH",
+                res,
+            )
+            # Assume this is ok as is; DO NOT CHECK CREDENTIALS (?)
+            return res
 
-    # We have everything we need to invoke the access PDP
-    # 1. Entity attribute instances
-    # 2. Data attribute instances
-    # 3. Attribute definitions for every data attribute instance
-    access_pdp = AccessPDP()
-    # Check to see if the policy will grant the entity access.
-    # Raises an informative error if access is denied.
-    allowed = access_pdp.can_access(policy, claims, data_attr_defs)
+        elif "kasWrappedKey" in res:
+            # replace the wrapped key object in key_access with the new key
+            logger.debug(
+                "REMOTE RETURNED A KAS WRAPPED KEY; B64 KAS Wrapped key=[%s]",
+                res["kasWrappedKey"],
+            )
+            key_access.wrapped_key = res["kasWrappedKey"]
 
-    client_public_key = serialization.load_pem_public_key(
-        str.encode(data["clientPublicKey"]), backend=default_backend()
-    )
+        else:
+            logger.debug("KEY TO REWRAP CAME FROM REQUEST")
+            # A purely KAS operation
+            pass
+
+        # We have everything we need to invoke the access PDP
+        # 1. Entity attribute instances
+        # 2. Data attribute instances
+        # 3. Attribute definitions for every data attribute instance
+        access_pdp = AccessPDP()
+        # Check to see if the policy will grant the entity access.
+        # Raises an informative error if access is denied.
+        allowed = access_pdp.can_access(policy, claims, data_attr_defs)
+
+        client_public_key = load_pem_public_key(data["clientPublicKey"])
+
+        if allowed is True:
+            logger.debug("========= Rewrap allowed = %s", allowed)
+            logger.debug(
+                f"Claims: {claims.user_id=}, {claims.entity_attributes=} is allowed access to data with policy {policy}"
+            )
 
-    if allowed is True:
-        logger.debug("========= Rewrap allowed = %s", allowed)
-        logger.debug(
-            f"Claims: {claims.user_id=}, {claims.entity_attributes=} is allowed access to data with policy {policy}"
-        )
+            # Re-wrap the kas-wrapped key with the entity's public key.
+            if key_access.wrapped_key is not None:
+                # Reuse the key unwrapped for the policy binding check
+                wrapped_key = key_access.unwrap(kas_private)
+                res["entityWrappedKey"] = wrapped_key.rewrap_key(client_public_key)
+                logger.debug("REWRAP SERVICE FINISH")
+                return res, policy, claims
+            else:
+                logger.error("Wrapped key missing from %s", key_access)
+                raise KeyAccessError("No wrapped key in key access model")
 
-        # Re-wrap the kas-wrapped key with the entity's public key.
-        if key_access.wrapped_key is not None:
-            wrapped_key = WrappedKey.from_raw(key_access.wrapped_key, kas_private)
-            res["entityWrappedKey"] = wrapped_key.rewrap_key(client_public_key)
-            logger.debug("REWRAP SERVICE FINISH")
-            return res, policy, claims
         else:
-            logger.error("Wrapped key missing from %s", key_access)
-            raise KeyAccessError("No wrapped key in key access model")
+            # should never get to here. Bug in adjudicator.
+            logger.error("invalid adjudicator response [%s]", allowed)
+            m = f"AccessPDP returned {allowed} without raising an error"
+            raise AdjudicatorError(m)
 
-    else:
-        # should never get to here. Bug in adjudicator.
-        logger.error("invalid adjudicator response [%s]", allowed)
-        m = f"AccessPDP returned {allowed} without raising an error"
-        raise AdjudicatorError(m)
+    return original_policy, finish
 
 
 def _nano_tdf_rewrap(data, context, plugin_runner, key_master, claims):
     """
-    Handle rewrap request for tdf3 type.
+    Handle rewrap request for nanotdf type.
     """
-    try:
-        key_access = data["keyAccess"]
-
-        # extract the nano tdf header in binary format.
-        header = base64.b64decode(key_access["header"])
-    except ValueError as e:
-        raise BadRequestError(f"Error in KAO [{e}]") from e
-
-    client_version = packaging.version.parse(
-        context.get("virtru-ntdf-version") or "0.0.0"
+    (original_policy, finish) = _nano_tdf_rewrap_prepare(
+        data, context, key_master, claims
     )
-    legacy_wrapping = flags[
-        "default_to_small_iv"
-    ] and client_version < packaging.version.parse("0.0.1")
-    logger.warning(
-        f"virtru-ntdf-version: [{client_version}]; legacy_wrapping: {legacy_wrapping}"
+
+    data_attr_defs = _fetch_attribute_definitions_from_authority_plugins(
+        original_policy, plugin_runner
     )
 
-    try:
-        # extract the ecc mode from header.
-        (_, header) = ResourceLocator.parse(header[3:])
-        (ecc_mode, header) = ECCMode.parse(header)
+    return finish(plugin_runner, data_attr_defs)
+
 
-        # extract payload config from header.
-        (payload_config, header) = SymmetricAndPayloadConfig.parse(header)
+class _NanoTDFHeader(object):
+    """A parsed nanoTDF header, with its derived key and decrypted policy."""
 
-        # extract policy from header.
-        (policy_info, header) = PolicyInfo.parse(ecc_mode, payload_config, header)
+    def __init__(self, ecc_mode, payload_config, policy, symmetric_key):
+        """Construct from the parsed header."""
+        self.ecc_mode = ecc_mode
+        self.payload_config = payload_config
+        self.policy = policy
+        self.__symmetric_key = bytearray(symmetric_key)
+        self.__zeroized = False
 
-        # extract ephemeral key from the header.
-        ephemeral_key = header[0 : ecc_mode.curve.public_key_byte_length]
+    def key(self):
+        """Return a copy of the symmetric key, or None once zeroized."""
+        symmetric_key = bytes(self.__symmetric_key)
+        if self.__zeroized:
+            return None
+        return symmetric_key
 
+    def zeroize(self):
+        """Overwrite the symmetric key."""
+        self.__zeroized = True
+        self.__symmetric_key[:] = bytes(len(self.__symmetric_key))
+
+
+def _nano_tdf_open_header(header, legacy_wrapping, key_master):
+    """Parse a nanoTDF header, derive its key and decrypt its policy."""
+    try:
+        (parsed, _) = Header.parse(header)
+    except NanoTDFParseError as e:
+        logger.error(e)
+        raise NanoTDFParseError(f"Fail to parse the nanoTDF header: {e}")
     except Exception as e:
         logger.error(e)
         raise NanoTDFParseError("Fail to parse the nanoTDF header.")
+    ecc_mode = parsed.ecc_mode
+    payload_config = parsed.symmetric_and_payload_config
+    policy_info = parsed.policy
+    ephemeral_key = parsed.key.data
 
     # NOTE: The KAS and EAS only support secp256r1 curve for now.
     # generate a symmetric key.
-    kas_private = key_master.private_key("KAS-EC-SECP256R1-PRIVATE")
-    private_key_bytes = kas_private.private_bytes(
-        serialization.Encoding.DER,
-        serialization.PrivateFormat.PKCS8,
-        serialization.NoEncryption(),
-    )
-    decryptor = ecc_mode.curve.create_decryptor(ephemeral_key, private_key_bytes)
+    kas_private = key_master.ec_private_key("secp256r1")
+    decryptor = ecc_mode.curve.create_decryptor(ephemeral_key, kas_private)
 
     # extract the cipher from payload config.
     zero_iv = b"\0" * (3 if legacy_wrapping else 12)
@@ -685,9 +880,6 @@ def _nano_tdf_rewrap(data, context, plugin_runner, key_master, claims):
     policy_data_len = len(policy_data) - payload_config.symmetric_tag_length
 
     auth_tag = policy_data[-payload_config.symmetric_tag_length :]
-    logger.debug(
-        f"virtru-ntdf-version: [{client_version}]; legacy_wrapping: {legacy_wrapping}; tag_length: {payload_config.symmetric_tag_length}, context: {context.data}"
-    )
 
     policy_data_as_byte = base64.b64encode(
         symmetric_cipher.decrypt(policy_data[0:policy_data_len], auth_tag)
@@ -708,64 +900,119 @@ def _nano_tdf_rewrap(data, context, plugin_runner, key_master, claims):
         if digest[-len(policy_info.binding.data) :] != policy_info.binding.data:
             raise PolicyBindingError("Gmac Policy binding" " verification failed.")
 
-    original_policy = Policy.construct_from_raw_canonical(
-        policy_data_as_byte.decode("utf-8")
+    return _NanoTDFHeader(
+        ecc_mode,
+        payload_config,
+        policy_data_as_byte.decode("utf-8"),
+        decryptor.symmetric_key,
     )
 
-    data_attr_defs = _fetch_attribute_definitions_from_authority_plugins(
-        original_policy, plugin_runner
-    )
 
-    # Run any rewrap plugins.
-    (policy, res) = plugin_runner.update(original_policy, claims, key_access, context)
+def _nano_tdf_rewrap_prepare(data, context, key_master, claims):
+    """Parse the nanotdf header and decrypt its policy.
 
-    # We have everything we need to invoke the access PDP
-    # 1. Entity attribute instances
-    # 2. Data attribute instances
-    # 3. Attribute definitions for every data attribute instance
-    access_pdp = AccessPDP()
-    # Check to see if the policy will grant the entity access.
-    # Raises an informative error if access is denied.
-    allowed = access_pdp.can_access(policy, claims, data_attr_defs)
+    Returns the original policy and a callable that finishes the rewrap
+    given the plugin runner and the data attribute definitions.
+    """
+    try:
+        key_access = data["keyAccess"]
 
-    if allowed is False:
-        m = f"AccessPDP returned {allowed} without raising an error"
-        logger.error(m)
-        raise AdjudicatorError(m)
+        # extract the nano tdf header in binary format.
+        header = base64.b64decode(key_access["header"])
+    except ValueError as e:
+        raise BadRequestError(f"Error in KAO [{e}]") from e
 
-    # Generate ephemeral rewrap key-pair
-    client_public_key = serialization.load_pem_public_key(
-        str.encode(data["clientPublicKey"]), backend=default_backend()
+    client_version = packaging.version.parse(
+        context.get("virtru-ntdf-version") or "0.0.0"
     )
-    logger.debug(client_public_key)
-    public_key_bytes = client_public_key.public_bytes(
-        serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
+    legacy_wrapping = flags[
+        "default_to_small_iv"
+    ] and client_version < packaging.version.parse("0.0.1")
+    logger.warning(
+        f"virtru-ntdf-version: [{client_version}]; legacy_wrapping: {legacy_wrapping}"
     )
-    encryptor = ecc_mode.curve.create_encryptor(public_key_bytes)
 
-    if legacy_wrapping:
-        logger.warning(
-            "Failing back to short i.v. for rewrap, client_version=[%s]",
-            client_version,
+    if nanotdf_header_cache_ttl > 0:
+        # Dataset mode reuses one header, so its key and policy can be reused.
+        kas_public = key_master.ec_private_key("secp256r1").public_key()
+        cache_key = hashlib.sha256(
+            header
+            + (b"\1" if legacy_wrapping else b"\0")
+            + kas_public.public_bytes(Encoding.X962, PublicFormat.CompressedPoint)
+        ).digest()
+        nano_header = nanotdf_header_cache.get_or_load(
+            cache_key,
+            lambda _: _nano_tdf_open_header(header, legacy_wrapping, key_master),
         )
-        iv = os.urandom(3)
+        symmetric_key = nano_header.key()
+        if symmetric_key is None:
+            # Evicted while in use
+            nano_header = _nano_tdf_open_header(header, legacy_wrapping, key_master)
+            symmetric_key = nano_header.key()
     else:
-        iv = os.urandom(12)
-    symmetric_kak = encryptor.symmetric_key
-    symmetric_cipher = payload_config.symmetric_cipher(symmetric_kak, iv)
-    cipher_text, tag = symmetric_cipher.encrypt(decryptor.symmetric_key)
-    encrypted_symmetric_kak = iv + cipher_text + tag
-
-    ephemeral_rewrap_public_key = encryptor.public_key_as_pem().decode("utf-8")
-    encrypted_symmetric_kak_base64 = base64.b64encode(encrypted_symmetric_kak).decode(
-        "utf-8"
+        nano_header = _nano_tdf_open_header(header, legacy_wrapping, key_master)
+        symmetric_key = nano_header.key()
+    ecc_mode = nano_header.ecc_mode
+    payload_config = nano_header.payload_config
+    logger.debug(
+        f"virtru-ntdf-version: [{client_version}]; legacy_wrapping: {legacy_wrapping}; tag_length: {payload_config.symmetric_tag_length}, context: {context.data}"
     )
 
-    res = {
-        "entityWrappedKey": encrypted_symmetric_kak_base64,
-        "sessionPublicKey": ephemeral_rewrap_public_key,
-    }
-    return res, policy, claims
+    original_policy = Policy.construct_from_raw_canonical(nano_header.policy)
+
+    def finish(plugin_runner, data_attr_defs):
+        # Run any rewrap plugins.
+        (policy, res) = plugin_runner.update(
+            original_policy, claims, key_access, context
+        )
+
+        # We have everything we need to invoke the access PDP
+        # 1. Entity attribute instances
+        # 2. Data attribute instances
+        # 3. Attribute definitions for every data attribute instance
+        access_pdp = AccessPDP()
+        # Check to see if the policy will grant the entity access.
+        # Raises an informative error if access is denied.
+        allowed = access_pdp.can_access(policy, claims, data_attr_defs)
+
+        if allowed is False:
+            m = f"AccessPDP returned {allowed} without raising an error"
+            logger.error(m)
+            raise AdjudicatorError(m)
+
+        # Generate ephemeral rewrap key-pair
+        client_public_key = load_pem_public_key(data["clientPublicKey"])
+        logger.debug(client_public_key)
+        public_key_bytes = client_public_key.public_bytes(
+            serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
+        )
+        encryptor = ecc_mode.curve.create_encryptor(public_key_bytes)
+
+        if legacy_wrapping:
+            logger.warning(
+                "Failing back to short i.v. for rewrap, client_version=[%s]",
+                client_version,
+            )
+            iv = os.urandom(3)
+        else:
+            iv = os.urandom(12)
+        symmetric_kak = encryptor.symmetric_key
+        symmetric_cipher = payload_config.symmetric_cipher(symmetric_kak, iv)
+        cipher_text, tag = symmetric_cipher.encrypt(symmetric_key)
+        encrypted_symmetric_kak = iv + cipher_text + tag
+
+        ephemeral_rewrap_public_key = encryptor.public_key_as_pem().decode("utf-8")
+        encrypted_symmetric_kak_base64 = base64.b64encode(
+            encrypted_symmetric_kak
+        ).decode("utf-8")
+
+        res = {
+            "entityWrappedKey": encrypted_symmetric_kak_base64,
+            "sessionPublicKey": ephemeral_rewrap_public_key,
+        }
+        return res, policy, claims
+
+    return original_policy, finish
 
 
 def upsert(data, context, plugin_runner, key_master):
@@ -863,9 +1110,7 @@ def upsert_v2(data, context, plugin_runner, key_master, trusted_entitlers):
         logger.warning("'algorithm' is missing and defaulting to TDF3 rewrap.")
         algorithm = "rsa:2048"
 
-    client_public_key = serialization.load_pem_public_key(
-        str.encode(dataJson["clientPublicKey"]), backend=default_backend()
-    )
+    client_public_key = load_pem_public_key(dataJson["clientPublicKey"])
 
     # TODO BML fix
     # entity = Entity(claims.user_id, client_public_key, claims.attributes)
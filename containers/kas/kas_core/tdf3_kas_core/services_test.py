@@ -1,15 +1,39 @@
 import pytest  # noqa: F401
 
+import base64
 import datetime
 import os
 import json
 import jwt
+import requests
+import threading
+import time
+import types
 
 import tdf3_kas_core
 from tdf3_kas_core.abstractions import AbstractRewrapPlugin
+from tdf3_kas_core.errors import InvalidBindingError
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from tdf3_kas_core.models import Context
+from tdf3_kas_core.models import WrappedKey
+from tdf3_kas_core.models import wrapped_keys
+from tdf3_kas_core.util import aes_gcm_encrypt
+from tdf3_kas_core.util import generate_hmac_digest
 from tdf3_kas_core.models import KeyMaster
+from tdf3_kas_core.models.nanotdf import ByteData
+from tdf3_kas_core.models.nanotdf import CipherMode
+from tdf3_kas_core.models.nanotdf import CurveMode
+from tdf3_kas_core.models.nanotdf import ECCMode
+from tdf3_kas_core.models.nanotdf import Header
+from tdf3_kas_core.models.nanotdf import Policy as NanoTDFPolicy
+from tdf3_kas_core.models.nanotdf import PolicyType
+from tdf3_kas_core.models.nanotdf import SymmetricAndPayloadConfig
+from tdf3_kas_core.models.nanotdf import create_resource_locator
+from tdf3_kas_core.util import TTLCache
+from tdf3_kas_core.util.stages import StageRunner
 
 from tdf3_kas_core.services import *
 from tdf3_kas_core import services
@@ -178,9 +202,10 @@ def upsert_plugins():
 
 
 class FakeKeyMaster:
-    def __init__(self, public_key, private_key) -> None:
+    def __init__(self, public_key, private_key, ec_private_key=None) -> None:
         self._private_key = private_key
         self._public_key = public_key
+        self._ec_private_key = ec_private_key
 
     def private_key(self, name):
         if name == "KAS-PRIVATE":
@@ -192,6 +217,11 @@ class FakeKeyMaster:
             return self._public_key
         raise KeyNotFoundError(f"Unknown test key: {name}")
 
+    def ec_private_key(self, curve_name):
+        if curve_name == "secp256r1" and self._ec_private_key is not None:
+            return self._ec_private_key
+        raise KeyNotFoundError(f"Unknown test key: {curve_name}")
+
 
 @pytest.fixture
 def key_master(public_key, private_key):
@@ -318,6 +348,133 @@ def test_rewrap_distributed_claims(
     assert True
 
 
+def test_rewrap_v2_unwraps_once(
+    with_idp,
+    monkeypatch,
+    rewrap_plugins,
+    faux_policy_bytes,
+    public_key,
+    key_master,
+    entity_private_key,
+    client_public_key,
+    jwt_standard,
+):
+    """The KAS private key decrypts the wrapped key once per rewrap."""
+    os.environ["OIDC_SERVER_URL"] = "https://keycloak.dev"
+    monkeypatch.setattr(
+        tdf3_kas_core.models.access_pdp.backends,
+        "default_backend",
+        tdf3_kas_core.models.access_pdp.LocalPDPBackend(),
+    )
+    # Keep this decision out of the cache shared with other tests
+    monkeypatch.setattr(tdf3_kas_core.models.access_pdp.access_pdp, "decision_ttl", 0)
+    plain_key = AESGCM.generate_key(bit_length=256)
+    (ciphertext, iv) = aes_gcm_encrypt(b"metadata", plain_key)
+    metadata = {
+        "algorithm": "AES_GCM",
+        "iv": bytes.decode(base64.b64encode(iv)),
+        "ciphertext": bytes.decode(base64.b64encode(iv + ciphertext)),
+    }
+    binding = str.encode(generate_hmac_digest(faux_policy_bytes, plain_key))
+    key_access = {
+        "type": "wrapped",
+        "url": "http://127.0.0.1:4000",
+        "protocol": "kas",
+        "wrappedKey": WrappedKey(plain_key).rewrap_key(public_key),
+        "policyBinding": bytes.decode(base64.b64encode(binding)),
+        "encryptedMetadata": bytes.decode(
+            base64.b64encode(str.encode(json.dumps(metadata)))
+        ),
+    }
+    data = {
+        "requestBody": json.dumps(
+            {
+                "keyAccess": key_access,
+                "policy": bytes.decode(faux_policy_bytes),
+                "clientPublicKey": client_public_key,
+                "algorithm": None,
+            }
+        )
+    }
+    request_data = {"signedRequestToken": jwt.encode(data, entity_private_key, "RS256")}
+
+    unwraps = []
+
+    def counting_decrypt(cipher, private_key):
+        unwraps.append(cipher)
+        return wrapped_keys.aes_decrypt_sha1(cipher, private_key)
+
+    monkeypatch.setitem(wrapped_keys.decrypt_algs, "RSA-OAEP", counting_decrypt)
+    # Count in this process, whatever executor is configured
+    monkeypatch.setattr(
+        tdf3_kas_core.util.crypto_executor.crypto_executor,
+        "executor",
+        tdf3_kas_core.util.crypto_executor.CryptoExecutor(),
+    )
+
+    context = Context()
+    context.add("Authorization", f"Bearer {jwt_standard}")
+    (res, _, _) = rewrap_v2(request_data, context, rewrap_plugins, key_master)
+
+    assert "entityWrappedKey" in res
+    # Binding check, metadata decrypt and rewrap share one unwrap
+    assert len(unwraps) == 1
+
+
+def test_rewrap_v2_bad_binding_does_not_wait_for_attributes(
+    with_idp,
+    monkeypatch,
+    rewrap_plugins,
+    faux_policy_bytes,
+    public_key,
+    key_master,
+    entity_private_key,
+    client_public_key,
+    jwt_standard,
+):
+    """An unwrap failure is raised while attributes are still being fetched."""
+    os.environ["OIDC_SERVER_URL"] = "https://keycloak.dev"
+    plain_key = AESGCM.generate_key(bit_length=256)
+    other_key = AESGCM.generate_key(bit_length=256)
+    binding = str.encode(generate_hmac_digest(faux_policy_bytes, other_key))
+    key_access = {
+        "type": "wrapped",
+        "url": "http://127.0.0.1:4000",
+        "protocol": "kas",
+        "wrappedKey": WrappedKey(plain_key).rewrap_key(public_key),
+        "policyBinding": bytes.decode(base64.b64encode(binding)),
+    }
+    data = {
+        "requestBody": json.dumps(
+            {
+                "keyAccess": key_access,
+                "policy": bytes.decode(faux_policy_bytes),
+                "clientPublicKey": client_public_key,
+                "algorithm": None,
+            }
+        )
+    }
+    request_data = {"signedRequestToken": jwt.encode(data, entity_private_key, "RS256")}
+
+    released = threading.Event()
+    monkeypatch.setattr(
+        services,
+        "_fetch_attribute_definitions_from_authority_plugins",
+        lambda policy, plugin_runner: released.wait(5) and [],
+    )
+    monkeypatch.setattr(
+        tdf3_kas_core.util.stages.stages, "runner", StageRunner(2)
+    )
+
+    context = Context()
+    context.add("Authorization", f"Bearer {jwt_standard}")
+    start = time.perf_counter()
+    with pytest.raises(InvalidBindingError):
+        rewrap_v2(request_data, context, rewrap_plugins, key_master)
+    assert time.perf_counter() - start < 2
+    released.set()
+
+
 def test_rewrap_v2_expired_token(
     with_idp,
     faux_policy_bytes,
@@ -448,6 +605,257 @@ def test_rewrap_v2_invalid_auth_jwt(
     assert True
 
 
+class CountingAuthPlugin(MockAuthPlugin):
+    def __init__(self):
+        self.calls = []
+
+    def fetch_attributes(self, namespaces):
+        self.calls.append(namespaces)
+        return super().fetch_attributes(namespaces)
+
+
+def sign_batch_request(entity_private_key, client_public_key, items):
+    data = {
+        "requestBody": json.dumps(
+            {"clientPublicKey": client_public_key, "keyAccessObjects": items}
+        )
+    }
+    return {"signedRequestToken": jwt.encode(data, entity_private_key, "RS256")}
+
+
+def test_rewrap_v2_batch(
+    with_idp,
+    key_access_wrapped_raw,
+    faux_policy_bytes,
+    key_master,
+    entity_private_key,
+    client_public_key,
+    jwt_standard,
+):
+    """Test the rewrap_v2_batch service."""
+    os.environ["OIDC_SERVER_URL"] = "https://keycloak.dev"
+    item = {
+        "keyAccess": key_access_wrapped_raw,
+        "policy": bytes.decode(faux_policy_bytes),
+        "algorithm": None,
+    }
+    request_data = sign_batch_request(
+        entity_private_key,
+        client_public_key,
+        [item, dict(item), {"policy": item["policy"]}],
+    )
+    plugin = CountingAuthPlugin()
+    plugin_runner = (
+        tdf3_kas_core.models.plugin_runner.rewrap_plugin_runner_v2.RewrapPluginRunnerV2(
+            [plugin]
+        )
+    )
+
+    context = Context()
+    context.add("Authorization", f"Bearer {jwt_standard}")
+    results = rewrap_v2_batch(request_data, context, plugin_runner, key_master)
+
+    assert len(results) == 3
+    for res, _, _ in results[:2]:
+        assert "entityWrappedKey" in res
+    assert isinstance(results[2], tdf3_kas_core.errors.KeyAccessError)
+    # attribute definitions are fetched once for the whole batch
+    assert len(plugin.calls) <= 1
+
+
+def test_rewrap_v2_batch_hooks_each_item(
+    with_idp,
+    faux_policy_bytes,
+    key_master,
+    entity_private_key,
+    client_public_key,
+    jwt_standard,
+    rewrap_plugins,
+):
+    item = {"policy": bytes.decode(faux_policy_bytes)}
+    request_data = sign_batch_request(
+        entity_private_key, client_public_key, [item, item]
+    )
+    seen = []
+
+    def rewrap_item(data, *args):
+        seen.append(data)
+        return services.rewrap_v2_batch_item(data, *args)
+
+    context = Context()
+    context.add("Authorization", f"Bearer {jwt_standard}")
+    results = rewrap_v2_batch(
+        request_data, context, rewrap_plugins, key_master, rewrap_item=rewrap_item
+    )
+
+    assert len(seen) == 2
+    assert all(isinstance(r, tdf3_kas_core.errors.KeyAccessError) for r in results)
+
+
+def test_rewrap_v2_batch_authority_failure(
+    with_idp,
+    monkeypatch,
+    key_master,
+    entity_private_key,
+    client_public_key,
+    jwt_standard,
+):
+    up = {"authority": "https://up.org", "name": "A", "rule": "allOf"}
+
+    class FlakyAuthPlugin(AbstractRewrapPlugin):
+        def __init__(self):
+            self.calls = []
+
+        def fetch_attributes(self, namespaces):
+            self.calls.append(namespaces)
+            if any(ns.startswith("https://down.org") for ns in namespaces):
+                raise tdf3_kas_core.errors.RequestTimeoutError("timed out")
+            return [up]
+
+    def prepare(item, context, key_master, claims):
+        policy = types.SimpleNamespace(
+            data_attributes=types.SimpleNamespace(cluster_namespaces=item["ns"])
+        )
+        return (policy, lambda plugin_runner, data_attr_defs: data_attr_defs)
+
+    monkeypatch.setattr(services, "_prepare_rewrap_v2", prepare)
+    request_data = sign_batch_request(
+        entity_private_key,
+        client_public_key,
+        [
+            {"ns": ["https://up.org/attr/A"]},
+            {"ns": ["https://up.org/attr/A", "https://down.org/attr/B"]},
+            {"ns": []},
+        ],
+    )
+    plugin = FlakyAuthPlugin()
+    plugin_runner = (
+        tdf3_kas_core.models.plugin_runner.rewrap_plugin_runner_v2.RewrapPluginRunnerV2(
+            [plugin]
+        )
+    )
+
+    context = Context()
+    context.add("Authorization", f"Bearer {jwt_standard}")
+    results = rewrap_v2_batch(request_data, context, plugin_runner, key_master)
+
+    assert results[0] == [up]
+    assert isinstance(results[1], tdf3_kas_core.errors.RequestTimeoutError)
+    assert results[2] == [up]
+    # Fetched together first, then an authority at a time
+    assert plugin.calls == [
+        ["https://down.org/attr/B", "https://up.org/attr/A"],
+        ["https://down.org/attr/B"],
+        ["https://up.org/attr/A"],
+    ]
+
+
+def test_rewrap_v2_batch_empty(
+    with_idp,
+    key_master,
+    entity_private_key,
+    client_public_key,
+    jwt_standard,
+    rewrap_plugins,
+):
+    request_data = sign_batch_request(entity_private_key, client_public_key, [])
+    context = Context()
+    context.add("Authorization", f"Bearer {jwt_standard}")
+    with pytest.raises(tdf3_kas_core.errors.KeyAccessError):
+        rewrap_v2_batch(request_data, context, rewrap_plugins, key_master)
+
+
+def test_rewrap_v2_batch_too_large(
+    with_idp,
+    monkeypatch,
+    key_master,
+    entity_private_key,
+    client_public_key,
+    jwt_standard,
+    rewrap_plugins,
+):
+    monkeypatch.setattr(services, "batch_max_size", 1)
+    request_data = sign_batch_request(
+        entity_private_key, client_public_key, [{}, {}]
+    )
+    context = Context()
+    context.add("Authorization", f"Bearer {jwt_standard}")
+    with pytest.raises(tdf3_kas_core.errors.BadRequestError):
+        rewrap_v2_batch(request_data, context, rewrap_plugins, key_master)
+
+
+def nano_tdf_header(ec_private_key, raw_policy):
+    """Build a nanoTDF header with an encrypted policy and ECDSA binding."""
+    ecc_mode = ECCMode(True, CurveMode.SECP256R1)
+    payload_config = SymmetricAndPayloadConfig(
+        False, CurveMode.SECP256R1, CipherMode.AES_256_GCM_TAG64
+    )
+    encryptor = ecc_mode.curve.create_encryptor(
+        ec_private_key.public_key().public_bytes(
+            serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
+        )
+    )
+    cipher = payload_config.symmetric_cipher(encryptor.symmetric_key, b"\0" * 12)
+    ciphertext, tag = cipher.encrypt(json.dumps(raw_policy).encode())
+    policy_data = ciphertext + tag
+    policy = NanoTDFPolicy(
+        PolicyType.ENCRYPTED,
+        ByteData(policy_data),
+        ByteData(encryptor.sign(policy_data)),
+    )
+    header = Header(
+        create_resource_locator("https://kas.example.com"),
+        ecc_mode,
+        payload_config,
+        policy,
+        ByteData(encryptor.public_key),
+    )
+    return header.serialize(), encryptor.symmetric_key
+
+
+def test_nano_tdf_header_cache(
+    monkeypatch, public_key, private_key, ec_private_key, client_public_key
+):
+    """Repeated nanoTDF headers are opened once while the cache is on."""
+    key_master = FakeKeyMaster(public_key, private_key, ec_private_key)
+    raw_policy = {"uuid": "1111-2222", "body": {"dataAttributes": [], "dissem": []}}
+    header, symmetric_key = nano_tdf_header(ec_private_key, raw_policy)
+    data = {
+        "keyAccess": {"header": base64.b64encode(header).decode()},
+        "clientPublicKey": client_public_key,
+    }
+    opened = []
+    open_header = services._nano_tdf_open_header
+
+    def counting_open_header(*args):
+        nano_header = open_header(*args)
+        opened.append(nano_header)
+        return nano_header
+
+    monkeypatch.setattr(services, "_nano_tdf_open_header", counting_open_header)
+    monkeypatch.setattr(services, "nanotdf_header_cache_ttl", 60)
+    cache = TTLCache(ttl=60, on_evict=lambda nano_header: nano_header.zeroize())
+    monkeypatch.setattr(services, "nanotdf_header_cache", cache)
+
+    for _ in range(3):
+        (policy, _) = services._nano_tdf_rewrap_prepare(
+            data, Context(), key_master, None
+        )
+        assert policy.uuid == "1111-2222"
+    assert len(opened) == 1
+    assert opened[0].key() == symmetric_key
+
+    # Evicted keys are zeroized
+    cache.clear()
+    assert opened[0].key() is None
+
+    # With the cache off every request opens the header
+    monkeypatch.setattr(services, "nanotdf_header_cache_ttl", 0)
+    services._nano_tdf_rewrap_prepare(data, Context(), key_master, None)
+    assert len(opened) == 2
+    assert len(cache) == 0
+
+
 def test_upsert_v2(
     key_access_wrapped_raw,
     faux_policy_bytes,
@@ -593,7 +1001,7 @@ def mock_response(monkeypatch):
         def mock_get(*args, **kwargs):
             return response
 
-        monkeypatch.setattr(requests, "get", mock_get)
+        monkeypatch.setattr(requests.Session, "get", mock_get)
 
     return with_value
 
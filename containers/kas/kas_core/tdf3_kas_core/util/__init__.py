@@ -7,6 +7,7 @@ from .cipher import aes_gcm_decrypt  # noqa: F401
 
 from .keys import get_public_key_from_pem  # noqa: F401
 from .keys import get_private_key_from_pem  # noqa: F401
+from .keys import load_pem_public_key  # noqa: F401
 
 from .hmac import validate_hmac  # noqa: F401
 from .hmac import generate_hmac_digest  # noqa: F401
@@ -19,3 +20,13 @@ from .swagger_ui_bundle import swagger_ui_4_path
 from .swagger_ui_bundle import swagger_ui_path
 
 from .hooks import hook_into, post_rewrap_v2_hook_default
+
+from .cache import TTLCache  # noqa: F401
+
+from .http_pool import http_get, http_post, http_session  # noqa: F401
+
+from . import metrics  # noqa: F401
+
+from . import crypto_executor  # noqa: F401
+
+from . import stages  # noqa: F401
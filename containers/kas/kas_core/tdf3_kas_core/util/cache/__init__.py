@@ -0,0 +1,3 @@
+"""In-process caches are here."""
+
+from .cache import TTLCache  # noqa: F401
@@ -0,0 +1,219 @@
+"""A small in-process cache with expiry and LRU eviction."""
+
+import collections
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_Entry = collections.namedtuple("_Entry", ["value", "expires_at", "stale_until"])
+
+
+class _Flight(object):
+    """A load in progress, shared by every caller waiting on the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache(object):
+    """A thread-safe, size-bounded LRU cache whose entries expire.
+
+    Entries live for `ttl` seconds, or `negative_ttl` seconds when
+    `is_negative(value)` is true. For `stale_ttl` seconds after expiry,
+    `get_or_load` keeps serving the old value while a background thread
+    reloads it. Concurrent loads of the same key are collapsed into one.
+    A `ttl` of None never expires. When given, `ttl_for(value)` picks the
+    lifetime of each entry, falling back to the defaults if it returns None.
+    When given, `on_evict(value)` is called, under the cache lock, whenever a
+    value leaves the cache: evicted, expired, replaced, invalidated or
+    cleared.
+    """
+
+    def __init__(
+        self,
+        maxsize=1024,
+        ttl=300,
+        *,
+        negative_ttl=None,
+        stale_ttl=0,
+        is_negative=None,
+        ttl_for=None,
+        on_evict=None,
+        timer=time.monotonic,
+    ):
+        """Construct an empty cache."""
+        self.__maxsize = maxsize
+        self.__ttl = ttl
+        self.__negative_ttl = negative_ttl
+        self.__stale_ttl = stale_ttl or 0
+        self.__is_negative = is_negative or (lambda value: value is None)
+        self.__ttl_for = ttl_for or (lambda value: None)
+        self.__on_evict = on_evict
+        self.__timer = timer
+        self.__entries = collections.OrderedDict()
+        self.__flights = {}
+        self.__lock = threading.RLock()
+        self.__stats = collections.Counter()
+
+    @property
+    def maxsize(self):
+        """Return the maximum number of entries."""
+        return self.__maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        """Do not allow maxsize to be set."""
+        pass
+
+    @property
+    def stats(self):
+        """Return a copy of the hit, miss and eviction counters."""
+        with self.__lock:
+            return dict(self.__stats)
+
+    @stats.setter
+    def stats(self, value):
+        """Do not allow stats to be set."""
+        pass
+
+    def __len__(self):
+        """Return the number of entries, including expired ones not yet evicted."""
+        with self.__lock:
+            return len(self.__entries)
+
+    def __contains__(self, key):
+        """Return True if key has an unexpired entry."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            return entry is not None and self.__timer() < entry.expires_at
+
+    def get(self, key, default=None):
+        """Return the unexpired value for key, or default."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            now = self.__timer()
+            if entry is None or now >= entry.expires_at:
+                if entry is not None and now >= entry.stale_until:
+                    self.__evict(key)
+                self.__stats["misses"] += 1
+                return default
+            self.__entries.move_to_end(key)
+            self.__stats["hits"] += 1
+            return entry.value
+
+    def set(self, key, value, ttl=None):
+        """Store value under key; ttl overrides the cache default."""
+        if ttl is None:
+            ttl = self.__ttl_for(value)
+        if ttl is None:
+            if self.__negative_ttl is not None and self.__is_negative(value):
+                ttl = self.__negative_ttl
+            else:
+                ttl = self.__ttl
+        now = self.__timer()
+        expires_at = float("inf") if ttl is None else now + ttl
+        with self.__lock:
+            # Drop entries that have aged out from the least recent end
+            while self.__entries:
+                oldest = next(iter(self.__entries))
+                if now < self.__entries[oldest].stale_until:
+                    break
+                self.__evict(oldest)
+            previous = self.__entries.get(key)
+            if previous is not None and previous.value is not value:
+                self.__release(previous.value)
+            self.__entries[key] = _Entry(
+                value, expires_at, expires_at + self.__stale_ttl
+            )
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__maxsize:
+                self.__evict(next(iter(self.__entries)))
+                self.__stats["evictions"] += 1
+
+    def invalidate(self, key):
+        """Drop the entry for key, if any."""
+        with self.__lock:
+            if key in self.__entries:
+                self.__evict(key)
+
+    def clear(self):
+        """Drop every entry."""
+        with self.__lock:
+            for key in list(self.__entries):
+                self.__evict(key)
+
+    def get_or_load(self, key, loader):
+        """Return the value for key, calling loader(key) to fill a miss.
+
+        Errors raised by the loader are not cached; they are raised to every
+        caller waiting on that load.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            now = self.__timer()
+            if entry is not None and now < entry.expires_at:
+                self.__entries.move_to_end(key)
+                self.__stats["hits"] += 1
+                return entry.value
+            if entry is not None and now < entry.stale_until:
+                self.__entries.move_to_end(key)
+                self.__stats["stale_hits"] += 1
+                if key not in self.__flights:
+                    flight = self.__flights[key] = _Flight()
+                    threading.Thread(
+                        target=self.__refresh,
+                        args=(key, loader, flight),
+                        daemon=True,
+                    ).start()
+                return entry.value
+            self.__stats["misses"] += 1
+            flight = self.__flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self.__flights[key] = _Flight()
+
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        return self.__load(key, loader, flight)
+
+    def __load(self, key, loader, flight):
+        try:
+            flight.value = loader(key)
+            self.set(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.__lock:
+                self.__flights.pop(key, None)
+            flight.done.set()
+
+    def __refresh(self, key, loader, flight):
+        try:
+            self.__load(key, loader, flight)
+            with self.__lock:
+                self.__stats["refreshes"] += 1
+        except Exception as e:
+            # Keep serving the stale value until it ages out.
+            logger.warning("Background refresh of [%s] failed: %s", key, e)
+            with self.__lock:
+                self.__stats["refresh_errors"] += 1
+
+    def __evict(self, key):
+        self.__release(self.__entries.pop(key).value)
+
+    def __release(self, value):
+        if self.__on_evict is None:
+            return
+        try:
+            self.__on_evict(value)
+        except Exception as e:
+            logger.warning("Cache eviction callback failed: %s", e)
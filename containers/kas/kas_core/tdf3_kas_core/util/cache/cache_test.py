@@ -0,0 +1,159 @@
+"""Test the TTL cache."""
+
+import threading
+
+import pytest
+
+from .cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+def test_cache_get_set(timer):
+    cache = TTLCache(ttl=10, timer=timer)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert "a" in cache
+    timer.now += 11
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+def test_cache_lru_eviction(timer):
+    cache = TTLCache(maxsize=2, ttl=10, timer=timer)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats["evictions"] == 1
+
+
+def test_cache_get_or_load(timer):
+    cache = TTLCache(ttl=10, timer=timer)
+    calls = []
+
+    def loader(key):
+        calls.append(key)
+        return key.upper()
+
+    assert cache.get_or_load("a", loader) == "A"
+    assert cache.get_or_load("a", loader) == "A"
+    assert calls == ["a"]
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+
+def test_cache_negative_ttl(timer):
+    cache = TTLCache(ttl=100, negative_ttl=5, is_negative=lambda v: not v, timer=timer)
+    cache.set("empty", [])
+    cache.set("full", [1])
+    timer.now += 6
+    assert "empty" not in cache
+    assert "full" in cache
+
+
+def test_cache_loader_errors_are_not_cached(timer):
+    cache = TTLCache(ttl=10, timer=timer)
+
+    def failing(key):
+        raise ValueError(key)
+
+    with pytest.raises(ValueError):
+        cache.get_or_load("a", failing)
+    assert cache.get_or_load("a", lambda key: 1) == 1
+
+
+def test_cache_stale_while_revalidate(timer):
+    cache = TTLCache(ttl=10, stale_ttl=10, timer=timer)
+    cache.set("a", "old")
+    timer.now += 15
+    refreshed = threading.Event()
+
+    def loader(key):
+        refreshed.set()
+        return "new"
+
+    assert cache.get_or_load("a", loader) == "old"
+    assert refreshed.wait(5)
+    for _ in range(100):
+        if cache.get("a") == "new":
+            break
+        threading.Event().wait(0.01)
+    assert cache.get("a") == "new"
+
+
+def test_cache_single_flight(timer):
+    cache = TTLCache(ttl=10, timer=timer)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow(key):
+        calls.append(key)
+        started.set()
+        release.wait(5)
+        return 42
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get_or_load("k", slow)))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=lambda: results.append(cache.get_or_load("k", slow)))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert results == [42, 42]
+    assert calls == ["k"]
+
+
+def test_cache_ttl_for(timer):
+    cache = TTLCache(ttl=100, ttl_for=lambda v: v.get("max_age"), timer=timer)
+    cache.set("short", {"max_age": 5})
+    cache.set("default", {})
+    timer.now += 6
+    assert "short" not in cache
+    assert "default" in cache
+
+
+def test_cache_on_evict(timer):
+    released = []
+    cache = TTLCache(maxsize=2, ttl=10, on_evict=released.append, timer=timer)
+    cache.set("a", "a1")
+    cache.set("a", "a2")
+    assert released == ["a1"]
+    cache.set("b", "b1")
+    cache.set("c", "c1")
+    assert released == ["a1", "a2"]
+    cache.invalidate("b")
+    assert released == ["a1", "a2", "b1"]
+    timer.now += 11
+    assert cache.get("c") is None
+    assert released == ["a1", "a2", "b1", "c1"]
+    assert len(cache) == 0
+    cache.set("d", "d1")
+    cache.clear()
+    assert released == ["a1", "a2", "b1", "c1", "d1"]
+
+
+def test_cache_set_drops_expired_entries(timer):
+    released = []
+    cache = TTLCache(ttl=10, on_evict=released.append, timer=timer)
+    cache.set("a", 1)
+    timer.now += 11
+    cache.set("b", 2)
+    assert released == [1]
+    assert len(cache) == 1
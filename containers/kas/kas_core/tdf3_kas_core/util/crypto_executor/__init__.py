@@ -0,0 +1,4 @@
+"""Private key operations, run inline or on a pool, are here."""
+
+from .crypto_executor import CryptoExecutor  # noqa: F401
+from .crypto_executor import run  # noqa: F401
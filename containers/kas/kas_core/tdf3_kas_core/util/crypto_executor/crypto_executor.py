@@ -0,0 +1,211 @@
+"""Run private key operations inline, on a thread pool or on a process pool.
+
+RSA and ECDH private key operations are the most CPU-heavy work in a rewrap.
+Run inline (the default) they hold the request thread. A process pool
+spreads them over every core, however many web workers there are.
+
+Configuration is read once, from the environment:
+
+    KAS_CRYPTO_EXECUTOR           inline (default), thread or process
+    KAS_CRYPTO_EXECUTOR_WORKERS   pool size (default: the number of CPUs)
+
+Operations are module-level functions called as fn(*args, private_key=key).
+Pool workers load each private key once, when the worker starts; a key is
+sent to the workers by its public key fingerprint, not with every call.
+Queue depth and latency are reported as the crypto_executor.queue_depth
+gauge and the crypto_executor.latency timer.
+"""
+
+import concurrent.futures
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+
+from tdf3_kas_core.errors import ServerStartupError
+
+from .. import metrics
+
+logger = logging.getLogger(__name__)
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+MODES = (INLINE, THREAD, PROCESS)
+
+# Private keys loaded in this pool worker, by fingerprint
+_worker_keys = {}
+
+
+def _load_worker_keys(pems):
+    """Load the private keys once, when a pool worker starts."""
+    for handle, pem in pems.items():
+        _worker_keys[handle] = serialization.load_pem_private_key(
+            pem, None, backend=default_backend()
+        )
+
+
+def _call_with_worker_key(fn, handle, args):
+    private_key = _worker_keys[handle] if handle is not None else None
+    return fn(*args, private_key=private_key)
+
+
+def fingerprint(private_key):
+    """Return a fingerprint of the private key's public key."""
+    public_der = private_key.public_key().public_bytes(
+        serialization.Encoding.DER,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return hashlib.sha256(public_der).hexdigest()
+
+
+class CryptoExecutor(object):
+    """Run private key operations in the configured mode."""
+
+    def __init__(self, mode=INLINE, max_workers=None):
+        """Construct an executor; pools are started on first use."""
+        if mode not in MODES:
+            raise ServerStartupError(
+                f"Unknown KAS_CRYPTO_EXECUTOR [{mode}]; use one of {list(MODES)}"
+            )
+        self.__mode = mode
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__lock = threading.Lock()
+        self.__pool = None
+        self.__pems = {}
+        self.__pending = 0
+
+    @property
+    def mode(self):
+        """Return the mode: inline, thread or process."""
+        return self.__mode
+
+    @mode.setter
+    def mode(self, value):
+        """Do not allow the mode to be set."""
+        pass
+
+    @property
+    def pending(self):
+        """Return the number of operations queued or running."""
+        return self.__pending
+
+    @pending.setter
+    def pending(self, value):
+        """Do not allow pending to be set."""
+        pass
+
+    def run(self, fn, *args, private_key=None):
+        """Return fn(*args, private_key=private_key), run in the configured mode."""
+        start = time.perf_counter()
+        if self.__mode == INLINE:
+            try:
+                return fn(*args, private_key=private_key)
+            finally:
+                self.__record(start)
+
+        if self.__mode == THREAD:
+            future = self.__submit(
+                lambda pool: pool.submit(fn, *args, private_key=private_key)
+            )
+        else:
+            handle = None
+            if private_key is not None:
+                handle = self.__register(private_key)
+            future = self.__submit(
+                lambda pool: pool.submit(_call_with_worker_key, fn, handle, args)
+            )
+        try:
+            return future.result()
+        finally:
+            with self.__lock:
+                self.__pending -= 1
+                pending = self.__pending
+            metrics.gauge("crypto_executor.queue_depth", pending)
+            self.__record(start)
+
+    def shutdown(self, wait=True):
+        """Stop the pool, if any; the next operation starts a new one."""
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def reset_after_fork(self):
+        """Forget a pool inherited from the parent process."""
+        self.__lock = threading.Lock()
+        self.__pool = None
+        self.__pending = 0
+
+    def __submit(self, submit):
+        with self.__lock:
+            if self.__pool is None:
+                self.__pool = self.__new_pool()
+            future = submit(self.__pool)
+            self.__pending += 1
+            pending = self.__pending
+        metrics.gauge("crypto_executor.queue_depth", pending)
+        return future
+
+    def __new_pool(self):
+        logger.info(
+            "Starting %s crypto executor with %d workers",
+            self.__mode,
+            self.__max_workers,
+        )
+        if self.__mode == THREAD:
+            return concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.__max_workers, thread_name_prefix="crypto"
+            )
+        # Forking a threaded web worker is unsafe; start clean processes.
+        context = multiprocessing.get_context(
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.__max_workers,
+            mp_context=context,
+            initializer=_load_worker_keys,
+            initargs=(dict(self.__pems),),
+        )
+
+    def __register(self, private_key):
+        handle = fingerprint(private_key)
+        if handle in self.__pems:
+            return handle
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        with self.__lock:
+            if handle not in self.__pems:
+                self.__pems[handle] = pem
+                # Workers load keys when they start, so start new ones.
+                pool, self.__pool = self.__pool, None
+                if pool is not None:
+                    pool.shutdown(wait=False)
+        return handle
+
+    def __record(self, start):
+        metrics.timing("crypto_executor.latency", (time.perf_counter() - start) * 1000)
+
+
+executor = CryptoExecutor(
+    os.environ.get("KAS_CRYPTO_EXECUTOR", INLINE),
+    int(os.environ.get("KAS_CRYPTO_EXECUTOR_WORKERS", "0")) or None,
+)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=executor.reset_after_fork)
+
+
+def run(fn, *args, private_key=None):
+    """Run fn on the process-wide crypto executor."""
+    return executor.run(fn, *args, private_key=private_key)
@@ -0,0 +1,92 @@
+"""Test the crypto executor."""
+
+import pytest
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from tdf3_kas_core.errors import CryptoError
+from tdf3_kas_core.errors import ServerStartupError
+from tdf3_kas_core.models.nanotdf.crypto import exchange_with_ephemeral_key
+from tdf3_kas_core.models.nanotdf.crypto import exchange_with_private_key
+from tdf3_kas_core.models.wrapped_keys import aes_decrypt_sha1
+from tdf3_kas_core.models.wrapped_keys import aes_encrypt_sha1
+
+from . import crypto_executor
+from .crypto_executor import CryptoExecutor
+
+
+@pytest.fixture(params=["inline", "thread", "process"])
+def executor(request):
+    executor = CryptoExecutor(request.param, max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def compressed(private_key):
+    return private_key.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
+    )
+
+
+def test_rsa_unwrap(executor, public_key, private_key):
+    wrapped = aes_encrypt_sha1(b"secret", public_key)
+    assert executor.run(aes_decrypt_sha1, wrapped, private_key=private_key) == (
+        b"secret"
+    )
+    assert executor.pending == 0
+
+
+def test_errors_are_raised(executor, private_key):
+    with pytest.raises(CryptoError):
+        executor.run(aes_decrypt_sha1, b"not wrapped", private_key=private_key)
+    assert executor.pending == 0
+
+
+def test_ecdh(executor):
+    kas_key = ec.generate_private_key(ec.SECP256R1(), default_backend())
+    ephemeral_der, ephemeral_public, derived = executor.run(
+        exchange_with_ephemeral_key, ec.SECP256R1, compressed(kas_key)
+    )
+    assert len(derived) == 32
+    assert (
+        executor.run(
+            exchange_with_private_key,
+            ec.SECP256R1,
+            ephemeral_public,
+            private_key=kas_key,
+        )
+        == derived
+    )
+    ephemeral_key = serialization.load_der_private_key(ephemeral_der, None)
+    assert compressed(ephemeral_key) == ephemeral_public
+
+
+def test_process_workers_load_new_keys(public_key, private_key):
+    executor = CryptoExecutor("process", max_workers=1)
+    try:
+        first = ec.generate_private_key(ec.SECP256R1(), default_backend())
+        second = ec.generate_private_key(ec.SECP256R1(), default_backend())
+        peer = compressed(ec.generate_private_key(ec.SECP256R1(), default_backend()))
+        for key in (first, second, first):
+            assert executor.run(
+                exchange_with_private_key, ec.SECP256R1, peer, private_key=key
+            ) == exchange_with_private_key(ec.SECP256R1, peer, private_key=key)
+    finally:
+        executor.shutdown()
+
+
+def test_fingerprint(private_key):
+    other = ec.generate_private_key(ec.SECP256R1(), default_backend())
+    assert crypto_executor.fingerprint(private_key) == crypto_executor.fingerprint(
+        private_key
+    )
+    assert crypto_executor.fingerprint(private_key) != crypto_executor.fingerprint(
+        other
+    )
+
+
+def test_unknown_mode():
+    with pytest.raises(ServerStartupError):
+        CryptoExecutor("gpu")
@@ -0,0 +1,5 @@
+"""The pooled outbound HTTP session is here."""
+
+from .http_pool import http_session  # noqa: F401
+from .http_pool import http_get  # noqa: F401
+from .http_pool import http_post  # noqa: F401
@@ -0,0 +1,142 @@
+"""A shared, pooled HTTP session for outbound calls.
+
+Every worker process holds one requests.Session, so connections (and their
+TLS handshakes) to the attribute authority, the IdP and entitlement
+endpoints are kept alive and reused across requests. The session is shared
+by calls made for different users, so it never stores or sends cookies.
+
+Configuration is read once, from the environment:
+
+    KAS_HTTP_POOL_SIZE      connections kept per host (default 10)
+    KAS_HTTP_TIMEOUT        default timeout in seconds (default 10)
+    KAS_HTTP_RETRIES        retries for failed connections (default 2)
+    KAS_HTTP_BACKOFF        retry backoff factor in seconds (default 0.5)
+    KAS_HTTP_HOST_OPTIONS   JSON object of per-host overrides, keyed by
+                            host[:port], of timeout, retries and pool_size
+    CA_CERT_PATH            CA bundle used for mutual TLS calls
+    CLIENT_CERT_PATH        client certificate used for mutual TLS calls
+    CLIENT_KEY_PATH         client key used for mutual TLS calls
+"""
+
+import http.cookiejar
+import json
+import logging
+import os
+import threading
+
+from urllib.parse import urlparse
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+def _host_options():
+    try:
+        options = json.loads(os.environ.get("KAS_HTTP_HOST_OPTIONS") or "{}")
+    except ValueError:
+        logger.error("Invalid KAS_HTTP_HOST_OPTIONS; ignoring", exc_info=True)
+        return {}
+    if not isinstance(options, dict):
+        logger.error("KAS_HTTP_HOST_OPTIONS must be a JSON object; ignoring")
+        return {}
+    return options
+
+
+pool_size = int(os.environ.get("KAS_HTTP_POOL_SIZE", "10"))
+default_timeout = float(os.environ.get("KAS_HTTP_TIMEOUT", "10"))
+default_retries = int(os.environ.get("KAS_HTTP_RETRIES", "2"))
+backoff_factor = float(os.environ.get("KAS_HTTP_BACKOFF", "0.5"))
+host_options = _host_options()
+
+ca_cert_path = os.environ.get("CA_CERT_PATH")
+client_cert_path = os.environ.get("CLIENT_CERT_PATH")
+client_key_path = os.environ.get("CLIENT_KEY_PATH")
+
+_lock = threading.Lock()
+_session = None
+
+
+def _adapter(retries, size):
+    # Read errors are not retried, so a slow backend still surfaces as a
+    # ReadTimeout rather than spending the retry budget.
+    return HTTPAdapter(
+        pool_connections=size,
+        pool_maxsize=size,
+        max_retries=Retry(total=retries, read=False, backoff_factor=backoff_factor),
+    )
+
+
+def _create_session():
+    session = requests.Session()
+    # A cookie set on one user's call must not be sent on another's
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = _adapter(default_retries, pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    for host, options in host_options.items():
+        adapter = _adapter(
+            options.get("retries", default_retries),
+            options.get("pool_size", pool_size),
+        )
+        session.mount(f"https://{host}", adapter)
+        session.mount(f"http://{host}", adapter)
+    return session
+
+
+def _reset_after_fork():
+    # Sockets are not safe to share with a forked child; start a new pool.
+    global _lock, _session
+    _lock = threading.Lock()
+    _session = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def http_session():
+    """Return the pooled session for this process."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+
+def _timeout_for(url, timeout):
+    host = urlparse(url).netloc
+    if "timeout" in host_options.get(host, {}):
+        return host_options[host]["timeout"]
+    if timeout is not None:
+        return timeout
+    return default_timeout
+
+
+def _prepare(url, kwargs):
+    """Fill in the timeout and, for mtls calls, the TLS configuration.
+
+    A per-host timeout from KAS_HTTP_HOST_OPTIONS takes precedence over the
+    timeout passed in, which takes precedence over KAS_HTTP_TIMEOUT.
+    """
+    if kwargs.pop("mtls", False):
+        kwargs.setdefault("verify", ca_cert_path)
+        if client_cert_path and client_key_path:
+            logger.debug("Using cert auth for url:%s", url)
+            kwargs.setdefault("cert", (client_cert_path, client_key_path))
+    kwargs["timeout"] = _timeout_for(url, kwargs.get("timeout"))
+    return kwargs
+
+
+def http_get(url, **kwargs):
+    """Send a GET request over the pooled session."""
+    return http_session().get(url, **_prepare(url, kwargs))
+
+
+def http_post(url, **kwargs):
+    """Send a POST request over the pooled session."""
+    return http_session().post(url, **_prepare(url, kwargs))
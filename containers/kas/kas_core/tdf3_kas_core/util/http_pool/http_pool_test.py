@@ -0,0 +1,97 @@
+"""Test the pooled HTTP session."""
+
+import http.server
+import threading
+
+import pytest
+
+from unittest.mock import patch
+
+import requests
+
+from . import http_pool
+
+
+@pytest.fixture
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(http_pool, "_session", None)
+    monkeypatch.setattr(http_pool, "default_timeout", 10)
+    monkeypatch.setattr(
+        http_pool,
+        "host_options",
+        {"attributes:4020": {"timeout": 2, "retries": 0, "pool_size": 4}},
+    )
+    yield http_pool
+    http_pool._reset_after_fork()
+
+
+def test_session_is_reused(fresh_pool):
+    assert fresh_pool.http_session() is fresh_pool.http_session()
+
+
+def test_session_reset_after_fork(fresh_pool):
+    session = fresh_pool.http_session()
+    fresh_pool._reset_after_fork()
+    assert fresh_pool.http_session() is not session
+
+
+def test_host_options_mount_adapter(fresh_pool):
+    session = fresh_pool.http_session()
+    adapter = session.get_adapter("http://attributes:4020/v1/attrName")
+    assert adapter.max_retries.total == 0
+    assert session.get_adapter("https://idp/") is not adapter
+
+
+@patch.object(requests.Session, "get")
+def test_http_get_timeouts(mock_get, fresh_pool):
+    fresh_pool.http_get("https://idp/")
+    assert mock_get.call_args.kwargs["timeout"] == 10
+    fresh_pool.http_get("https://idp/", timeout=5)
+    assert mock_get.call_args.kwargs["timeout"] == 5
+    fresh_pool.http_get("http://attributes:4020/v1/attrName", timeout=5)
+    assert mock_get.call_args.kwargs["timeout"] == 2
+
+
+@patch.object(requests.Session, "get")
+def test_http_get_mtls(mock_get, fresh_pool, monkeypatch):
+    monkeypatch.setattr(fresh_pool, "ca_cert_path", "/ca.pem")
+    monkeypatch.setattr(fresh_pool, "client_cert_path", "/client.pem")
+    monkeypatch.setattr(fresh_pool, "client_key_path", "/client.key")
+    fresh_pool.http_get("https://attributes/", mtls=True)
+    assert mock_get.call_args.kwargs["verify"] == "/ca.pem"
+    assert mock_get.call_args.kwargs["cert"] == ("/client.pem", "/client.key")
+    fresh_pool.http_get("https://idp/")
+    assert "cert" not in mock_get.call_args.kwargs
+    assert "mtls" not in mock_get.call_args.kwargs
+
+
+@pytest.fixture
+def cookie_server():
+    """Set a cookie on every response and record the cookies sent."""
+    sent = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            sent.append(self.headers.get("Cookie"))
+            self.send_response(200)
+            self.send_header("Set-Cookie", "session=user-a; Path=/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/", sent
+    server.shutdown()
+    server.server_close()
+
+
+def test_cookies_not_shared(fresh_pool, cookie_server):
+    url, sent = cookie_server
+    fresh_pool.http_get(url, headers={"Authorization": "Bearer user-a"})
+    fresh_pool.http_get(url)
+    assert sent == [None, None]
+    assert len(fresh_pool.http_session().cookies) == 0
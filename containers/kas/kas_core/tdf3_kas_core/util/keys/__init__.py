@@ -6,3 +6,4 @@ in this module by modifiying these functions.
 
 from .get_keys_from_pem import get_public_key_from_pem  # noqa: F401
 from .get_keys_from_pem import get_private_key_from_pem  # noqa: F401
+from .public_key_cache import load_pem_public_key  # noqa: F401
@@ -0,0 +1,46 @@
+"""Parsed PEM public keys, shared between requests.
+
+Clients send the same signing and rewrap public keys with every request of
+a session. Parsed keys are kept in an LRU keyed by a digest of the PEM, so
+each key is parsed and validated once. Hits and misses are counted as the
+public_key_cache.hit and .miss metrics.
+
+    KAS_PUBLIC_KEY_CACHE_SIZE   number of parsed keys kept (default 1024)
+"""
+
+import hashlib
+import logging
+import os
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+
+from .. import metrics
+from ..cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Public keys do not change, so entries only leave when the LRU is full.
+cache_size = int(os.environ.get("KAS_PUBLIC_KEY_CACHE_SIZE", "1024"))
+public_keys = TTLCache(maxsize=cache_size, ttl=None)
+
+
+def load_pem_public_key(pem):
+    """Return the public key in a PEM string or bytes.
+
+    Raises what serialization.load_pem_public_key raises for a bad PEM;
+    failures are not cached.
+    """
+    if isinstance(pem, str):
+        pem = pem.encode()
+    if cache_size <= 0:
+        return serialization.load_pem_public_key(pem, backend=default_backend())
+    parsed = []
+
+    def parse(_):
+        parsed.append(pem)
+        return serialization.load_pem_public_key(pem, backend=default_backend())
+
+    public_key = public_keys.get_or_load(hashlib.sha256(pem).digest(), parse)
+    metrics.incr("public_key_cache.miss" if parsed else "public_key_cache.hit")
+    return public_key
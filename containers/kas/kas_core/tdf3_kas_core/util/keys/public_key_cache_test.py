@@ -0,0 +1,43 @@
+"""Test the parsed public key cache."""
+
+import pytest
+
+from cryptography.hazmat.primitives import serialization
+
+from . import public_key_cache
+from .public_key_cache import load_pem_public_key
+
+
+@pytest.fixture
+def public_keys(monkeypatch):
+    cache = public_key_cache.TTLCache(maxsize=2, ttl=None)
+    monkeypatch.setattr(public_key_cache, "public_keys", cache)
+    return cache
+
+
+def pem(key):
+    return key.public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+def test_load_pem_public_key(public_keys, public_key, entity_public_key):
+    first = load_pem_public_key(pem(public_key).decode())
+    assert first == public_key
+    # str and bytes share an entry
+    assert load_pem_public_key(pem(public_key)) is first
+    assert public_keys.stats == {"hits": 1, "misses": 1}
+    assert load_pem_public_key(pem(entity_public_key)) == entity_public_key
+    assert len(public_keys) == 2
+
+
+def test_load_pem_public_key_errors_are_not_cached(public_keys):
+    with pytest.raises(ValueError):
+        load_pem_public_key("not a key")
+    assert len(public_keys) == 0
+
+
+def test_load_pem_public_key_without_cache(monkeypatch, public_keys, public_key):
+    monkeypatch.setattr(public_key_cache, "cache_size", 0)
+    assert load_pem_public_key(pem(public_key)) == public_key
+    assert len(public_keys) == 0
@@ -0,0 +1,5 @@
+"""Counters and timers, sent to statsd, are here."""
+
+from .metrics import incr  # noqa: F401
+from .metrics import gauge  # noqa: F401
+from .metrics import timing  # noqa: F401
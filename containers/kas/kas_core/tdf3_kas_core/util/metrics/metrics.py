@@ -0,0 +1,106 @@
+"""Counters and timers, sent to statsd when STATSD_HOST is set.
+
+Metrics are fire-and-forget UDP datagrams; a missing or slow collector never
+slows a request down. The collector's address is resolved once, when the
+client is created, so sending a metric never waits on DNS; if it cannot be
+resolved then, metrics are disabled. Without STATSD_HOST every call is a
+no-op.
+
+    STATSD_HOST     statsd collector host (unset disables metrics)
+    STATSD_PORT     statsd collector port (default 8125)
+    STATSD_PREFIX   prefix for every metric name (default kas)
+"""
+
+import logging
+import os
+import socket
+
+logger = logging.getLogger(__name__)
+
+
+class NullClient(object):
+    """Discard every metric."""
+
+    def incr(self, name, count=1):
+        """Do nothing."""
+        pass
+
+    def gauge(self, name, value):
+        """Do nothing."""
+        pass
+
+    def timing(self, name, ms):
+        """Do nothing."""
+        pass
+
+
+class StatsdClient(object):
+    """Send metrics to a statsd collector over UDP."""
+
+    def __init__(self, host, port=8125, prefix="kas"):
+        """Construct a client for the collector at host:port.
+
+        The address is resolved here, once, and the socket connected to it.
+        """
+        self.__prefix = f"{prefix}." if prefix else ""
+        self.__socket = None
+        try:
+            family, type_, proto, _, address = socket.getaddrinfo(
+                host, port, type=socket.SOCK_DGRAM
+            )[0]
+            sock = socket.socket(family, type_, proto)
+            sock.setblocking(False)
+            sock.connect(address)
+        except OSError as e:
+            logger.warning("Metrics disabled; cannot reach [%s:%s]: %s", host, port, e)
+            return
+        self.__socket = sock
+
+    def incr(self, name, count=1):
+        """Add count to the counter name."""
+        self.__send(f"{self.__prefix}{name}:{count}|c")
+
+    def gauge(self, name, value):
+        """Set the gauge name to value."""
+        self.__send(f"{self.__prefix}{name}:{value}|g")
+
+    def timing(self, name, ms):
+        """Record a duration, in milliseconds, for the timer name."""
+        self.__send(f"{self.__prefix}{name}:{ms:.3f}|ms")
+
+    def __send(self, stat):
+        if self.__socket is None:
+            return
+        try:
+            self.__socket.send(stat.encode())
+        except OSError as e:
+            logger.debug("Unable to send metric [%s]: %s", stat, e)
+
+
+def _client():
+    host = os.environ.get("STATSD_HOST")
+    if not host:
+        return NullClient()
+    return StatsdClient(
+        host,
+        int(os.environ.get("STATSD_PORT", "8125")),
+        os.environ.get("STATSD_PREFIX", "kas"),
+    )
+
+
+client = _client()
+
+
+def incr(name, count=1):
+    """Add count to the counter name."""
+    client.incr(name, count)
+
+
+def gauge(name, value):
+    """Set the gauge name to value."""
+    client.gauge(name, value)
+
+
+def timing(name, ms):
+    """Record a duration, in milliseconds, for the timer name."""
+    client.timing(name, ms)
@@ -0,0 +1,65 @@
+"""Test the statsd metrics client."""
+
+import socket
+
+import pytest
+
+from . import metrics
+
+
+@pytest.fixture
+def collector():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    yield sock
+    sock.close()
+
+
+def test_statsd_client(collector):
+    client = metrics.StatsdClient("127.0.0.1", collector.getsockname()[1], "kas")
+    client.incr("decisions.hit")
+    assert collector.recv(1024) == b"kas.decisions.hit:1|c"
+    client.timing("rewrap", 1.5)
+    assert collector.recv(1024) == b"kas.rewrap:1.500|ms"
+    client.gauge("cache.size", 3)
+    assert collector.recv(1024) == b"kas.cache.size:3|g"
+
+
+def test_statsd_client_resolves_once(collector, monkeypatch):
+    lookups = []
+    getaddrinfo = socket.getaddrinfo
+
+    def counted(host, *args, **kwargs):
+        lookups.append(host)
+        return getaddrinfo("127.0.0.1", *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", counted)
+    client = metrics.StatsdClient("statsd", collector.getsockname()[1], "kas")
+    client.incr("decisions.hit")
+    client.incr("decisions.miss")
+    assert collector.recv(1024) == b"kas.decisions.hit:1|c"
+    assert collector.recv(1024) == b"kas.decisions.miss:1|c"
+    assert lookups == ["statsd"]
+
+
+def test_statsd_client_unresolvable(monkeypatch):
+    def unresolvable(*args, **kwargs):
+        raise socket.gaierror("Name or service not known")
+
+    monkeypatch.setattr(socket, "getaddrinfo", unresolvable)
+    client = metrics.StatsdClient("statsd", 8125, "kas")
+    client.incr("decisions.hit")
+
+
+def test_metrics_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("STATSD_HOST", raising=False)
+    assert isinstance(metrics._client(), metrics.NullClient)
+    metrics.NullClient().incr("anything")
+
+
+def test_metrics_module_functions(monkeypatch, collector):
+    client = metrics.StatsdClient("127.0.0.1", collector.getsockname()[1], "")
+    monkeypatch.setattr(metrics, "client", client)
+    metrics.incr("hits", 2)
+    assert collector.recv(1024) == b"hits:2|c"
@@ -0,0 +1,4 @@
+"""Independent stages of a request, run concurrently, are here."""
+
+from .stages import StageRunner  # noqa: F401
+from .stages import run  # noqa: F401
@@ -0,0 +1,123 @@
+"""Run the independent stages of a request concurrently.
+
+A tdf3 rewrap waits on the network for attribute definitions and on the
+CPU to unwrap the key, and neither needs the other's result. Run as stages
+they take as long as the slower of the two, not both.
+
+Configuration is read once, from the environment:
+
+    KAS_REWRAP_STAGE_WORKERS   threads shared by all requests (default 16;
+                               0 runs the stages one after another)
+
+Each stage is timed as the <name>.<stage> timer and logged at debug.
+"""
+
+import concurrent.futures
+import contextvars
+import logging
+import os
+import threading
+import time
+
+from .. import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class StageRunner(object):
+    """Run named stages on a shared thread pool."""
+
+    def __init__(self, max_workers=0):
+        """Construct a runner; the pool is started on first use."""
+        self.__max_workers = max_workers
+        self.__lock = threading.Lock()
+        self.__pool = None
+
+    @property
+    def max_workers(self):
+        """Return the pool size; 0 runs stages one after another."""
+        return self.__max_workers
+
+    @max_workers.setter
+    def max_workers(self, value):
+        """Do not allow the pool size to be set."""
+        pass
+
+    def run(self, name, stages):
+        """Run each stage and return a dict of their results by stage name.
+
+        The first stage runs on the calling thread and the others on the
+        pool. The error of the first stage to fail, checked in order, is
+        raised as soon as it is known: stages not yet started are cancelled
+        and stages still running are not waited for.
+        """
+        items = list(stages.items())
+        if self.__max_workers <= 0 or len(items) < 2:
+            return {stage: self.__timed(name, stage, fn) for (stage, fn) in items}
+
+        pool = self.__get_pool()
+        futures = {
+            stage: pool.submit(
+                contextvars.copy_context().run, self.__timed, name, stage, fn
+            )
+            for (stage, fn) in items[1:]
+        }
+        try:
+            stage, fn = items[0]
+            results = {stage: self.__timed(name, stage, fn)}
+            pending = set(futures.values())
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_EXCEPTION
+                )
+                for future in futures.values():
+                    if future in done and future.exception() is not None:
+                        raise future.exception()
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            raise
+        results.update((stage, future.result()) for (stage, future) in futures.items())
+        return results
+
+    def shutdown(self, wait=True):
+        """Stop the pool, if any; the next run starts a new one."""
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def reset_after_fork(self):
+        """Forget a pool inherited from the parent process."""
+        self.__lock = threading.Lock()
+        self.__pool = None
+
+    def __get_pool(self):
+        with self.__lock:
+            if self.__pool is None:
+                logger.info("Starting stage runner with %d workers", self.__max_workers)
+                self.__pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.__max_workers, thread_name_prefix="stage"
+                )
+            return self.__pool
+
+    @staticmethod
+    def __timed(name, stage, fn):
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            metrics.timing(f"{name}.{stage}", ms)
+            logger.debug("Stage %s.%s took %.3f ms", name, stage, ms)
+
+
+runner = StageRunner(int(os.environ.get("KAS_REWRAP_STAGE_WORKERS", "16")))
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=runner.reset_after_fork)
+
+
+def run(name, stages):
+    """Run stages on the process-wide stage runner."""
+    return runner.run(name, stages)
@@ -0,0 +1,93 @@
+"""Test the stage runner."""
+
+import threading
+import time
+
+import pytest
+
+from .. import metrics
+from .stages import StageRunner
+
+
+@pytest.fixture
+def runner():
+    runner = StageRunner(4)
+    yield runner
+    runner.shutdown()
+
+
+def test_stages_return_results_by_name(runner):
+    results = runner.run("test", {"a": lambda: 1, "b": lambda: 2, "c": lambda: 3})
+    assert results == {"a": 1, "b": 2, "c": 3}
+
+
+def test_stages_run_concurrently(runner):
+    start = time.perf_counter()
+    runner.run("test", {"a": lambda: time.sleep(0.2), "b": lambda: time.sleep(0.2)})
+    assert time.perf_counter() - start < 0.35
+
+
+def test_stages_run_in_order_without_workers():
+    calls = []
+    runner = StageRunner(0)
+    results = runner.run(
+        "test",
+        {
+            "a": lambda: calls.append(threading.current_thread()) or "a",
+            "b": lambda: calls.append(threading.current_thread()) or "b",
+        },
+    )
+    assert results == {"a": "a", "b": "b"}
+    assert calls == [threading.current_thread()] * 2
+
+
+def test_first_stage_error_does_not_wait(runner):
+    released = threading.Event()
+
+    def fail():
+        raise ValueError("unwrap failed")
+
+    start = time.perf_counter()
+    with pytest.raises(ValueError, match="unwrap failed"):
+        runner.run("test", {"unwrap": fail, "fetch": lambda: released.wait(5)})
+    assert time.perf_counter() - start < 1
+    released.set()
+
+
+def test_pooled_stage_error(runner):
+    def fail():
+        raise ValueError("fetch failed")
+
+    with pytest.raises(ValueError, match="fetch failed"):
+        runner.run("test", {"unwrap": lambda: None, "fetch": fail})
+
+
+def test_stage_error_cancels_pending():
+    def fail():
+        raise ValueError("unwrap failed")
+
+    released = threading.Event()
+    ran = []
+    runner = StageRunner(1)
+    with pytest.raises(ValueError, match="unwrap failed"):
+        runner.run(
+            "test",
+            {
+                "unwrap": fail,
+                "busy": lambda: released.wait(5),
+                "later": lambda: ran.append(True),
+            },
+        )
+    released.set()
+    runner.shutdown()
+    assert ran == []
+
+
+def test_stage_timings(runner, monkeypatch):
+    timings = []
+    monkeypatch.setattr(metrics, "timing", lambda name, ms: timings.append((name, ms)))
+    runner.run("rewrap.stage", {"unwrap": lambda: None, "fetch": lambda: None})
+    assert sorted(name for (name, _) in timings) == [
+        "rewrap.stage.fetch",
+        "rewrap.stage.unwrap",
+    ]
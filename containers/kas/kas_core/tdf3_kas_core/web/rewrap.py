@@ -7,6 +7,8 @@ from tdf3_kas_core.schema import get_schema
 
 from .create_context import create_context
 from .run_service_with_exceptions import run_service_with_exceptions
+from .run_service_with_exceptions import exception_message
+from .run_service_with_exceptions import exception_status_code
 
 TDF3_REWRAP_SCHEMA = get_schema("tdf3_rewrap_schema")
 logger = logging.getLogger(__name__)
@@ -48,3 +50,23 @@ def rewrap(body, *, dpop=None, userId=None):
 def rewrap_v2(body, *, dpop=None):
     Kas.get_instance().get_middleware()(dpop, Kas.get_instance()._key_master)
     return rewrap_helper(body, Kas.get_instance().get_session_rewrap_v2())
+
+
+def batch_result(result):
+    """Convert one batch rewrap result, or the error it raised, to a response item."""
+    if isinstance(result, Exception):
+        code = exception_status_code(result)
+        err_msg = exception_message(code, result)
+        logger.warning(err_msg, exc_info=result)
+        return {"status": code, "error": err_msg}
+    if isinstance(result, tuple):
+        # Without a post rewrap hook the service returns (res, policy, claims)
+        result = result[0]
+    return {"status": 200, **result}
+
+
+@run_service_with_exceptions
+def rewrap_v2_batch(body, *, dpop=None):
+    Kas.get_instance().get_middleware()(dpop, Kas.get_instance()._key_master)
+    results = rewrap_helper(body, Kas.get_instance().get_session_rewrap_v2_batch())
+    return {"results": [batch_result(r) for r in results]}
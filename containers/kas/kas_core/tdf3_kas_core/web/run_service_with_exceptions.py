@@ -43,6 +43,64 @@ security_headers = {
     "Content-Security-Policy": "default-src 'none'; script-src 'self'; connect-src 'self'; img-src 'self'; style-src 'self'; frame-ancestors 'self'; form-action 'self';",
 }
 
+# Map of error type to HTTP status code. Checked in order; the first match wins.
+exception_status_codes = [
+    # We've received a bad attribute schema somehow.
+    (AttributePolicyConfigError, 500),
+    # User not authorized, most likely
+    (AdjudicatorError, 403),
+    (AuthorizationError, 403),
+    (CryptoError, 403),
+    (InvalidTag, 400),
+    (EntityError, 400),
+    (InvalidAttributeError, 502),
+    (InvalidBindingError, 403),
+    (JWTError, 403),
+    (KeyAccessError, 403),
+    (KeyNotFoundError, 404),
+    # Error in the middleware configuration.
+    (MiddlewareIsBadError, 500),
+    # Like a 500, but for somebody else.
+    (PluginBackendError, 502),
+    # Plugins should throw specific, actionable exceptions
+    # This indicates there is something wrong about the plugin
+    # contract, e.g. an assertion about plugin request or response
+    # invariants failed to hold.
+    (PluginFailedError, 500),
+    # Error in the plugin configuration itself.
+    (PluginIsBadError, 500),
+    (PolicyError, 403),
+    (PreconditionError, 412),
+    (PrivateKeyInvalidError, 403),
+    (RequestError, 403),
+    (ValidationError, 400),
+    (UnknownAttributePolicyError, 403),
+    (RequestTimeoutError, 503),
+    (PolicyNotFoundError, 404),
+    (RouteNotFoundError, 404),
+    (ContractNotFoundError, 404),
+    (PolicyCreateError, 403),
+    (BadRequestError, 400),
+    (UnauthorizedError, 401),
+    (ForbiddenError, 403),
+]
+
+
+def exception_status_code(err):
+    """Return the HTTP status code for an error; 500 if it is unrecognized."""
+    for error_type, code in exception_status_codes:
+        if isinstance(err, error_type):
+            return code
+    return 500
+
+
+def exception_message(code, err):
+    """Format an error for a response body."""
+    try:
+        return f"[{code}] Error: [{err.message}]"
+    except AttributeError:
+        return f"[{code}] Error: [{err}]"
+
 
 def run_service_with_exceptions(service=None, *, success=200):
     """Convert return value to JSON, or error to a status code, as appropriate."""
@@ -59,10 +117,7 @@ def run_service_with_exceptions(service=None, *, success=200):
 
         def handle_exception(code, exception):
             """Handle the exception."""
-            try:
-                err_msg = f"[{code}] Error: [{exception.message}]"
-            except AttributeError:
-                err_msg = f"[{code}] Error: [{exception}]"
+            err_msg = exception_message(code, exception)
 
             res = jsonify(err_msg)
             res.status_code = code
@@ -100,103 +155,7 @@ def run_service_with_exceptions(service=None, *, success=200):
                 )
             return to_response(response), success, security_headers
 
-        except AttributePolicyConfigError as err:
-            # We've received a bad attribute schema somehow.
-            return handle_exception(500, err)
-
-        except AdjudicatorError as err:
-            # User not authorized, most likely
-            return handle_exception(403, err)
-
-        except AuthorizationError as err:
-            return handle_exception(403, err)
-
-        except CryptoError as err:
-            return handle_exception(403, err)
-
-        except InvalidTag as err:
-            return handle_exception(400, err)
-
-        except EntityError as err:
-            return handle_exception(400, err)
-
-        except InvalidAttributeError as err:
-            return handle_exception(502, err)
-
-        except InvalidBindingError as err:
-            return handle_exception(403, err)
-
-        except JWTError as err:
-            return handle_exception(403, err)
-
-        except KeyAccessError as err:
-            return handle_exception(403, err)
-
-        except KeyNotFoundError as err:
-            return handle_exception(404, err)
-
-        except MiddlewareIsBadError as err:
-            # Error in the middleware configuration.
-            return handle_exception(500, err)
-
-        except PluginBackendError as err:
-            # Like a 500, but for somebody else.
-            return handle_exception(502, err)
-
-        except PluginFailedError as err:
-            # Plugins should throw specific, actionable exceptions
-            # This indicates there is something wrong about the plugin
-            # contract, e.g. an assertion about plugin request or response
-            # invariants failed to hold.
-            return handle_exception(500, err)
-
-        except PluginIsBadError as err:
-            # Error in the plugin configuration itself.
-            return handle_exception(500, err)
-
-        except PolicyError as err:
-            return handle_exception(403, err)
-
-        except PreconditionError as err:
-            return handle_exception(412, err)
-
-        except PrivateKeyInvalidError as err:
-            return handle_exception(403, err)
-
-        except RequestError as err:
-            return handle_exception(403, err)
-
-        except ValidationError as err:
-            return handle_exception(400, err)
-
-        except UnknownAttributePolicyError as err:
-            return handle_exception(403, err)
-
-        except RequestTimeoutError as err:
-            return handle_exception(503, err)
-
-        except PolicyNotFoundError as err:
-            return handle_exception(404, err)
-
-        except RouteNotFoundError as err:
-            return handle_exception(404, err)
-
-        except ContractNotFoundError as err:
-            return handle_exception(404, err)
-
-        except PolicyCreateError as err:
-            return handle_exception(403, err)
-
-        except BadRequestError as err:
-            return handle_exception(400, err)
-
-        except UnauthorizedError as err:
-            return handle_exception(401, err)
-
-        except ForbiddenError as err:
-            return handle_exception(403, err)
-
         except Exception as err:
-            return handle_exception(500, err)
+            return handle_exception(exception_status_code(err), err)
 
     return wrap_service
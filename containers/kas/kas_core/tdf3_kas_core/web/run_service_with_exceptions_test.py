@@ -32,6 +32,7 @@ from tdf3_kas_core.errors import RouteNotFoundError
 from tdf3_kas_core.errors import ContractNotFoundError
 
 from .run_service_with_exceptions import run_service_with_exceptions
+from .run_service_with_exceptions import exception_status_code
 
 
 def create_service(ex):
@@ -258,3 +259,11 @@ def test_ContractNotFoundError(req):
     actual = (run_service_with_exceptions(serv))(req)
     assert isinstance(actual, flask.Response)
     assert actual.status_code == 404
+
+
+def test_exception_status_code():
+    """Test the status code lookup used for batch items."""
+    assert exception_status_code(AuthorizationError("denied")) == 403
+    assert exception_status_code(BadRequestError("bad")) == 400
+    assert exception_status_code(RequestTimeoutError("slow")) == 503
+    assert exception_status_code(KeyError("unknown")) == 500
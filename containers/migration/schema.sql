@@ -32,6 +32,38 @@ CREATE TABLE IF NOT EXISTS tdf_attribute.attribute
     CONSTRAINT namespase_id_name_unique UNIQUE (namespace_id, name)
 );
 
+-- Catalog version: each change to an attribute definition takes the next
+-- version and each deletion leaves a tombstone, so readers can sync deltas
+CREATE SEQUENCE IF NOT EXISTS tdf_attribute.catalog_version;
+ALTER TABLE tdf_attribute.attribute ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT nextval('tdf_attribute.catalog_version');
+ALTER TABLE tdf_attribute.attribute ALTER COLUMN version DROP DEFAULT;
+CREATE INDEX IF NOT EXISTS attribute_version_index ON tdf_attribute.attribute (version);
+CREATE TABLE IF NOT EXISTS tdf_attribute.attribute_tombstone
+(
+    version   BIGINT PRIMARY KEY,
+    authority VARCHAR NOT NULL,
+    name      VARCHAR NOT NULL
+);
+CREATE OR REPLACE FUNCTION tdf_attribute.stamp_catalog_version() RETURNS trigger AS $$
+BEGIN
+    -- One catalog writer at a time, so versions are committed in order
+    PERFORM pg_advisory_xact_lock(hashtext('tdf_attribute.catalog_version'));
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO tdf_attribute.attribute_tombstone (version, authority, name)
+        SELECT nextval('tdf_attribute.catalog_version'), ns.name, OLD.name
+        FROM tdf_attribute.attribute_namespace ns
+        WHERE ns.id = OLD.namespace_id;
+        RETURN OLD;
+    END IF;
+    NEW.version := nextval('tdf_attribute.catalog_version');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS attribute_catalog_version ON tdf_attribute.attribute;
+CREATE TRIGGER attribute_catalog_version
+    BEFORE INSERT OR UPDATE OR DELETE ON tdf_attribute.attribute
+    FOR EACH ROW EXECUTE FUNCTION tdf_attribute.stamp_catalog_version();
+
 CREATE SCHEMA IF NOT EXISTS tdf_entitlement;
 CREATE TABLE IF NOT EXISTS tdf_entitlement.entity_attribute
 (
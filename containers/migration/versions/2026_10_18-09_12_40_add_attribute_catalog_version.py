@@ -0,0 +1,71 @@
+"""add attribute catalog version
+
+Revision ID: 3b9e6f0a2c71
+Revises: ecd8960bcf9d
+Create Date: 2026-10-18 09:12:40.518302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3b9e6f0a2c71"
+down_revision = "ecd8960bcf9d"
+branch_labels = None
+depends_on = None
+
+# Each change to an attribute definition takes the next catalog version and
+# each deletion leaves a tombstone, so readers can sync deltas
+CATALOG_VERSION = """
+CREATE SEQUENCE IF NOT EXISTS tdf_attribute.catalog_version;
+ALTER TABLE tdf_attribute.attribute ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT nextval('tdf_attribute.catalog_version');
+ALTER TABLE tdf_attribute.attribute ALTER COLUMN version DROP DEFAULT;
+CREATE INDEX IF NOT EXISTS attribute_version_index ON tdf_attribute.attribute (version);
+CREATE TABLE IF NOT EXISTS tdf_attribute.attribute_tombstone
+(
+    version   BIGINT PRIMARY KEY,
+    authority VARCHAR NOT NULL,
+    name      VARCHAR NOT NULL
+);
+CREATE OR REPLACE FUNCTION tdf_attribute.stamp_catalog_version() RETURNS trigger AS $$
+BEGIN
+    -- One catalog writer at a time, so versions are committed in order
+    PERFORM pg_advisory_xact_lock(hashtext('tdf_attribute.catalog_version'));
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO tdf_attribute.attribute_tombstone (version, authority, name)
+        SELECT nextval('tdf_attribute.catalog_version'), ns.name, OLD.name
+        FROM tdf_attribute.attribute_namespace ns
+        WHERE ns.id = OLD.namespace_id;
+        RETURN OLD;
+    END IF;
+    NEW.version := nextval('tdf_attribute.catalog_version');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS attribute_catalog_version ON tdf_attribute.attribute;
+CREATE TRIGGER attribute_catalog_version
+    BEFORE INSERT OR UPDATE OR DELETE ON tdf_attribute.attribute
+    FOR EACH ROW EXECUTE FUNCTION tdf_attribute.stamp_catalog_version();
+"""
+
+
+def upgrade():
+    op.execute(CATALOG_VERSION)
+    op.execute(
+        "GRANT USAGE ON SEQUENCE tdf_attribute.catalog_version TO tdf_attribute_manager"
+    )
+    op.execute(
+        "GRANT SELECT, INSERT, UPDATE, DELETE ON tdf_attribute.attribute_tombstone"
+        " TO tdf_attribute_manager"
+    )
+
+
+def downgrade():
+    op.execute(
+        "DROP TRIGGER IF EXISTS attribute_catalog_version ON tdf_attribute.attribute"
+    )
+    op.execute("DROP FUNCTION IF EXISTS tdf_attribute.stamp_catalog_version()")
+    op.execute("DROP TABLE IF EXISTS tdf_attribute.attribute_tombstone")
+    op.execute("ALTER TABLE tdf_attribute.attribute DROP COLUMN IF EXISTS version")
+    op.execute("DROP SEQUENCE IF EXISTS tdf_attribute.catalog_version")